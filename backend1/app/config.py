@@ -1,41 +1,100 @@
 # app/config.py
+# Settings + lazily created shared clients.
+# Nothing here connects or imports an SDK at import time: the Mongo client and the
+# OpenRouter client are built on first use (see app/helpers/lifecycle.py for startup).
 import os
+import threading
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from openai import OpenAI
 
 # Load environment variables
 load_dotenv()
 
+_lock = threading.Lock()
+
 # --- MongoDB ---
 MONGO_URI = os.getenv("MONGO_URI")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "resume_analyzer")
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "5000"))  # server selection / connect timeout
+MONGO_TLS = os.getenv("MONGO_TLS", "auto")  # auto = on for mongodb+srv:// or tls=true / ssl=true URIs
+MONGO_TLS_ALLOW_INVALID_CERTS = os.getenv("MONGO_TLS_ALLOW_INVALID_CERTS", "1") != "0"
+
+_mongo_client = None
 
-db = None
-if MONGO_URI:
-    try:
-        client = MongoClient(MONGO_URI)
-        db = client[MONGO_DB_NAME]
-    except Exception as e:
-        print("⚠️ MongoDB connection failed:", e)
-else:
+if not MONGO_URI:
     print("⚠️ MONGO_URI not found in .env")
 
-# --- OpenRouter (AI client) ---
+
+def get_db():
+    """Shared database handle (one MongoClient per process), or None without MONGO_URI.
+    Creating the client does not connect; the first operation does."""
+    global _mongo_client
+    if not MONGO_URI:
+        return None
+    if _mongo_client is None:
+        with _lock:
+            if _mongo_client is None:
+                from pymongo import MongoClient
+
+                options = {"serverSelectionTimeoutMS": MONGO_TIMEOUT_MS, "connectTimeoutMS": MONGO_TIMEOUT_MS}
+                uri = MONGO_URI.lower()
+                tls = uri.startswith("mongodb+srv://") or "tls=true" in uri or "ssl=true" in uri
+                if MONGO_TLS == "1" or (MONGO_TLS == "auto" and tls):
+                    import certifi
+
+                    options.update(tls=True, tlsCAFile=certifi.where(),
+                                   tlsAllowInvalidCertificates=MONGO_TLS_ALLOW_INVALID_CERTS)
+                _mongo_client = MongoClient(MONGO_URI, **options)
+    return _mongo_client[MONGO_DB_NAME]
+
+
 # --- OpenRouter (AI client) ---
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 
-openrouter_client = None
-if OPENROUTER_API_KEY:
-    openrouter_client = OpenAI(
-        base_url=OPENROUTER_BASE_URL,
-        api_key=OPENROUTER_API_KEY,
-    )
-else:
+_openrouter_async_client = None
+
+if not OPENROUTER_API_KEY:
     print("⚠️ OPENROUTER_API_KEY missing from .env")
 
 
+def ai_configured():
+    return bool(OPENROUTER_API_KEY)
+
+
+def get_openrouter_async_client():
+    """Shared AsyncOpenAI client for OpenRouter (the SDK is imported on first call), or None without a key."""
+    global _openrouter_async_client
+    if not OPENROUTER_API_KEY:
+        return None
+    if _openrouter_async_client is None:
+        with _lock:
+            if _openrouter_async_client is None:
+                from openai import AsyncOpenAI
+
+                _openrouter_async_client = AsyncOpenAI(base_url=OPENROUTER_BASE_URL, api_key=OPENROUTER_API_KEY)
+    return _openrouter_async_client
+
+
+async def close_clients():
+    """Close whatever was created (called on shutdown)."""
+    global _mongo_client, _openrouter_async_client
+    if _openrouter_async_client is not None:
+        await _openrouter_async_client.close()
+        _openrouter_async_client = None
+    if _mongo_client is not None:
+        _mongo_client.close()
+        _mongo_client = None
+
+
+AI_CHAT_MODEL = os.getenv("AI_CHAT_MODEL", "gpt-4o-mini")
+
+
+# --- Third-party base URLs (point these at loadtest/stubs.py for offline load tests) ---
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+LEETCODE_BASE_URL = os.getenv("LEETCODE_BASE_URL", "https://leetcode.com").rstrip("/")
+CODECHEF_BASE_URL = os.getenv("CODECHEF_BASE_URL", "https://www.codechef.com").rstrip("/")
+
+
 # --- GitHub Token ---
 GITHUB_TOKEN_ENV = os.getenv("GITHUB_TOKEN")
 if not GITHUB_TOKEN_ENV:
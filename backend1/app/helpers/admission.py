@@ -0,0 +1,168 @@
+# app/helpers/admission.py
+# Admission control for LLM-bound endpoints.
+# A fixed number of concurrent slots is shared by all LLM work in this worker.
+# Waiting requests sit in per-priority queues that are drained by smooth weighted
+# round robin (interactive work gets most slots, bulk work is never starved).
+# When a priority's queue is full the request is rejected immediately with 429 + Retry-After.
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+
+from app.helpers.llm_usage import LLM_USER_DAILY_TOKEN_QUOTA, current_user, quota_exceeded
+from app.helpers.metrics import counter, gauge, histogram
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "8"))
+ADMISSION_WEIGHTS = {"interactive": 4, "bulk": 1}
+ADMISSION_MAX_QUEUE = {
+    "interactive": int(os.getenv("ADMISSION_MAX_QUEUE_INTERACTIVE", "32")),
+    "bulk": int(os.getenv("ADMISSION_MAX_QUEUE_BULK", "8")),
+}
+
+QUEUE_WAIT = histogram("admission_queue_wait_seconds", "Time spent waiting for an LLM slot", ["priority"])
+REJECTED = counter("admission_rejected_total", "Requests rejected because the queue was full", ["priority"])
+QUEUE_DEPTH = gauge("admission_queue_depth", "Requests waiting for an LLM slot", ["priority"])
+ACTIVE = gauge("admission_active_slots", "LLM slots currently in use")
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, priority, retry_after):
+        super().__init__(f"{priority} queue is full")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """A held slot. release() is idempotent so it can be called from several cleanup paths."""
+
+    def __init__(self, controller):
+        self._controller = controller
+        self._acquired_at = time.perf_counter()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.perf_counter() - self._acquired_at)
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent=ADMISSION_MAX_CONCURRENT, weights=None, max_queue=None):
+        self.max_concurrent = max_concurrent
+        self.weights = dict(weights or ADMISSION_WEIGHTS)
+        self.max_queue = dict(max_queue or ADMISSION_MAX_QUEUE)
+        self._queues = {p: deque() for p in self.weights}
+        self._credits = {p: 0 for p in self.weights}
+        self._active = 0
+        self._avg_hold = 5.0  # seconds, EWMA of slot hold time (for Retry-After)
+
+    # ---- public API ----
+    async def acquire(self, priority="interactive", enforce_limit=True):
+        """
+        Wait for a slot. Raises AdmissionRejected when the priority's queue is full
+        (pass enforce_limit=False for follow-up work of an already admitted request).
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority: {priority}")
+        started = time.perf_counter()
+
+        if self._active < self.max_concurrent and not any(self._queues.values()):
+            self._active += 1
+            ACTIVE.set(self._active)
+            QUEUE_WAIT.observe(0.0, priority=priority)
+            return AdmissionTicket(self)
+
+        queue = self._queues[priority]
+        if enforce_limit and len(queue) >= self.max_queue.get(priority, 0):
+            REJECTED.inc(priority=priority)
+            raise AdmissionRejected(priority, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        QUEUE_DEPTH.set(len(queue), priority=priority)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(None)  # the slot was handed to us just before cancellation
+            elif waiter in queue:
+                queue.remove(waiter)
+                QUEUE_DEPTH.set(len(queue), priority=priority)
+            raise
+        QUEUE_WAIT.observe(time.perf_counter() - started, priority=priority)
+        return AdmissionTicket(self)
+
+    def retry_after(self):
+        """Seconds until a queued request is likely to get a slot."""
+        queued = sum(len(q) for q in self._queues.values())
+        return max(1, math.ceil(self._avg_hold * (queued + 1) / max(self.max_concurrent, 1)))
+
+    def state(self):
+        return {
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "queued": {p: len(q) for p, q in self._queues.items()},
+        }
+
+    # ---- internals ----
+    def _release(self, held_seconds):
+        if held_seconds is not None:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held_seconds
+        waiter = self._next_waiter()
+        if waiter is not None:
+            waiter.set_result(None)  # hand the slot over; _active is unchanged
+        else:
+            self._active -= 1
+            ACTIVE.set(self._active)
+
+    def _next_waiter(self):
+        while True:
+            ready = [p for p, q in self._queues.items() if q]
+            if not ready:
+                return None
+            # smooth weighted round robin across non-empty queues
+            total = sum(self.weights[p] for p in ready)
+            for p in ready:
+                self._credits[p] += self.weights[p]
+            chosen = max(ready, key=lambda p: self._credits[p])
+            self._credits[chosen] -= total
+            waiter = self._queues[chosen].popleft()
+            QUEUE_DEPTH.set(len(self._queues[chosen]), priority=chosen)
+            if not waiter.done():
+                return waiter
+
+
+admission = AdmissionController()
+
+
+# -------------------------
+# FastAPI helpers
+# -------------------------
+async def admit(priority="interactive"):
+    """Acquire a slot or raise HTTP 429 with Retry-After (also when the user is over the daily token quota)."""
+    if LLM_USER_DAILY_TOKEN_QUOTA and current_user() and await asyncio.to_thread(quota_exceeded, current_user()):
+        raise HTTPException(status_code=429, detail="Daily AI token quota reached, please try again tomorrow")
+    try:
+        return await admission.acquire(priority)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@asynccontextmanager
+async def admitted(priority="interactive"):
+    """`async with admitted("interactive"):` around LLM-bound work in a route."""
+    ticket = await admit(priority)
+    try:
+        yield ticket
+    finally:
+        ticket.release()
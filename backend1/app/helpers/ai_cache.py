@@ -0,0 +1,132 @@
+# app/helpers/ai_cache.py
+# Exact-match response cache for AI calls.
+# Key = sha256(model, system prompt, normalized user prompt, compacted context).
+# An in-memory LRU (with per-entry TTL) sits in front of the Mongo `ai_cache` collection.
+# Async callers use aget()/aset(): Mongo reads run in a thread, writes are write-behind.
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo.errors import PyMongoError
+from app.helpers.metrics import counter
+
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "2000"))
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", str(24 * 60 * 60)))  # seconds
+
+CACHE_LOOKUPS = counter("ai_cache_lookups_total", "AI response cache lookups", ["kind", "result"])
+
+
+def normalize_prompt(text: str):
+    return " ".join(str(text or "").split()).lower()
+
+
+def cache_key(model: str, system: str, user_prompt: str, context=""):
+    if not isinstance(context, str):
+        context = json.dumps(context, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    payload = json.dumps([model, system, normalize_prompt(user_prompt), context], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def messages_cache_key(model: str, messages: list):
+    """Key for a chat message list: system prompt, final user prompt and everything in between as context."""
+    system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+    body = messages[1:] if system else messages
+    return cache_key(model, system, body[-1]["content"] if body else "", body[:-1])
+
+
+class ResponseCache:
+    def __init__(self, max_entries=AI_CACHE_MAX_ENTRIES, ttl_seconds=AI_CACHE_TTL, collection=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection = None
+        self._entries = OrderedDict()  # key -> (expires_at_ts, value)
+        self._writes = set()  # pending write-behind tasks (kept referenced)
+        if collection is not None:
+            self.attach(collection)
+
+    def attach(self, collection):
+        """Back the in-memory LRU with `collection` (memory-only until Mongo is reachable)."""
+        try:
+            collection.create_index("expires_at", expireAfterSeconds=0, name="expires_at_ttl")
+        except PyMongoError as e:
+            print("⚠️ Could not create ai_cache TTL index:", e)
+        self.collection = collection
+
+    def get(self, key: str, kind: str = "chat"):
+        value = self._memory_get(key, kind)
+        if value is None:
+            value = self._store_get(key, kind)
+        return value
+
+    async def aget(self, key: str, kind: str = "chat"):
+        """get() for async code: the Mongo lookup runs in a thread, never on the event loop."""
+        value = self._memory_get(key, kind)
+        if value is None:
+            value = await asyncio.to_thread(self._store_get, key, kind)
+        return value
+
+    def set(self, key: str, value, ttl_seconds: int = None, kind: str = "chat"):
+        ttl = ttl_seconds or self.ttl_seconds
+        self._remember(key, value, ttl)
+        self._store_set(key, value, ttl, kind)
+
+    def aset(self, key: str, value, ttl_seconds: int = None, kind: str = "chat"):
+        """set() for async code: memory now, Mongo write-behind in a thread."""
+        ttl = ttl_seconds or self.ttl_seconds
+        self._remember(key, value, ttl)
+        if self.collection is not None:
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._store_set, key, value, ttl, kind))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    def _memory_get(self, key, kind):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                CACHE_LOOKUPS.inc(kind=kind, result="memory_hit")
+                return entry[1]
+            self._entries.pop(key, None)
+        return None
+
+    def _store_get(self, key, kind):
+        if self.collection is not None:
+            try:
+                doc = self.collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+            except PyMongoError as e:
+                print("⚠️ ai_cache read failed:", e)
+                doc = None
+            if doc:
+                remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+                self._remember(key, doc["value"], remaining)
+                CACHE_LOOKUPS.inc(kind=kind, result="store_hit")
+                return doc["value"]
+
+        CACHE_LOOKUPS.inc(kind=kind, result="miss")
+        return None
+
+    def _store_set(self, key, value, ttl, kind):
+        if self.collection is None:
+            return
+        try:
+            self.collection.replace_one(
+                {"_id": key},
+                {"value": value, "kind": kind, "expires_at": datetime.utcnow() + timedelta(seconds=ttl)},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            print("⚠️ ai_cache write failed:", e)
+
+    def _remember(self, key, value, ttl):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache()  # collection attached on startup
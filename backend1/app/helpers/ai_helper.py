@@ -0,0 +1,237 @@
+# app/helpers/ai_helper.py
+# In-process AI services (career chat + role detection) shared by the routes.
+# Routes call these directly instead of going through HTTP to /ai/chat.
+
+import asyncio
+import json
+import time
+
+from app.config import AI_CHAT_MODEL, get_openrouter_async_client
+from app.helpers.ai_cache import messages_cache_key, response_cache
+from app.helpers.llm_usage import record_llm_call
+from app.helpers.metrics import counter, histogram
+from app.helpers.prompt_builder import compact_json, compact_resume_context
+from app.helpers.tracing import record_span, span, traced
+
+CHAT_SYSTEM_PROMPT = "Be clear, concise, and helpful."
+ROLE_SYSTEM_PROMPT = "You are a career AI assistant. Return valid JSON only. Do not include commentary."
+ROLE_CACHE_TTL = 7 * 24 * 60 * 60  # role suggestions only depend on the resume data
+ROLE_TIMEOUT_SECONDS = 30
+
+CHAT_TTFT = histogram("ai_chat_ttft_seconds", "Time to first streamed token for AI chat", ["model"])
+CHAT_STREAM_DURATION = histogram("ai_chat_stream_seconds", "Total duration of streamed AI chat replies", ["model", "outcome"])
+CHAT_STREAMS = counter("ai_chat_streams_total", "Streamed AI chat replies by outcome", ["model", "outcome"])
+
+
+class AIServiceError(Exception):
+    """Raised when the AI backend is not configured or the call fails."""
+
+
+def _require_client():
+    client = get_openrouter_async_client()
+    if not client:
+        raise AIServiceError("AI client not configured (missing OPENROUTER_API_KEY).")
+    return client
+
+
+# -------------------------
+# Career chat
+# -------------------------
+def build_chat_prompt(query: str, resume_data: dict):
+    return f"""
+        You are a career AI assistant. 
+        Use the following resume data to provide helpful, accurate, and personalized career advice.
+
+        Resume Data:
+        {compact_resume_context(resume_data)}
+
+        User Question:
+        {query}
+        """
+
+
+def build_chat_messages(query: str, resume_data: dict = None, session: dict = None):
+    """Chat messages for a one-off question, or for a turn inside a server-side session."""
+    if session is None:
+        return [
+            {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+            {"role": "user", "content": build_chat_prompt(query, resume_data)},
+        ]
+
+    context = (
+        "You are a career AI assistant. Use this resume data to give helpful, accurate, "
+        f"and personalized career advice.\nResume Data: {session['context']}"
+    )
+    if session.get("history"):
+        context += f"\nEarlier in this conversation (truncated):\n{session['history']}"
+    messages = [{"role": "system", "content": f"{CHAT_SYSTEM_PROMPT}\n{context}"}]
+    for turn in session.get("turns", []):
+        messages.append({"role": "user", "content": turn["q"]})
+        messages.append({"role": "assistant", "content": turn["a"]})
+    messages.append({"role": "user", "content": query})
+    return messages
+
+
+async def chat_completion(query: str, resume_data: dict = None, session: dict = None, use_cache: bool = True):
+    """Answer a resume-based career question. Returns the answer text."""
+    client = _require_client()
+    messages = build_chat_messages(query, resume_data, session)
+    key = messages_cache_key(AI_CHAT_MODEL, messages)
+    if use_cache:
+        cached = await response_cache.aget(key, kind="chat")
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
+    try:
+        with span("llm", model=AI_CHAT_MODEL, kind="chat"):
+            response = await client.chat.completions.create(
+                model=AI_CHAT_MODEL,
+                messages=messages,
+                temperature=0.3,
+            )
+    except Exception:
+        record_llm_call("chat", AI_CHAT_MODEL, started, outcome="error")
+        raise
+    answer = (response.choices[0].message.content or "").strip()
+    record_llm_call("chat", AI_CHAT_MODEL, started, response.usage, messages=messages, completion_text=answer)
+    if answer:
+        response_cache.aset(key, answer, kind="chat")
+    return answer
+
+
+async def stream_chat_completion(query: str, resume_data: dict = None, stats: dict = None,
+                                 session: dict = None, use_cache: bool = True):
+    """
+    Async generator yielding answer text deltas as the model emits them.
+    Closing the generator (client disconnect) closes the upstream HTTP stream.
+    If `stats` is given it is filled with ttft/total seconds and the outcome.
+    A cached answer is yielded as a single delta.
+    """
+    client = _require_client()
+    stats = stats if stats is not None else {}
+    started = time.perf_counter()
+    messages = build_chat_messages(query, resume_data, session)
+    key = messages_cache_key(AI_CHAT_MODEL, messages)
+    if use_cache:
+        cached = await response_cache.aget(key, kind="chat")
+        if cached is not None:
+            stats.update(ttft=time.perf_counter() - started, outcome="cached")
+            yield cached
+            stats["total"] = time.perf_counter() - started
+            return
+
+    outcome = "error"
+    parts = []
+    usage = None
+    try:
+        stream = await client.chat.completions.create(
+            model=AI_CHAT_MODEL,
+            messages=messages,
+            temperature=0.3,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+    except asyncio.CancelledError:
+        stats.update(total=time.perf_counter() - started, outcome="cancelled")
+        record_llm_call("chat_stream", AI_CHAT_MODEL, started, outcome="cancelled", messages=messages)
+        CHAT_STREAMS.inc(model=AI_CHAT_MODEL, outcome="cancelled")
+        raise
+    except Exception:
+        record_llm_call("chat_stream", AI_CHAT_MODEL, started, outcome="error")
+        raise
+    try:
+        async for chunk in stream:
+            usage = chunk.usage or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if "ttft" not in stats:
+                stats["ttft"] = time.perf_counter() - started
+                CHAT_TTFT.observe(stats["ttft"], model=AI_CHAT_MODEL)
+            parts.append(delta)
+            yield delta
+        outcome = "completed"
+        answer = "".join(parts).strip()
+        if answer:
+            response_cache.aset(key, answer, kind="chat")
+    except (GeneratorExit, asyncio.CancelledError):
+        # aclose() on disconnect, or the consuming task cancelled mid-stream
+        outcome = "cancelled"
+        raise
+    finally:
+        # aborts the upstream request when we stop early
+        await stream.close()
+        stats["total"] = time.perf_counter() - started
+        stats["outcome"] = outcome
+        CHAT_STREAM_DURATION.observe(stats["total"], model=AI_CHAT_MODEL, outcome=outcome)
+        record_span("llm", started, model=AI_CHAT_MODEL, kind="chat_stream")
+        record_llm_call("chat_stream", AI_CHAT_MODEL, started, usage,
+                        outcome="ok" if outcome == "completed" else outcome,
+                        messages=messages, completion_text="".join(parts))
+        CHAT_STREAMS.inc(model=AI_CHAT_MODEL, outcome=outcome)
+
+
+# -------------------------
+# Role detection + missing skills
+# -------------------------
+def build_role_prompt(structured_info: dict):
+    technical_skills = (structured_info or {}).get("skills", {}).get("technical", [])
+    skills_text = ", ".join(technical_skills) if technical_skills else "None"
+    return (
+        "Analyze this candidate's resume data and determine their most suitable job role "
+        "based on their skills, education, and experience.\n\n"
+        f"Resume technical skills: {skills_text}\n"
+        f"Resume data: {compact_json(structured_info)}\n\n"
+        "Return JSON only, in exactly this shape:\n"
+        '{"role": "<predicted role>", "missing_skills": ["<5-8 new or complementary skills>"]}\n\n'
+        "Example:\n"
+        '{"role": "Data Analyst", "missing_skills": ["Power BI", "SQL", "Pandas", "Data Visualization", "Excel", "Tableau"]}'
+    )
+
+
+@traced("json_parse")
+def parse_role_response(raw: str):
+    """Parse the structured role/skills JSON; tolerant of code fences."""
+    cleaned = (raw or "").strip().replace("```json", "").replace("```", "").strip()
+    data = json.loads(cleaned)
+    role = str(data.get("role") or "Unknown").strip() or "Unknown"
+    skills = data.get("missing_skills") or []
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    return {"role": role, "missing_skills": [str(s).strip() for s in skills if str(s).strip()]}
+
+
+async def detect_role_and_skills(structured_info: dict, use_cache: bool = True):
+    """Predict the best-fit role and 5-8 missing skills as {"role", "missing_skills"}."""
+    client = _require_client()
+    messages = [
+        {"role": "system", "content": ROLE_SYSTEM_PROMPT},
+        {"role": "user", "content": build_role_prompt(structured_info)},
+    ]
+    key = messages_cache_key(AI_CHAT_MODEL, messages)
+    if use_cache:
+        cached = await response_cache.aget(key, kind="role")
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
+    try:
+        with span("llm", model=AI_CHAT_MODEL, kind="role"):
+            # overall deadline, SDK retries included
+            response = await asyncio.wait_for(client.chat.completions.create(
+                model=AI_CHAT_MODEL,
+                messages=messages,
+                response_format={"type": "json_object"},
+                temperature=0.3,
+            ), ROLE_TIMEOUT_SECONDS)
+    except Exception:
+        record_llm_call("role", AI_CHAT_MODEL, started, outcome="error")
+        raise
+    raw = response.choices[0].message.content
+    record_llm_call("role", AI_CHAT_MODEL, started, response.usage, messages=messages, completion_text=raw)
+    result = parse_role_response(raw)
+    response_cache.aset(key, result, ttl_seconds=ROLE_CACHE_TTL, kind="role")
+    return result
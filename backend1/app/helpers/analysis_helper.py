@@ -0,0 +1,185 @@
+# app/helpers/analysis_helper.py
+# Versioned resume analyses stored outside the `users` collection.
+# A user document only keeps auth/profile fields plus a small `latest_analysis` pointer.
+
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+from app.helpers.tracing import traced
+from app.helpers.user_helper import email_filter, normalize_email
+
+# Bulky fields that used to live on the user document
+LEGACY_ANALYSIS_FIELDS = [
+    "resume_filename", "structured_info", "ats_score", "ats_breakdown",
+    "word_count", "suggested_skills", "detected_role", "last_uploaded",
+]
+
+# Projections used by the hot read paths
+LOGIN_PROJECTION = {"password": 1, "role": 1}
+PUBLIC_USER_PROJECTION = {"password": 0, "email_normalized": 0, **{f: 0 for f in LEGACY_ANALYSIS_FIELDS}}
+
+
+# -------------------------
+# Serialization
+# -------------------------
+def serialize_user(doc):
+    """Make a user document JSON-safe (ObjectIds → str)."""
+    if not doc:
+        return doc
+    doc = dict(doc)
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    latest = doc.get("latest_analysis")
+    if isinstance(latest, dict) and "id" in latest:
+        doc["latest_analysis"] = {**latest, "id": str(latest["id"])}
+    return doc
+
+
+def serialize_analysis(doc):
+    if not doc:
+        return doc
+    doc = dict(doc)
+    for key in ("_id", "user_id"):
+        if key in doc:
+            doc[key] = str(doc[key])
+    return doc
+
+
+# -------------------------
+# Indexes
+# -------------------------
+def ensure_analysis_indexes(analyses):
+    """Per-user history is always read newest-first."""
+    try:
+        analyses.create_index(
+            [("user_id", ASCENDING), ("created_at", DESCENDING)],
+            name="user_id_created_at",
+        )
+    except PyMongoError as e:
+        print("⚠️ Could not create resume_analyses index:", e)
+
+
+# -------------------------
+# Writes
+# -------------------------
+@traced("db_write")
+def save_resume_analysis(users, analyses, email, analysis: dict, created_at=None):
+    """
+    Insert a new analysis version for the user (creating the user if needed)
+    and move the user's `latest_analysis` pointer to it.
+    Returns the stored analysis document.
+    """
+    user = users.find_one_and_update(
+        email_filter(email),
+        {"$setOnInsert": {"email": normalize_email(email)}},
+        projection={"_id": 1, "email": 1, "latest_analysis": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return _record_analysis(users, analyses, user, analysis, created_at)
+
+
+def _record_analysis(users, analyses, user, analysis: dict, created_at=None, legacy=False):
+    created_at = created_at or datetime.utcnow()
+    previous = (user.get("latest_analysis") or {}).get("version", 0)
+
+    doc = {
+        **analysis,
+        "user_id": user["_id"],
+        "email_normalized": normalize_email(user.get("email")),
+        "version": previous + 1,
+        "created_at": created_at,
+    }
+    if legacy:
+        # at most one migrated copy per user, even if an earlier run stopped before the user update
+        doc["migrated_from_user"] = True
+        doc = analyses.find_one_and_update(
+            {"user_id": user["_id"], "migrated_from_user": True},
+            {"$setOnInsert": doc},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    else:
+        doc["_id"] = analyses.insert_one(doc).inserted_id
+
+    users.update_one(
+        {"_id": user["_id"]},
+        {
+            "$set": {
+                "latest_analysis": {
+                    "id": doc["_id"],
+                    "version": doc["version"],
+                    "ats_score": doc.get("ats_score", 0),
+                    "detected_role": doc.get("detected_role", "Unknown"),
+                    "created_at": created_at,
+                }
+            },
+            "$unset": {f: "" for f in LEGACY_ANALYSIS_FIELDS},
+        },
+    )
+    return doc
+
+
+# -------------------------
+# Reads
+# -------------------------
+def get_latest_analysis(users, analyses, email):
+    """Return (user, latest analysis) — analysis is None if the user never uploaded."""
+    user = users.find_one(email_filter(email), {"_id": 1, "latest_analysis": 1})
+    if not user:
+        return None, None
+    latest = user.get("latest_analysis") or {}
+    if not latest.get("id"):
+        return user, None
+    return user, analyses.find_one({"_id": latest["id"]})
+
+
+def list_analyses(analyses, user_id, limit: int = 20):
+    """Lightweight ATS history for one user, newest first."""
+    cursor = analyses.find(
+        {"user_id": user_id},
+        {"version": 1, "created_at": 1, "ats_score": 1, "detected_role": 1, "resume_filename": 1},
+    ).sort("created_at", DESCENDING).limit(limit)
+    return [serialize_analysis(doc) for doc in cursor]
+
+
+# -------------------------
+# Migration: move legacy resume fields out of `users`
+# -------------------------
+def migrate_user_analyses(users, analyses):
+    """
+    Copy legacy per-user resume fields into `resume_analyses` (idempotent: the copy is
+    upserted on user_id + migrated_from_user, so a re-run after a crash reuses it).
+    """
+    moved = 0
+    cursor = users.find(
+        {"structured_info": {"$exists": True}},
+        {"_id": 1, "email": 1, "latest_analysis": 1, **{f: 1 for f in LEGACY_ANALYSIS_FIELDS}},
+    )
+    for user in cursor:
+        legacy = {f: user[f] for f in LEGACY_ANALYSIS_FIELDS if f in user and f != "last_uploaded"}
+        created_at = datetime.utcnow()
+        if user.get("last_uploaded"):
+            try:
+                created_at = datetime.fromisoformat(str(user["last_uploaded"]))
+            except ValueError:
+                pass
+        _record_analysis(users, analyses, user, legacy, created_at=created_at, legacy=True)
+        moved += 1
+    return moved
+
+
+# -------------------------
+# CLI: python -m app.helpers.analysis_helper
+# -------------------------
+if __name__ == "__main__":
+    from app.config import get_db
+
+    auth_db = get_db()
+
+    analyses_collection = auth_db["resume_analyses"]
+    ensure_analysis_indexes(analyses_collection)
+    count = migrate_user_analyses(auth_db["users"], analyses_collection)
+    print(f"✅ Moved resume data for {count} users into resume_analyses")
@@ -0,0 +1,133 @@
+# app/helpers/archive_ingest.py
+# Read resumes out of an uploaded ZIP / tar archive one member at a time.
+# Each member is copied in small chunks into its own spooled temp file, so memory
+# use does not grow with the number of resumes. Sizes are counted while copying
+# (archive headers are not trusted) to stop zip bombs early.
+
+import asyncio
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "5000"))
+ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("ARCHIVE_MAX_MEMBER_BYTES", str(10 * 1024 * 1024)))
+ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv("ARCHIVE_MAX_TOTAL_BYTES", str(1024 * 1024 * 1024)))
+ARCHIVE_MAX_RATIO = int(os.getenv("ARCHIVE_MAX_RATIO", "100"))  # uncompressed / compressed, per ZIP member
+
+COPY_CHUNK_BYTES = 64 * 1024
+SPOOL_MEMORY_BYTES = 1024 * 1024  # members larger than this spill to disk
+RESUME_EXTENSIONS = (".pdf",)
+
+
+class ArchiveError(Exception):
+    """The archive is unreadable or exceeds a limit; the whole upload is rejected."""
+
+
+def is_archive(filename: str):
+    name = (filename or "").lower()
+    return name.endswith((".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz"))
+
+
+def _copy_limited(src, limit):
+    """Copy `src` into a spooled temp file, at most `limit` bytes. Returns (file, size) or (None, size)."""
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    size = 0
+    while True:
+        chunk = src.read(COPY_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > limit:
+            out.close()
+            return None, size
+        out.write(chunk)
+    out.seek(0)
+    return out, size
+
+
+def _zip_entries(fileobj):
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Not a valid ZIP file: {e}")
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            if info.flag_bits & 0x1:
+                yield info.filename, None, "encrypted"
+                continue
+            if info.compress_size and info.file_size / info.compress_size > ARCHIVE_MAX_RATIO:
+                yield info.filename, None, "suspicious compression ratio"
+                continue
+            with archive.open(info) as src:
+                yield info.filename, src, None
+
+
+def _tar_entries(fileobj):
+    try:
+        # "r|*" = sequential stream mode: members are read in order, never seeked
+        archive = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.TarError as e:
+        raise ArchiveError(f"Not a valid tar archive: {e}")
+    with archive:
+        for info in archive:
+            if info.isdir():
+                continue
+            if not info.isfile():
+                yield info.name, None, "not a regular file"
+                continue
+            yield info.name, archive.extractfile(info), None
+
+
+def iter_archive_members(fileobj, filename: str):
+    """
+    Yield one dict per archive member:
+    {"filename", "file", "size"} for resumes (caller must close "file"), or
+    {"filename", "skipped": reason} for members that were not read.
+    Raises ArchiveError when the archive itself is invalid or too large.
+    """
+    entries = _zip_entries(fileobj) if (filename or "").lower().endswith(".zip") else _tar_entries(fileobj)
+    members = 0
+    total = 0
+    for name, src, skipped in entries:
+        members += 1
+        if members > ARCHIVE_MAX_MEMBERS:
+            raise ArchiveError(f"Archive has more than {ARCHIVE_MAX_MEMBERS} members")
+        basename = os.path.basename(name.replace("\\", "/"))  # never use paths from the archive
+        if skipped is None and not basename.lower().endswith(RESUME_EXTENSIONS):
+            skipped = "not a PDF"
+        if skipped:
+            yield {"filename": basename or name, "skipped": skipped}
+            continue
+
+        spooled, size = _copy_limited(src, min(ARCHIVE_MAX_MEMBER_BYTES, ARCHIVE_MAX_TOTAL_BYTES - total))
+        total += size
+        if spooled is None:
+            if total >= ARCHIVE_MAX_TOTAL_BYTES:
+                raise ArchiveError(f"Archive expands to more than {ARCHIVE_MAX_TOTAL_BYTES} bytes")
+            yield {"filename": basename, "skipped": f"larger than {ARCHIVE_MAX_MEMBER_BYTES} bytes"}
+            continue
+        yield {"filename": basename, "file": spooled, "size": size}
+
+
+async def aiter_archive_members(fileobj, filename: str):
+    """Async version of iter_archive_members; archive reads run in a worker thread."""
+    members = iter_archive_members(fileobj, filename)
+    done = object()
+    try:
+        while True:
+            member = await asyncio.to_thread(next, members, done)
+            if member is done:
+                return
+            yield member
+    finally:
+        members.close()
+
+
+def copy_member_to(member, path):
+    """Write a spooled member to `path` and close it."""
+    with member["file"] as src, open(path, "wb") as out:
+        shutil.copyfileobj(src, out, COPY_CHUNK_BYTES)
@@ -0,0 +1,168 @@
+# app/helpers/chat_sessions.py
+# Server-side AI chat sessions: the resume context is compacted once and kept here,
+# so follow-up /ai/chat calls only send {session_id, query}.
+# Hot sessions live in a bounded LRU (with TTL); every update is also written to
+# Mongo so sessions evicted from memory (or served by another worker) can be reloaded.
+# Async routes use aget()/acreate()/asave(), which run the Mongo calls in a thread.
+# Older turns are not summarized: they are kept as a truncated history (each Q/A cut
+# to TURN_SNIPPET_CHARS, the whole history to MAX_HISTORY_CHARS, oldest dropped first).
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo.errors import PyMongoError
+
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "1000"))
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", str(6 * 60 * 60)))  # seconds
+
+MAX_RECENT_TURNS = 4        # verbatim turns sent with every prompt
+MAX_HISTORY_CHARS = 1500    # truncated history of older turns
+TURN_SNIPPET_CHARS = 200    # per question / answer in that history
+
+
+# -------------------------
+# Truncated history of older turns
+# -------------------------
+def _snippet(text: str, limit: int = TURN_SNIPPET_CHARS):
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def add_turn(session: dict, query: str, answer: str):
+    """Append a Q/A turn; turns beyond MAX_RECENT_TURNS move, truncated, into the history."""
+    session["turns"].append({"q": query, "a": answer})
+    while len(session["turns"]) > MAX_RECENT_TURNS:
+        old = session["turns"].pop(0)
+        line = f"- Q: {_snippet(old['q'])} → A: {_snippet(old['a'])}"
+        history = (session.get("history", "") + "\n" + line).strip()
+        if len(history) > MAX_HISTORY_CHARS:
+            # keep the most recent part of the history
+            history = history[-MAX_HISTORY_CHARS:].split("\n", 1)[-1]
+        session["history"] = history
+    session["updated_at"] = time.time()
+
+
+# -------------------------
+# Store
+# -------------------------
+class ChatSessionStore:
+    """LRU + TTL bounded session cache in front of an optional Mongo collection."""
+
+    def __init__(self, max_sessions=CHAT_SESSION_MAX, ttl_seconds=CHAT_SESSION_TTL, collection=None):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.collection = None
+        self._sessions = OrderedDict()
+        if collection is not None:
+            self.attach(collection)
+
+    def attach(self, collection):
+        """Start persisting to `collection` (memory-only until Mongo is reachable, see lifecycle.py)."""
+        try:
+            collection.create_index("expires_at", expireAfterSeconds=0, name="expires_at_ttl")
+        except PyMongoError as e:
+            print("⚠️ Could not create chat_sessions TTL index:", e)
+        self.collection = collection
+
+    def _expired(self, session):
+        return time.time() - session["updated_at"] > self.ttl_seconds
+
+    def create(self, context: str, persist=True):
+        session = {
+            "id": uuid.uuid4().hex,
+            "context": context,
+            "history": "",
+            "turns": [],
+            "updated_at": time.time(),
+        }
+        if persist:
+            self.save(session)
+        return session
+
+    def get(self, session_id: str):
+        session = self._sessions.get(session_id)
+        if session is not None:
+            if self._expired(session):
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+        session = self._load(session_id)
+        if session is not None and not self._expired(session):
+            self._remember(session)
+            return session
+        return None
+
+    def save(self, session: dict):
+        self._remember(session)
+        self._persist(session)
+
+    # ---- async variants (Mongo calls in a thread) ----
+    async def aget(self, session_id: str):
+        session = self._sessions.get(session_id)
+        if session is not None or self.collection is None:
+            return self.get(session_id)
+        session = await asyncio.to_thread(self._load, session_id)
+        if session is not None and not self._expired(session):
+            self._remember(session)
+            return session
+        return None
+
+    async def acreate(self, context: str):
+        session = self.create(context, persist=False)
+        await self.asave(session)
+        return session
+
+    async def asave(self, session: dict):
+        self._remember(session)
+        if self.collection is not None:
+            await asyncio.to_thread(self._persist, session)
+
+    def _remember(self, session: dict):
+        self._sessions[session["id"]] = session
+        self._sessions.move_to_end(session["id"])
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+        if self.collection is not None:
+            try:
+                self.collection.delete_one({"_id": session_id})
+            except PyMongoError as e:
+                print("⚠️ chat_sessions delete failed:", e)
+
+    # ---- Mongo persistence ----
+    def _persist(self, session):
+        if self.collection is None:
+            return
+        try:
+            doc = {k: v for k, v in session.items() if k != "id"}
+            doc["expires_at"] = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            self.collection.replace_one({"_id": session["id"]}, doc, upsert=True)
+        except PyMongoError as e:
+            print("⚠️ chat_sessions write failed:", e)
+
+    def _load(self, session_id):
+        if self.collection is None:
+            return None
+        try:
+            doc = self.collection.find_one({"_id": session_id})
+        except PyMongoError as e:
+            print("⚠️ chat_sessions load failed:", e)
+            return None
+        if not doc:
+            return None
+        doc["id"] = doc.pop("_id")
+        doc.pop("expires_at", None)
+        if "summary" in doc:  # sessions stored before the field was renamed
+            doc["history"] = doc.pop("summary")
+        return doc
+
+
+session_store = ChatSessionStore()  # collection attached on startup
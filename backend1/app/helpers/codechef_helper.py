@@ -3,7 +3,8 @@
 
 import re
 import requests
-from bs4 import BeautifulSoup
+
+from app.helpers.tracing import traced
 
 def is_valid_topic(text):
     """Filter out invalid or irrelevant topic names."""
@@ -20,6 +21,7 @@ def is_valid_topic(text):
     return True
 
 
+@traced("fetch_codechef")
 def extract_codechef_paths_and_badges(profile_url: str):
     """Scrape CodeChef profile for paths, badges, and stats (rating, ranks, total solved)."""
     headers = {"User-Agent": "Mozilla/5.0", "Accept-Language": "en-US,en;q=0.9"}
@@ -27,9 +29,17 @@ def extract_codechef_paths_and_badges(profile_url: str):
         resp = requests.get(profile_url, headers=headers, timeout=12)
         if resp.status_code != 200:
             return {"error": f"Failed to access CodeChef (status {resp.status_code})"}
-        soup = BeautifulSoup(resp.content, "html.parser")
     except Exception as e:
         return {"error": f"Request failed: {str(e)}"}
+    return parse_codechef_profile(resp.content, profile_url)
+
+
+def parse_codechef_profile(soup, profile_url: str):
+    """Paths, badges and stats from a CodeChef profile page (BeautifulSoup or raw HTML)."""
+    from bs4 import BeautifulSoup  # deferred: only CodeChef requests pay for the import
+
+    if not isinstance(soup, BeautifulSoup):
+        soup = BeautifulSoup(soup, "html.parser")
 
     # -------- extract Learning & Practice Paths --------
     def extract_path_topics_with_percentage(soup, section_title):
@@ -0,0 +1,133 @@
+# app/helpers/compression.py
+# Response compression (brotli when the client accepts it and the package is installed,
+# gzip otherwise) for large JSON bodies: /analyze_all, activity graphs, /user/all.
+# Small bodies (< COMPRESS_MIN_BYTES) go out as-is. Server-Sent Events are never
+# compressed: the encoder would hold events back until its buffer fills. Other
+# streamed bodies (NDJSON) are compressed chunk by chunk with a flush after each one.
+
+import gzip
+import os
+import zlib
+
+from app.helpers.metrics import counter
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))  # 4-5 is the usual sweet spot for dynamic content
+
+SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/pdf",
+                      "application/gzip")
+
+COMPRESSED_BYTES = counter("response_compression_bytes_total", "Response bytes before / after compression",
+                           ["encoding", "stage"])
+
+
+def choose_encoding(accept_encoding: str):
+    """"br", "gzip" or None for an Accept-Encoding header value (q=0 entries are refused)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class _StreamEncoder:
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.write = lambda data: self._c.process(data) + self._c.flush()
+            self.finish = self._c.finish
+        else:
+            self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+            self.write = lambda data: self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._c.flush
+
+
+class CompressionMiddleware:
+    """Pure ASGI (like TimingMiddleware): compresses eligible responses, never SSE."""
+
+    def __init__(self, app, minimum_size=COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None   # set once we decide to compress
+        passthrough = False
+        raw_bytes = sent_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough, raw_bytes, sent_bytes
+            if message["type"] == "http.response.start":
+                response_headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1").lower()
+                if (b"content-encoding" in response_headers
+                        or any(content_type.startswith(t) for t in SKIP_CONTENT_TYPES)):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message  # held until the first body chunk shows the size
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = _StreamEncoder(encoding)
+                out_headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+                out_headers.append((b"content-encoding", encoding.encode()))
+                out_headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body:
+                    compressed = compress(body, encoding)
+                    out_headers.append((b"content-length", str(len(compressed)).encode()))
+                    await send({**start, "headers": out_headers})
+                    await send({"type": "http.response.body", "body": compressed})
+                    COMPRESSED_BYTES.inc(len(body), encoding=encoding, stage="raw")
+                    COMPRESSED_BYTES.inc(len(compressed), encoding=encoding, stage="sent")
+                    return
+                await send({**start, "headers": out_headers})
+
+            raw_bytes += len(body)
+            chunk = encoder.write(body) if body else b""
+            if not more_body:
+                chunk += encoder.finish()
+            sent_bytes += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if not more_body:
+                COMPRESSED_BYTES.inc(raw_bytes, encoding=encoding, stage="raw")
+                COMPRESSED_BYTES.inc(sent_bytes, encoding=encoding, stage="sent")
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,164 @@
+# app/helpers/dedupe.py
+# Near-duplicate resume detection (MinHash + LSH banding).
+# A resume's text is reduced to word 5-gram shingles and a 128-value MinHash signature;
+# the signature is cut into 16 bands of 8 rows and each band hash becomes a bucket key.
+# Resumes sharing any bucket are candidates, confirmed by the estimated Jaccard similarity.
+# Stored `reports` keep their signature + band keys (multikey index on lsh_bands),
+# so copies are found across batches as well as inside one.
+
+import hashlib
+import os
+import random
+import re
+import zlib
+
+from pymongo.errors import PyMongoError
+
+from app.helpers.metrics import counter
+
+DEDUPE_ENABLED = os.getenv("DEDUPE_ENABLED", "1") not in ("0", "false", "False")
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.85"))  # estimated Jaccard similarity
+DEDUPE_MAX_CANDIDATES = 20
+
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(20240601)  # fixed seed: signatures must be comparable across processes and restarts
+_PERMS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+DUPLICATES = counter("resume_duplicates_total", "Resumes answered from an earlier parse", ["source"])
+
+
+# -------------------------
+# Signatures
+# -------------------------
+def shingles(text: str):
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash_signature(text: str):
+    """128 MinHash values of the text's shingles, or None for empty text."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(text)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _MERSENNE for h in hashes) & 0xFFFFFFFF for a, b in _PERMS]
+
+
+def lsh_bands(signature):
+    """One bucket key per band ("<band>:<hash>")."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(a == b for a, b in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def content_hash(contents: bytes):
+    return hashlib.sha256(contents).hexdigest()
+
+
+def ensure_report_indexes(reports):
+    try:
+        reports.create_index("lsh_bands", name="lsh_bands")
+        reports.create_index("content_hash", name="content_hash", sparse=True)
+    except PyMongoError as e:
+        print("⚠️ Could not create reports dedupe indexes:", e)
+
+
+# -------------------------
+# Detector (one per bulk request / job)
+# -------------------------
+class DuplicateDetector:
+    """
+    Remembers resumes seen in the current request and looks up stored reports.
+    find() returns (match, similarity) where match is {"source": "batch", "key"} or
+    {"source": "reports", "report"}, or (None, 0) when the resume is new.
+    """
+
+    REPORT_PROJECTION = {"_id": 0, "filename": 1, "data": 1, "ats_score": 1, "ats_breakdown": 1,
+                         "word_count": 1, "minhash": 1}
+
+    def __init__(self, reports=None, threshold=DEDUPE_THRESHOLD):
+        self.reports = reports
+        self.threshold = threshold
+        self._hashes = {}     # content sha256 -> key
+        self._buckets = {}    # band key -> [key, ...]
+        self._signatures = {}
+        self._results = {}    # key -> (filename, parse result)
+
+    def find_exact(self, digest):
+        """Byte-identical file: no need to even open the PDF."""
+        if digest in self._hashes:
+            return {"source": "batch", "key": self._hashes[digest]}
+        if self.reports is not None:
+            try:
+                report = self.reports.find_one({"content_hash": digest}, self.REPORT_PROJECTION)
+                if report:
+                    return {"source": "reports", "report": report}
+            except PyMongoError as e:
+                print("⚠️ Dedupe lookup failed:", e)
+        return None
+
+    def find(self, signature):
+        if signature is None:
+            return None, 0
+        bands = lsh_bands(signature)
+
+        best, best_sim = None, 0
+        for key in {k for band in bands for k in self._buckets.get(band, ())}:
+            sim = similarity(signature, self._signatures[key])
+            if sim > best_sim:
+                best, best_sim = {"source": "batch", "key": key}, sim
+        if best_sim >= self.threshold:
+            return best, best_sim
+
+        if self.reports is not None:
+            try:
+                candidates = self.reports.find({"lsh_bands": {"$in": bands}}, self.REPORT_PROJECTION).limit(DEDUPE_MAX_CANDIDATES)
+                for report in candidates:
+                    sim = similarity(signature, report.get("minhash") or [])
+                    if sim > best_sim:
+                        best, best_sim = {"source": "reports", "report": report}, sim
+            except PyMongoError as e:
+                print("⚠️ Dedupe lookup failed:", e)
+        if best_sim >= self.threshold:
+            return best, best_sim
+        return None, 0
+
+    def add(self, key, signature=None, digest=None):
+        if digest:
+            self._hashes.setdefault(digest, key)
+        if signature is not None:
+            self._signatures[key] = signature
+            for band in lsh_bands(signature):
+                self._buckets.setdefault(band, []).append(key)
+
+    def remember(self, key, filename, result):
+        self._results[key] = (filename, result)
+
+    def reuse(self, match, sim):
+        """Result for a duplicate, copied from the earlier parse and flagged with `duplicate_of`."""
+        if match["source"] == "reports":
+            report = match["report"]
+            filename = report.get("filename")
+            base = {k: report.get(k) for k in ("data", "ats_score", "ats_breakdown", "word_count")}
+        else:
+            filename, base = self._results.get(match["key"], (None, None))
+            if base is None:
+                return {"error": "Duplicate of a resume that could not be parsed"}
+        if base.get("error"):
+            return base
+        DUPLICATES.inc(source=match["source"])
+        return {**base, "duplicate_of": {"source": match["source"], "filename": filename, "similarity": round(sim, 3)}}
@@ -0,0 +1,53 @@
+# app/helpers/fast_json.py
+# Fast JSON encoding for responses and SSE payloads.
+# orjson is used when installed (several times faster than the stdlib and emits bytes
+# directly); otherwise the stdlib encoder with compact separators is the fallback.
+# FastJSONResponse is the app's default_response_class (see app/main.py).
+
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value):
+    """Types neither encoder knows natively (sets from skill matching, ObjectId, ...)."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def dumps_bytes(value) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def dumps(value) -> str:
+    """Compact JSON as text (SSE `data:` lines, NDJSON rows)."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (stdlib fallback), compact and non-ASCII preserved."""
+
+    def render(self, content) -> bytes:
+        return dumps_bytes(content)
@@ -0,0 +1,342 @@
+# app/helpers/filter_jobs.py
+# Background jobs for bulk resume filtering.
+# Uploaded files are spooled to JOB_DIR/<job_id>/files and every job keeps a JSON
+# manifest (criteria, per-file state, shortlisted results) that is rewritten after
+# each batch. Unfinished jobs are picked up again on startup and only files still
+# "pending" are processed, so a restart or a closed browser tab never re-spends LLM calls.
+# With several server workers (run.py) each job is owned by one process through an
+# flock on its directory, so a restart resumes every job exactly once.
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: single worker process, no ownership locks needed
+    fcntl = None
+
+from app.helpers.admission import admission
+from app.helpers.archive_ingest import aiter_archive_members, copy_member_to, is_archive
+from app.helpers.llm_usage import attribute, current_user
+from app.helpers.metrics import counter
+from app.helpers.resume_filter import filter_parsed_resume
+from app.helpers.resume_helper import new_duplicate_detector, process_resume_batch
+
+JOB_DIR = os.getenv("FILTER_JOB_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "job_data"))
+JOB_WORKERS = int(os.getenv("FILTER_JOB_WORKERS", "2"))  # jobs processed concurrently per worker process
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+ACTIVE_STATES = ("queued", "running")
+
+JOB_FILES = counter("filter_job_files_total", "Files processed by background filter jobs", ["state"])
+
+
+class JobNotFound(Exception):
+    pass
+
+
+# -------------------------
+# Manifest on disk
+# -------------------------
+def _job_path(job_id, *parts):
+    if not JOB_ID_RE.match(job_id or ""):
+        raise JobNotFound(job_id)
+    return os.path.join(JOB_DIR, job_id, *parts)
+
+
+def _write_manifest(job):
+    """Atomic rewrite (tmp file + rename) so a crash never leaves a half-written manifest."""
+    path = _job_path(job["id"], "manifest.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f)
+    os.replace(tmp, path)
+
+
+def _read_manifest(job_id):
+    try:
+        with open(_job_path(job_id, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise JobNotFound(job_id)
+
+
+def _cancelled_on_disk(job_id):
+    """True when the manifest says cancelled (a DELETE may land on a worker that does not own the job)."""
+    try:
+        return _read_manifest(job_id)["status"] == "cancelled"
+    except (JobNotFound, ValueError, OSError):
+        return False
+
+
+def _claim(job_id):
+    """Lock file descriptor if this process now owns the job, None if another worker does.
+    The lock goes away with the process, so a crashed worker's jobs can be taken over."""
+    if fcntl is None:
+        return -1
+    fd = os.open(_job_path(job_id, "owner.lock"), os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _release(fd):
+    if fd is not None and fd >= 0:
+        os.close(fd)
+
+
+def job_summary(job, include_results=True):
+    """Public view of a job (no spool paths)."""
+    counts = {}
+    for f in job["files"]:
+        counts[f["state"]] = counts.get(f["state"], 0) + 1
+    summary = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "total": len(job["files"]),
+        "processed": len(job["results"]),
+        "completed_files": len(job["files"]) - counts.get("pending", 0),
+        "file_states": counts,
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+    if include_results:
+        summary["results"] = job["results"]
+    return summary
+
+
+# -------------------------
+# Job manager
+# -------------------------
+class FilterJobManager:
+    def __init__(self, workers=JOB_WORKERS):
+        self.workers = workers
+        self._jobs = {}        # job_id -> manifest (for jobs touched by this process)
+        self._changed = {}     # job_id -> asyncio.Event, replaced after every update
+        self._queue = None
+        self._tasks = []
+        self._owned = {}       # job_id -> lock fd (see _claim)
+
+    # ---- lifecycle ----
+    def start(self):
+        """Start the workers (idempotent) and re-queue jobs left unfinished by a previous run."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        os.makedirs(JOB_DIR, exist_ok=True)
+        for job_id in sorted(os.listdir(JOB_DIR)):
+            try:
+                job = _read_manifest(job_id)
+            except (JobNotFound, ValueError, OSError):
+                continue
+            if job["status"] in ACTIVE_STATES and job_id not in self._owned:
+                fd = _claim(job_id)
+                if fd is None:
+                    continue  # another worker process is running it
+                self._owned[job_id] = fd
+                print(f"ℹ️ Resuming filter job {job_id} ({sum(f['state'] == 'pending' for f in job['files'])} files left)")
+                job["status"] = "queued"
+                self._jobs[job_id] = job
+                self._queue.put_nowait(job_id)
+
+    def owns(self, job_id):
+        """True when this process runs the job (its progress events are pushed, not polled)."""
+        return job_id in self._owned
+
+    def worker_count(self):
+        return sum(1 for task in self._tasks if not task.done())
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---- public API ----
+    async def create_job(self, uploads, criteria, batch_size):
+        """
+        Spool the uploaded files to disk, write the manifest and queue the job.
+        ZIP / tar uploads are expanded member by member straight into the spool directory.
+        """
+        self.start()
+        job_id = uuid.uuid4().hex
+        files_dir = _job_path(job_id, "files")
+        os.makedirs(files_dir)
+        self._owned[job_id] = _claim(job_id)
+        files = []
+        try:
+            for upload in uploads:
+                if is_archive(upload.filename):
+                    async for member in aiter_archive_members(upload.file, upload.filename):
+                        index = len(files) + 1
+                        if member.get("skipped"):
+                            files.append({"index": index, "filename": member["filename"], "path": None,
+                                          "state": "skipped", "error": member["skipped"]})
+                            continue
+                        path = f"{index:05d}.bin"
+                        await asyncio.to_thread(copy_member_to, member, os.path.join(files_dir, path))
+                        files.append({"index": index, "filename": member["filename"], "path": path, "state": "pending"})
+                    continue
+
+                index = len(files) + 1
+                path = f"{index:05d}.bin"
+                with open(os.path.join(files_dir, path), "wb") as out:
+                    while True:
+                        chunk = await upload.read(SPOOL_CHUNK_BYTES)
+                        if not chunk:
+                            break
+                        out.write(chunk)
+                files.append({"index": index, "filename": upload.filename, "path": path, "state": "pending"})
+        except BaseException:
+            _release(self._owned.pop(job_id, None))
+            shutil.rmtree(_job_path(job_id), ignore_errors=True)
+            raise
+
+        now = time.time()
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "criteria": criteria,
+            "batch_size": batch_size,
+            "requested_by": current_user(),
+            "files": files,
+            "results": [],
+            "created_at": now,
+            "updated_at": now,
+        }
+        _write_manifest(job)
+        self._jobs[job_id] = job
+        self._queue.put_nowait(job_id)
+        return job
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        return job if job is not None else _read_manifest(job_id)
+
+    def change_event(self, job_id):
+        if job_id not in self._changed:
+            self._changed[job_id] = asyncio.Event()
+        return self._changed[job_id]
+
+    def cancel(self, job_id):
+        """Mark the job cancelled in its manifest; the owning process stops at its next batch."""
+        job = self.get(job_id)
+        if job["status"] in ACTIVE_STATES:
+            job["status"] = "cancelled"
+            self._save(job)
+            if self.owns(job_id):
+                self._cleanup_files(job)
+            else:
+                fd = _claim(job_id)
+                if fd is not None:  # nobody runs it: clean up here; otherwise the owner does
+                    self._cleanup_files(job)
+                    _release(fd)
+        return job
+
+    # ---- internals ----
+    def _save(self, job):
+        if job["status"] != "cancelled" and _cancelled_on_disk(job["id"]):
+            job["status"] = "cancelled"  # never overwrite another worker's cancel
+        job["updated_at"] = time.time()
+        _write_manifest(job)
+        event = self._changed.pop(job["id"], None)
+        if event is not None:
+            event.set()  # wake up every progress stream of this job
+
+    def _cleanup_files(self, job):
+        shutil.rmtree(_job_path(job["id"], "files"), ignore_errors=True)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self.get(job_id)
+                # LLM usage of the job is reported under its own id and the admin who queued it
+                with attribute(route="filter_job", user=job.get("requested_by"), job=job_id):
+                    await self._run(job)
+            except Exception as e:
+                print(f"❌ Filter job {job_id} crashed:", e)
+                try:
+                    job = self.get(job_id)
+                    job["status"] = "failed"
+                    job["error"] = str(e)
+                    self._save(job)
+                except JobNotFound:
+                    pass
+            finally:
+                _release(self._owned.pop(job_id, None))
+                self._queue.task_done()
+
+    def _stop_if_cancelled(self, job):
+        """Checked before each batch and each checkpoint: the cancel may come from another worker."""
+        if job["status"] != "cancelled" and _cancelled_on_disk(job["id"]):
+            job["status"] = "cancelled"
+        if job["status"] == "cancelled":
+            self._cleanup_files(job)
+            return True
+        return False
+
+    async def _run(self, job):
+        if job["status"] not in ACTIVE_STATES:
+            return
+        job["status"] = "running"
+        self._save(job)
+        pending = [f for f in job["files"] if f["state"] == "pending"]
+        batch_size = max(1, job["batch_size"])
+        detector = new_duplicate_detector()
+
+        for start in range(0, len(pending), batch_size):
+            if self._stop_if_cancelled(job):
+                return
+            chunk = pending[start:start + batch_size]
+            documents = []
+            for f in chunk:
+                try:
+                    with open(_job_path(job["id"], "files", f["path"]), "rb") as fh:
+                        documents.append({"id": str(f["index"]), "filename": f["filename"], "contents": fh.read()})
+                except OSError as e:
+                    f["state"], f["error"] = "failed", f"Spooled file missing: {e}"
+
+            ticket = await admission.acquire("bulk", enforce_limit=False)
+            try:
+                parsed_by_id = await process_resume_batch(documents, detector) if documents else {}
+            finally:
+                ticket.release()
+            if self._stop_if_cancelled(job):
+                return
+
+            # ---- checkpoint: record every file of the batch before moving on ----
+            for f in chunk:
+                if f["state"] != "pending":
+                    continue
+                parsed = parsed_by_id.get(str(f["index"]))
+                if not parsed or parsed.get("error"):
+                    f["state"] = "failed"
+                    f["error"] = (parsed or {}).get("error", "Parsing failed")
+                else:
+                    result = filter_parsed_resume(parsed, f["filename"], job["criteria"])
+                    f["state"] = "matched" if result else "rejected"
+                    if parsed.get("duplicate_of"):
+                        f["duplicate_of"] = parsed["duplicate_of"]
+                    if result:
+                        job["results"].append(result)
+                        job["latest"] = {"progress": f["index"], "filename": f["filename"], "name": result["name"]}
+                JOB_FILES.inc(state=f["state"])
+            self._save(job)
+
+        job["status"] = "done"
+        self._save(job)
+        self._cleanup_files(job)
+
+
+job_manager = FilterJobManager()
@@ -5,7 +5,11 @@ import requests
 from datetime import datetime, timedelta
 from statistics import mean
 
+from app.config import GITHUB_API_URL
+from app.helpers.tracing import traced
 
+
+@traced("fetch_github")
 def get_github_repo_counts(username: str, token: str):
     """
     Use GitHub GraphQL API to get repository counts and contribution calendar.
@@ -14,7 +18,7 @@ def get_github_repo_counts(username: str, token: str):
     if not token:
         return {"error_graphql": "GitHub token is required for GraphQL API (pass via query or set GITHUB_TOKEN env)"}
 
-    url = "https://api.github.com/graphql"
+    url = f"{GITHUB_API_URL}/graphql"
     headers = {"Authorization": f"Bearer {token}"}
     query = """
     query ($login: String!) {
@@ -37,7 +41,14 @@ def get_github_repo_counts(username: str, token: str):
     """
     try:
         response = requests.post(url, json={'query': query, 'variables': {'login': username}}, headers=headers, timeout=15)
-        data = response.json()
+        return summarize_repo_counts(response.json(), username)
+    except Exception as e:
+        return {"error_graphql": str(e)}
+
+
+def summarize_repo_counts(data: dict, username: str):
+    """Repository counts + contribution activity from the GraphQL response."""
+    try:
         if 'errors' in data:
             return {"error_graphql": data['errors']}
         if 'data' not in data or not data['data'].get('user'):
@@ -67,6 +78,7 @@ def get_github_repo_counts(username: str, token: str):
         return {"error_graphql": str(e)}
 
 
+@traced("fetch_github")
 def get_pr_metrics(username: str, token: str):
     """
     Use GitHub REST API to calculate pull-request metrics for the past year.
@@ -77,7 +89,7 @@ def get_pr_metrics(username: str, token: str):
     headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
     one_year_ago = (datetime.now() - timedelta(days=365)).date().isoformat()
     search_query = f"author:{username} type:pr updated:>{one_year_ago}"
-    search_url = f"https://api.github.com/search/issues?q={search_query}&per_page=100"
+    search_url = f"{GITHUB_API_URL}/search/issues?q={search_query}&per_page=100"
 
     try:
         response = requests.get(search_url, headers=headers, timeout=15)
@@ -5,6 +5,9 @@ import requests
 import json
 from datetime import datetime
 
+from app.config import LEETCODE_BASE_URL
+from app.helpers.tracing import traced
+
 def analyze_performance(stats: dict):
     """Analyze user's LeetCode performance and provide sentiment analysis."""
     try:
@@ -82,14 +85,15 @@ def analyze_performance(stats: dict):
     return analysis
 
 
+@traced("fetch_leetcode")
 def extract_leetcode_data(username: str):
     """Query LeetCode GraphQL endpoint to gather profile stats."""
-    api_url = "https://leetcode.com/graphql"
+    api_url = f"{LEETCODE_BASE_URL}/graphql"
     headers = {
         'User-Agent': 'Mozilla/5.0',
         'Accept': 'application/json',
         'Content-Type': 'application/json',
-        'Referer': f'https://leetcode.com/{username}/',
+        'Referer': f'{LEETCODE_BASE_URL}/{username}/',
     }
 
     query = """
@@ -126,31 +130,7 @@ def extract_leetcode_data(username: str):
         return {"error": f"Request failed: {str(e)}"}
 
     try:
-        user_data = data['data']['matchedUser']
-        result = {}
-        result['Username'] = user_data.get('username')
-        submission_stats = user_data.get('submitStats', {}).get('acSubmissionNum', [])
-        total_solved = 0
-        for stat in submission_stats:
-            diff = stat.get('difficulty')
-            cnt = stat.get('count', 0)
-            if diff:
-                result[diff] = str(cnt)
-            if diff == 'All':
-                total_solved = cnt
-        if 'Total_Solved' not in result:
-            total = int(result.get('Easy', 0)) + int(result.get('Medium', 0)) + int(result.get('Hard', 0))
-            result['Total_Solved'] = str(total or total_solved)
-        else:
-            result['Total_Solved'] = result.get('All') or str(total_solved)
-        # languages
-        languages = user_data.get('languageProblemCount', [])
-        result['Languages'] = [l.get('languageName') for l in languages if l.get('problemsSolved', 0) > 0]
-        profile = user_data.get('profile') or {}
-        if profile:
-            result['Ranking'] = profile.get('ranking')
-            result['Reputation'] = profile.get('reputation')
-            result['Rating'] = profile.get('starRating')
+        result = parse_leetcode_profile(data['data']['matchedUser'])
 
         # Fetch daily submission calendar
         try:
@@ -174,13 +154,7 @@ def extract_leetcode_data(username: str):
                     .get("submissionCalendar")
                 )
                 if cal_str:
-                    cal_data = json.loads(cal_str)
-                    activity_graph = []
-                    for ts, count in cal_data.items():
-                        date = datetime.utcfromtimestamp(int(ts)).strftime("%Y-%m-%d")
-                        activity_graph.append({"date": date, "count": count})
-                    activity_graph.sort(key=lambda x: x["date"])
-                    result["activity_graph"] = activity_graph
+                    result["activity_graph"] = parse_submission_calendar(cal_str)
         except Exception as e:
             print("⚠️ LeetCode calendar fetch failed:", e)
             result["activity_graph"] = []
@@ -188,3 +162,43 @@ def extract_leetcode_data(username: str):
         return result
     except Exception as e:
         return {"error": f"Failed to parse LeetCode response: {str(e)}"}
+
+
+def parse_leetcode_profile(user_data: dict):
+    """Solved counts, languages and profile stats from the matchedUser GraphQL object."""
+    result = {}
+    result['Username'] = user_data.get('username')
+    submission_stats = user_data.get('submitStats', {}).get('acSubmissionNum', [])
+    total_solved = 0
+    for stat in submission_stats:
+        diff = stat.get('difficulty')
+        cnt = stat.get('count', 0)
+        if diff:
+            result[diff] = str(cnt)
+        if diff == 'All':
+            total_solved = cnt
+    if 'Total_Solved' not in result:
+        total = int(result.get('Easy', 0)) + int(result.get('Medium', 0)) + int(result.get('Hard', 0))
+        result['Total_Solved'] = str(total or total_solved)
+    else:
+        result['Total_Solved'] = result.get('All') or str(total_solved)
+    # languages
+    languages = user_data.get('languageProblemCount', [])
+    result['Languages'] = [l.get('languageName') for l in languages if l.get('problemsSolved', 0) > 0]
+    profile = user_data.get('profile') or {}
+    if profile:
+        result['Ranking'] = profile.get('ranking')
+        result['Reputation'] = profile.get('reputation')
+        result['Rating'] = profile.get('starRating')
+    return result
+
+
+def parse_submission_calendar(cal_str: str):
+    """submissionCalendar JSON string ({unix_ts: count}) → date-sorted activity graph."""
+    cal_data = json.loads(cal_str)
+    activity_graph = []
+    for ts, count in cal_data.items():
+        date = datetime.utcfromtimestamp(int(ts)).strftime("%Y-%m-%d")
+        activity_graph.append({"date": date, "count": count})
+    activity_graph.sort(key=lambda x: x["date"])
+    return activity_graph
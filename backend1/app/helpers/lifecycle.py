@@ -0,0 +1,207 @@
+# app/helpers/lifecycle.py
+# Startup / shutdown of shared resources and dependency health.
+# The FastAPI lifespan (app/main.py) calls startup() and shutdown(). If Mongo is down
+# (or not configured) the app still starts in degraded mode: caches and sessions stay
+# memory-only, routes that need the database answer 503, and a background monitor
+# re-pings Mongo and finishes initialisation once it becomes reachable.
+# On SIGTERM / SIGINT the process starts draining before uvicorn stops: /readyz turns
+# 503 and long-lived SSE streams (filter job progress) end with a "reconnect" event.
+
+import asyncio
+import os
+import signal
+import time
+
+from fastapi import HTTPException
+
+from app.config import (
+    GITHUB_TOKEN_ENV,
+    MONGO_URI,
+    OPENROUTER_API_KEY,
+    close_clients,
+    get_db,
+)
+from app.helpers.metrics import gauge
+
+DEPENDENCY_CHECK_SECONDS = float(os.getenv("DEPENDENCY_CHECK_SECONDS", "15"))
+# Dependencies that make /readyz fail (503) when down; the others only mark it "degraded"
+READY_REQUIRED = {d.strip() for d in os.getenv("READY_REQUIRED", "mongo").split(",") if d.strip()}
+
+DEPENDENCY_UP = gauge("dependency_up", "1 when a dependency is reachable / configured", ["dependency"])
+
+_state = {
+    "started_at": time.time(),
+    "mongo": {"status": "unknown", "checked_at": None, "error": None},
+    "mongo_initialised": False,
+    "draining": False,
+}
+_monitor_task = None
+_drain_event = asyncio.Event()
+
+
+# -------------------------
+# Mongo
+# -------------------------
+def _ping_mongo():
+    db = get_db()
+    if db is None:
+        _state["mongo"] = {"status": "not_configured", "checked_at": time.time(), "error": None}
+        return False
+    started = time.perf_counter()
+    try:
+        db.command("ping")
+    except Exception as e:
+        _state["mongo"] = {"status": "down", "checked_at": time.time(), "error": str(e)[:300]}
+        return False
+    _state["mongo"] = {"status": "up", "checked_at": time.time(), "error": None,
+                       "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    return True
+
+
+def _init_mongo():
+    """Indexes + attach the Mongo-backed stores (runs once, the first time Mongo answers)."""
+    from app.helpers.ai_cache import response_cache
+    from app.helpers.analysis_helper import ensure_analysis_indexes
+    from app.helpers.chat_sessions import session_store
+    from app.helpers.dedupe import DEDUPE_ENABLED, ensure_report_indexes
+    from app.helpers.llm_usage import usage_recorder
+    from app.helpers.user_helper import backfill_missing_normalized_emails, ensure_user_indexes
+
+    db = get_db()
+    backfill_missing_normalized_emails(db["users"])  # logins look users up by email_normalized
+    ensure_user_indexes(db["users"])
+    ensure_analysis_indexes(db["resume_analyses"])
+    if DEDUPE_ENABLED:
+        ensure_report_indexes(db["reports"])
+    response_cache.attach(db["ai_cache"])
+    session_store.attach(db["chat_sessions"])
+    usage_recorder.attach(db["llm_usage"])
+    _state["mongo_initialised"] = True
+    print("✅ MongoDB connection established successfully!")
+
+
+def check_mongo():
+    """Ping Mongo (blocking, bounded by MONGO_TIMEOUT_MS) and finish init on the first success."""
+    up = _ping_mongo()
+    DEPENDENCY_UP.set(1 if up else 0, dependency="mongo")
+    if up and not _state["mongo_initialised"]:
+        try:
+            _init_mongo()
+        except Exception as e:
+            print("⚠️ MongoDB initialisation failed:", e)
+    elif not up and MONGO_URI:
+        print("❌ MongoDB unavailable, running in degraded mode:", _state["mongo"]["error"])
+    return up
+
+
+def mongo_available():
+    """Last known Mongo state (no I/O). Unknown counts as available so the first request can try."""
+    return get_db() is not None and _state["mongo"]["status"] in ("up", "unknown")
+
+
+def require_db():
+    """Database handle for routes that cannot work without Mongo; 503 while it is down."""
+    db = get_db()
+    if db is None or not mongo_available():
+        raise HTTPException(status_code=503, detail="Database unavailable, please try again shortly")
+    return db
+
+
+async def _monitor():
+    while True:
+        await asyncio.sleep(DEPENDENCY_CHECK_SECONDS)
+        try:
+            await asyncio.to_thread(check_mongo)
+        except Exception as e:
+            print("⚠️ Dependency check failed:", e)
+
+
+# -------------------------
+# Draining
+# -------------------------
+def draining():
+    return _state["draining"]
+
+
+def drain_event():
+    """asyncio.Event set once shutdown begins; long-lived streams wait on it."""
+    return _drain_event
+
+
+def begin_drain():
+    if not _state["draining"]:
+        _state["draining"] = True
+        _drain_event.set()
+        print("ℹ️ Shutdown requested, draining in-flight streams")
+
+
+def _install_drain_handlers():
+    """Chain SIGTERM / SIGINT so draining starts before the server's own exit handler runs."""
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            begin_drain()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL and signum == signal.SIGINT:
+                raise KeyboardInterrupt
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:  # not the main thread (tests, embedded servers)
+            return
+
+
+# -------------------------
+# Lifespan hooks
+# -------------------------
+async def startup():
+    global _monitor_task
+    _install_drain_handlers()
+    await asyncio.to_thread(check_mongo)
+    DEPENDENCY_UP.set(1 if OPENROUTER_API_KEY else 0, dependency="openrouter")
+    DEPENDENCY_UP.set(1 if GITHUB_TOKEN_ENV else 0, dependency="github_token")
+    _monitor_task = asyncio.create_task(_monitor())
+
+
+async def shutdown():
+    global _monitor_task
+    begin_drain()
+    if _monitor_task is not None:
+        _monitor_task.cancel()
+        _monitor_task = None
+    from app.helpers.llm_usage import usage_recorder
+    from app.helpers.resume_helper import shutdown_pdf_pool
+
+    shutdown_pdf_pool()
+
+    try:
+        await asyncio.to_thread(usage_recorder.flush)  # write the last buffered LLM usage rollups
+    except Exception as e:
+        print("⚠️ Final LLM usage flush failed:", e)
+    await close_clients()
+
+
+# -------------------------
+# Health
+# -------------------------
+def liveness():
+    return {"status": "ok", "uptime_s": round(time.time() - _state["started_at"], 1)}
+
+
+def readiness(extra=None):
+    """(ready, report): per-dependency state, "degraded" when an optional dependency is down."""
+    dependencies = {
+        "mongo": dict(_state["mongo"]),
+        "openrouter": {"status": "configured" if OPENROUTER_API_KEY else "not_configured"},
+        "github_token": {"status": "configured" if GITHUB_TOKEN_ENV else "not_configured"},
+        **(extra or {}),
+    }
+    healthy = {name: dep["status"] in ("up", "configured") for name, dep in dependencies.items()}
+    ready = all(ok for name, ok in healthy.items() if name in READY_REQUIRED) and not _state["draining"]
+    if _state["draining"]:
+        status = "draining"
+    else:
+        status = "ok" if all(healthy.values()) else ("degraded" if ready else "unavailable")
+    return ready, {"status": status, "dependencies": dependencies}
@@ -0,0 +1,313 @@
+# app/helpers/llm_usage.py
+# Token / cost accounting for every LLM call.
+# record_llm_call() takes the `usage` block of a chat completion (or of the final
+# streamed chunk) and attributes it to the current route, user and admin job.
+# Totals go to /metrics right away and to daily Mongo rollups (`llm_usage`) in
+# buffered $inc batches, which GET /admin/llm_usage reports on.
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from starlette.requests import Request
+
+from app.helpers.metrics import counter, histogram
+from app.helpers.prompt_builder import count_tokens
+from app.helpers.tracing import route_template
+
+LLM_USAGE_FLUSH_SECONDS = float(os.getenv("LLM_USAGE_FLUSH_SECONDS", "10"))
+LLM_USER_DAILY_TOKEN_QUOTA = int(os.getenv("LLM_USER_DAILY_TOKEN_QUOTA", "0"))  # 0 = no quota
+
+# USD per 1M tokens (prompt, completion). Override / extend with LLM_PRICES='{"model": [in, out]}'.
+# OpenRouter's own `usage.cost` wins when the response carries it.
+LLM_PRICES = {
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+LLM_PRICES.update({k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICES", "{}")).items()})
+
+JWT_SECRET = os.getenv("JWT_SECRET", "supersecret")  # same secret as auth_routes
+DIMENSIONS = ("route", "user", "job")
+
+LLM_CALLS = counter("llm_calls_total", "LLM calls by route, kind, model and outcome", ["route", "kind", "model", "outcome"])
+LLM_TOKENS = counter("llm_tokens_total", "LLM tokens by route, model and direction", ["route", "model", "direction"])
+LLM_COST = counter("llm_cost_usd_total", "Estimated LLM spend in USD", ["route", "model"])
+LLM_LATENCY = histogram("llm_call_seconds", "LLM call latency", ["kind", "model"])
+
+_attribution = contextvars.ContextVar("llm_attribution", default=None)
+
+
+# -------------------------
+# Attribution (route / user / job)
+# -------------------------
+def _current():
+    return _attribution.get() or {}
+
+
+def current_user():
+    return _current().get("user")
+
+
+def current_route():
+    attrs = _current()
+    if attrs.get("route"):
+        return attrs["route"]
+    scope = attrs.get("scope")
+    return route_template(scope) if scope and scope.get("route") else "background"
+
+
+@contextmanager
+def attribute(**labels):
+    """Override attribution for the calls made inside: `with attribute(job=job_id): ...`"""
+    merged = {**_current(), **{k: v for k, v in labels.items() if v is not None}}
+    token = _attribution.set(merged)
+    try:
+        yield
+    finally:
+        _attribution.reset(token)
+
+
+def set_user(user):
+    """
+    Attribute the rest of this request's LLM calls to `user` (e.g. an email from a form),
+    unless a logged-in user (JWT cookie) is already attributed: form fields are not
+    authenticated, so they must not move usage or quota onto someone else.
+    """
+    if user and not current_user():
+        _attribution.set({**_current(), "user": str(user).strip().lower()})
+
+
+def _user_from_cookie(scope):
+    token = Request(scope).cookies.get("access_token")
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=["HS256"]).get("email")
+    except jwt.InvalidTokenError:
+        return None
+
+
+class UsageAttributionMiddleware:
+    """Pure ASGI: attributes LLM calls to the matched route and the logged-in user (JWT cookie)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _attribution.set({"scope": scope, "user": _user_from_cookie(scope)})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _attribution.reset(token)
+
+
+# -------------------------
+# Recording
+# -------------------------
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    price = LLM_PRICES.get(model) or LLM_PRICES.get(str(model).split("/")[-1])
+    if not price:
+        return 0.0
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def _usage_numbers(usage, outcome, messages, completion_text):
+    """(prompt_tokens, completion_tokens, cost or None, estimated?) from a usage block or local counts."""
+    if usage is not None:
+        prompt = getattr(usage, "prompt_tokens", None) or 0
+        completion = getattr(usage, "completion_tokens", None) or 0
+        cost = getattr(usage, "cost", None) or (getattr(usage, "model_extra", None) or {}).get("cost")
+        return prompt, completion, cost, False
+    if outcome == "error":  # failed requests are not billed
+        return 0, 0, 0.0, False
+    prompt = sum(count_tokens(str(m.get("content", ""))) for m in messages or [])
+    return prompt, count_tokens(completion_text or ""), None, True
+
+
+class UsageRecorder:
+    """Buffers per-day $inc rollups and writes them to Mongo in batches."""
+
+    def __init__(self, collection=None, flush_seconds=LLM_USAGE_FLUSH_SECONDS):
+        self.collection = None
+        self.flush_seconds = flush_seconds
+        self._pending = {}  # (day, dimension, key, model) -> {field: amount}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flushing = False  # a background flush is scheduled / running
+        self._flush_lock = threading.Lock()  # one bulk_write at a time (background or usage_report)
+        self._task = None  # keeps the background flush task referenced
+        if collection is not None:
+            self.attach(collection)
+
+    def attach(self, collection):
+        """Start writing rollups to `collection`; usage recorded before that is kept in the buffer."""
+        try:
+            collection.create_index([("day", 1), ("dimension", 1), ("key", 1)], name="day_dimension_key")
+        except PyMongoError as e:
+            print("⚠️ Could not create llm_usage index:", e)
+        self.collection = collection
+
+    def add(self, attrs, model, amounts):
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        with self._lock:
+            for dimension in DIMENSIONS:
+                key = attrs.get(dimension)
+                if not key:
+                    continue
+                bucket = self._pending.setdefault((day, dimension, key, model), {})
+                for field, amount in amounts.items():
+                    bucket[field] = bucket.get(field, 0) + amount
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.collection is None or self._flushing or time.monotonic() - self._last_flush < self.flush_seconds:
+            return
+        self._flushing = True
+        try:
+            self._task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._background_flush))
+        except RuntimeError:  # no event loop (scripts / threads): flush inline
+            self._background_flush()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            self._flushing = False
+
+    def flush(self):
+        if self.collection is None:
+            return
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        try:
+            if not pending:
+                return
+            ops = [
+                UpdateOne(
+                    {"_id": f"{day}|{dimension}|{key}|{model}"},
+                    {"$inc": amounts, "$set": {"day": day, "dimension": dimension, "key": key, "model": model}},
+                    upsert=True,
+                )
+                for (day, dimension, key, model), amounts in pending.items()
+            ]
+            self.collection.bulk_write(ops, ordered=False)
+        except PyMongoError as e:
+            print("⚠️ LLM usage flush failed, will retry:", e)
+            with self._lock:
+                for k, amounts in pending.items():
+                    bucket = self._pending.setdefault(k, {})
+                    for field, amount in amounts.items():
+                        bucket[field] = bucket.get(field, 0) + amount
+
+    def pending_tokens(self, day, dimension, key):
+        with self._lock:
+            return sum(a.get("prompt_tokens", 0) + a.get("completion_tokens", 0)
+                       for (d, dim, k, _), a in self._pending.items() if (d, dim, k) == (day, dimension, key))
+
+
+usage_recorder = UsageRecorder()  # collection attached on startup
+
+
+def record_llm_call(kind, model, started, usage=None, outcome="ok", messages=None, completion_text=None):
+    """
+    Account for one LLM call that began at `started` (time.perf_counter()).
+    Without a `usage` block (cancelled streams, providers that omit it) tokens are counted locally.
+    """
+    latency = time.perf_counter() - started
+    prompt, completion, cost, estimated = _usage_numbers(usage, outcome, messages, completion_text)
+    if cost is None:
+        cost = estimate_cost(model, prompt, completion)
+    route = current_route()
+
+    LLM_CALLS.inc(route=route, kind=kind, model=model, outcome=outcome)
+    LLM_TOKENS.inc(prompt, route=route, model=model, direction="prompt")
+    LLM_TOKENS.inc(completion, route=route, model=model, direction="completion")
+    LLM_COST.inc(cost, route=route, model=model)
+    LLM_LATENCY.observe(latency, kind=kind, model=model)
+
+    attrs = {**_current(), "route": route}
+    usage_recorder.add(attrs, model, {
+        "calls": 1,
+        "errors": 0 if outcome == "ok" else 1,
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "estimated_calls": 1 if estimated else 0,
+        "cost_usd": cost,
+        "latency_ms": round(latency * 1000, 1),
+    })
+
+
+# -------------------------
+# Quotas + reporting
+# -------------------------
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def user_tokens_today(user):
+    """Tokens this user spent today (UTC): flushed rollups plus this process's pending buffer."""
+    if not user:
+        return 0
+    day = _today()
+    total = usage_recorder.pending_tokens(day, "user", user)
+    if usage_recorder.collection is not None:
+        try:
+            for doc in usage_recorder.collection.find({"day": day, "dimension": "user", "key": user},
+                                                      {"prompt_tokens": 1, "completion_tokens": 1}):
+                total += doc.get("prompt_tokens", 0) + doc.get("completion_tokens", 0)
+        except PyMongoError as e:
+            print("⚠️ Could not read LLM usage:", e)
+    return total
+
+
+def quota_exceeded(user=None):
+    """True when LLM_USER_DAILY_TOKEN_QUOTA is set and `user` (default: current user) is over it."""
+    user = user or current_user()
+    return bool(LLM_USER_DAILY_TOKEN_QUOTA and user and user_tokens_today(user) >= LLM_USER_DAILY_TOKEN_QUOTA)
+
+
+def usage_report(dimension="route", days=7, key=None):
+    """Totals per key (and model) over the last `days` days, most expensive first."""
+    usage_recorder.flush()
+    if usage_recorder.collection is None:
+        return []
+    since = (datetime.now(timezone.utc) - timedelta(days=max(1, days) - 1)).strftime("%Y-%m-%d")
+    match = {"dimension": dimension, "day": {"$gte": since}}
+    if key:
+        match["key"] = key
+    fields = ("calls", "errors", "prompt_tokens", "completion_tokens", "estimated_calls", "cost_usd", "latency_ms")
+    rows = usage_recorder.collection.aggregate([
+        {"$match": match},
+        {"$group": {"_id": {"key": "$key", "model": "$model"}, **{f: {"$sum": f"${f}"} for f in fields}}},
+        {"$sort": {"cost_usd": -1}},
+    ])
+    report = []
+    for row in rows:
+        calls = row.get("calls") or 0
+        report.append({
+            dimension: row["_id"]["key"],
+            "model": row["_id"]["model"],
+            **{f: row.get(f, 0) for f in fields if f != "latency_ms"},
+            "cost_usd": round(row.get("cost_usd", 0), 6),
+            "avg_latency_ms": round(row.get("latency_ms", 0) / calls, 1) if calls else None,
+        })
+    return report
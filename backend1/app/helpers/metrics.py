@@ -0,0 +1,145 @@
+# app/helpers/metrics.py
+# Minimal in-process Prometheus-style metrics (counters, gauges, histograms).
+# Rendered in the Prometheus text format at GET /metrics (see app/main.py).
+# Values are per worker process.
+
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = {}
+_lock = threading.Lock()
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = [f'{n}="{v}"' for n, v in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# -------------------------
+# Metric types
+# -------------------------
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with _lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with _lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with _lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self, **labels):
+        """Return {"count", "sum"} for one label set (0s if never observed)."""
+        series = self._series.get(_label_key(self.labelnames, labels))
+        if not series:
+            return {"count": 0, "sum": 0.0}
+        return {"count": series[-1], "sum": series[-2]}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            for i, bound in enumerate(self.buckets):
+                le = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {series[i]}")
+            inf = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+# -------------------------
+# Registry
+# -------------------------
+def counter(name, documentation, labelnames=()):
+    """Get or create a counter (safe to call at import time from several modules)."""
+    with _lock:
+        if name not in _registry:
+            _registry[name] = Counter(name, documentation, labelnames)
+        return _registry[name]
+
+
+def gauge(name, documentation, labelnames=()):
+    with _lock:
+        if name not in _registry:
+            _registry[name] = Gauge(name, documentation, labelnames)
+        return _registry[name]
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    with _lock:
+        if name not in _registry:
+            _registry[name] = Histogram(name, documentation, labelnames, buckets)
+        return _registry[name]
+
+
+def render_prometheus():
+    with _lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,379 @@
+# app/helpers/model_router.py
+# Tiered model routing for resume extraction.
+# Each tier is asked for schema-constrained JSON; the output is validated locally,
+# small problems are repaired without another call, and only invalid output
+# escalates to the next (stronger) model.
+
+import json
+import os
+import re
+import time
+from copy import deepcopy
+
+from app.config import get_openrouter_async_client
+from app.helpers.llm_usage import record_llm_call
+from app.helpers.metrics import counter, histogram
+from app.helpers.partial_json import TopLevelFieldParser
+from app.helpers.tracing import record_span, traced
+
+# Cheapest/fastest first. Override with e.g. RESUME_MODEL_TIERS="gpt-4.1-nano,gpt-4.1-mini,gpt-4.1"
+RESUME_MODEL_TIERS = [m.strip() for m in os.getenv("RESUME_MODEL_TIERS", "gpt-4.1-nano,gpt-4.1-mini").split(",") if m.strip()]
+RESUME_MAX_TOKENS = int(os.getenv("RESUME_MAX_TOKENS", "2000"))
+RESUME_STRUCTURED_OUTPUT = os.getenv("RESUME_STRUCTURED_OUTPUT", "1") != "0"
+
+# Multi-resume batching (admin bulk filter)
+RESUME_BATCH_MODEL = os.getenv("RESUME_BATCH_MODEL", RESUME_MODEL_TIERS[-1] if RESUME_MODEL_TIERS else "gpt-4.1-mini")
+RESUME_BATCH_MAX_DOC_TOKENS = int(os.getenv("RESUME_BATCH_MAX_DOC_TOKENS", "1500"))  # only short resumes are packed
+RESUME_BATCH_MAX_OUTPUT_TOKENS = int(os.getenv("RESUME_BATCH_MAX_OUTPUT_TOKENS", "16000"))
+
+EXTRACTION_SYSTEM_PROMPT = "Return valid JSON only. Do not include commentary."
+
+EXTRACTION_ATTEMPTS = counter(
+    "resume_extraction_attempts_total", "Resume extraction calls per tier and outcome", ["tier", "model", "outcome"]
+)
+EXTRACTION_ESCALATIONS = counter(
+    "resume_extraction_escalations_total", "Resume extractions escalated past a tier", ["tier", "model"]
+)
+EXTRACTION_LATENCY = histogram(
+    "resume_extraction_seconds", "Resume extraction model latency per tier", ["tier", "model"]
+)
+BATCH_REQUESTS = counter("resume_batch_requests_total", "Multi-resume extraction requests", ["outcome"])
+BATCH_DOCS = counter("resume_batch_documents_total", "Resumes sent in batch requests", ["outcome"])
+
+# -------------------------
+# Extraction schema
+# -------------------------
+RESUME_TEMPLATE = {
+    "name": "",
+    "email": "",
+    "phone": "",
+    "linkedin": "",
+    "github": "",
+    "leetcode": "",
+    "codechef": "",
+    "languages": [],
+    "education": {
+        "10th": {"school": "", "location": "", "year": "", "percentage": ""},
+        "12th": {"school": "", "location": "", "year": "", "percentage": ""},
+        "bachelor": {"institute": "", "location": "", "degree": "", "expected_graduation": "", "cgpa": ""},
+    },
+    "skills": {"technical": [], "soft": []},
+    "certificates": [],
+    "role_match": "",
+    "summary": "",
+}
+
+
+def _schema_for(template):
+    if isinstance(template, dict):
+        return {
+            "type": "object",
+            "properties": {k: _schema_for(v) for k, v in template.items()},
+            "required": list(template),
+            "additionalProperties": False,
+        }
+    if isinstance(template, list):
+        return {"type": "array", "items": {"type": "string"}}
+    return {"type": "string"}
+
+
+RESUME_JSON_SCHEMA = _schema_for(RESUME_TEMPLATE)
+RESUME_BATCH_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"doc_id": {"type": "string"}, "resume": RESUME_JSON_SCHEMA},
+                "required": ["doc_id", "resume"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False,
+}
+
+
+class ExtractionError(Exception):
+    def __init__(self, message, raw=None):
+        super().__init__(message)
+        self.raw = raw
+
+
+# -------------------------
+# Local repair + validation
+# -------------------------
+@traced("json_parse")
+def parse_json_loosely(raw: str):
+    """json.loads after stripping code fences, surrounding prose and trailing commas."""
+    text = (raw or "").strip().replace("```json", "").replace("```", "").strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object found in model output")
+    text = re.sub(r",\s*([}\]])", r"\1", text[start:end + 1])
+    return json.loads(text)
+
+
+def _join_path(path, key):
+    """Dotted field path: "" + "skills" → "skills", "skills" + "technical" → "skills.technical"."""
+    return f"{path}.{key}" if path else key
+
+
+def _coerce(value, template, path, repairs, problems):
+    label = path or "root"
+    if isinstance(template, dict):
+        if not isinstance(value, dict):
+            problems.append(f"{label} is not an object")
+            return deepcopy(template)
+        result = dict(value)
+        for key, sub_template in template.items():
+            if key not in value or value[key] is None:
+                repairs.append(f"{_join_path(path, key)} missing")
+                result[key] = deepcopy(sub_template)
+            else:
+                result[key] = _coerce(value[key], sub_template, _join_path(path, key), repairs, problems)
+        return result
+    if isinstance(template, list):
+        if isinstance(value, list):
+            return [str(v).strip() if not isinstance(v, str) else v for v in value if v not in (None, "")]
+        if isinstance(value, str):
+            repairs.append(f"{label} split from string")
+            return [v.strip() for v in re.split(r"[,;\n]", value) if v.strip()]
+        problems.append(f"{label} is not a list")
+        return []
+    if isinstance(value, (dict, list)):
+        problems.append(f"{label} is not a string")
+        return ""
+    if not isinstance(value, str):
+        repairs.append(f"{label} coerced to string")
+        return str(value)
+    return value
+
+
+def validate_resume(data):
+    """
+    Validate extracted data against RESUME_TEMPLATE.
+    Returns (repaired_data, repairs, problems); any problem means the output is unusable.
+    """
+    repairs, problems = [], []
+    repaired = _coerce(data, RESUME_TEMPLATE, "", repairs, problems)
+    missing_top = sum(1 for key in RESUME_TEMPLATE if not isinstance(data, dict) or key not in data)
+    if missing_top > len(RESUME_TEMPLATE) // 2:
+        problems.append(f"{missing_top} top-level fields missing (truncated output?)")
+    return repaired, repairs, problems
+
+
+# -------------------------
+# Routed extraction
+# -------------------------
+def _response_format(name="resume_extraction", schema=RESUME_JSON_SCHEMA):
+    if not RESUME_STRUCTURED_OUTPUT:
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": schema},
+    }
+
+
+async def extract_resume_json(prompt: str, tiers=None):
+    """
+    Run the extraction prompt through the model tiers.
+    Returns (data, route) where route = {"model", "tier", "attempts", "repairs"}.
+    Raises ExtractionError when every tier fails.
+    """
+    client = get_openrouter_async_client()
+    if not client:
+        raise ExtractionError("AI client not configured (missing OPENROUTER_API_KEY).")
+
+    tiers = tiers or RESUME_MODEL_TIERS
+    last_error, last_raw = "no model tiers configured", None
+    messages = [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    for tier, model in enumerate(tiers):
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.2,
+                max_tokens=RESUME_MAX_TOKENS,
+                response_format=_response_format(),
+            )
+            raw = response.choices[0].message.content or ""
+        except Exception as exc:
+            EXTRACTION_LATENCY.observe(time.perf_counter() - started, tier=tier, model=model)
+            record_span("llm", started, model=model, tier=tier)
+            record_llm_call("extract", model, started, outcome="error")
+            EXTRACTION_ATTEMPTS.inc(tier=tier, model=model, outcome="error")
+            last_error, last_raw = f"AI request failed: {exc}", None
+        else:
+            EXTRACTION_LATENCY.observe(time.perf_counter() - started, tier=tier, model=model)
+            record_span("llm", started, model=model, tier=tier)
+            record_llm_call("extract", model, started, response.usage, messages=messages, completion_text=raw)
+            last_raw = raw
+            try:
+                data, repairs, problems = validate_resume(parse_json_loosely(raw))
+            except ValueError as exc:
+                problems, last_error = [str(exc)], f"Failed to parse AI JSON: {exc}"
+            else:
+                last_error = f"AI JSON failed validation: {'; '.join(problems)}"
+            if not problems:
+                EXTRACTION_ATTEMPTS.inc(tier=tier, model=model, outcome="repaired" if repairs else "valid")
+                return data, {"model": model, "tier": tier, "attempts": tier + 1, "repairs": repairs}
+            EXTRACTION_ATTEMPTS.inc(tier=tier, model=model, outcome="invalid")
+
+        if tier < len(tiers) - 1:
+            EXTRACTION_ESCALATIONS.inc(tier=tier, model=model)
+            print(f"⚠️ Resume extraction escalating from {model}: {last_error}")
+
+    raise ExtractionError(last_error, raw=last_raw)
+
+
+async def extract_resume_batch_json(prompt: str, doc_ids):
+    """
+    One request for several resumes. Returns {doc_id: data} for every entry that
+    validated; missing or invalid entries are left out so the caller can retry
+    them one by one. Raises ExtractionError if the whole answer is unusable.
+    """
+    client = get_openrouter_async_client()
+    if not client:
+        raise ExtractionError("AI client not configured (missing OPENROUTER_API_KEY).")
+
+    messages = [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    started = time.perf_counter()
+    try:
+        response = await client.chat.completions.create(
+            model=RESUME_BATCH_MODEL,
+            messages=messages,
+            temperature=0.2,
+            max_tokens=min(RESUME_MAX_TOKENS * len(doc_ids), RESUME_BATCH_MAX_OUTPUT_TOKENS),
+            response_format=_response_format("resume_batch_extraction", RESUME_BATCH_JSON_SCHEMA),
+        )
+        raw = response.choices[0].message.content or ""
+        record_llm_call("extract_batch", RESUME_BATCH_MODEL, started, response.usage, messages=messages, completion_text=raw)
+    except Exception as exc:
+        BATCH_REQUESTS.inc(outcome="error")
+        record_llm_call("extract_batch", RESUME_BATCH_MODEL, started, outcome="error")
+        raise ExtractionError(f"AI batch request failed: {exc}")
+    finally:
+        EXTRACTION_LATENCY.observe(time.perf_counter() - started, tier="batch", model=RESUME_BATCH_MODEL)
+        record_span("llm", started, model=RESUME_BATCH_MODEL, tier="batch")
+
+    try:
+        parsed = parse_json_loosely(raw)
+        entries = parsed["results"] if isinstance(parsed, dict) else parsed
+        if not isinstance(entries, list):
+            raise ValueError("results is not a list")
+    except (ValueError, KeyError, TypeError) as exc:
+        BATCH_REQUESTS.inc(outcome="invalid")
+        BATCH_DOCS.inc(len(doc_ids), outcome="fallback")
+        raise ExtractionError(f"Failed to parse batch AI JSON: {exc}", raw=raw)
+
+    wanted = set(doc_ids)
+    extracted = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        doc_id = str(entry.get("doc_id", ""))
+        if doc_id not in wanted or doc_id in extracted:
+            continue
+        data, _, problems = validate_resume(entry.get("resume"))
+        if not problems:
+            extracted[doc_id] = data
+
+    BATCH_REQUESTS.inc(outcome="valid" if len(extracted) == len(wanted) else "partial")
+    BATCH_DOCS.inc(len(extracted), outcome="extracted")
+    BATCH_DOCS.inc(len(wanted) - len(extracted), outcome="fallback")
+    return extracted
+
+
+async def stream_resume_json(prompt: str):
+    """
+    Streamed extraction on the first tier. Yields ("field", key, value) as each
+    top-level field completes, then a final ("result", data, route).
+    If the streamed JSON does not validate, the remaining tiers are tried
+    (non-streamed) before giving up with ExtractionError.
+    """
+    client = get_openrouter_async_client()
+    if not client:
+        raise ExtractionError("AI client not configured (missing OPENROUTER_API_KEY).")
+    if not RESUME_MODEL_TIERS:
+        raise ExtractionError("no model tiers configured")
+
+    model = RESUME_MODEL_TIERS[0]
+    parser = TopLevelFieldParser()
+    parts = []
+    repairs, problems = [], []
+    usage, outcome = None, "error"
+    messages = [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    started = time.perf_counter()
+    try:
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.2,
+            max_tokens=RESUME_MAX_TOKENS,
+            response_format=_response_format(),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        try:
+            async for chunk in stream:
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                parts.append(delta)
+                for key, value in parser.feed(delta):
+                    yield ("field", key, value)
+            outcome = "ok"
+        except GeneratorExit:
+            outcome = "cancelled"
+            raise
+        finally:
+            await stream.close()
+    except Exception as exc:
+        EXTRACTION_ATTEMPTS.inc(tier=0, model=model, outcome="error")
+        parts = []
+        problems = [f"AI request failed: {exc}"]
+    else:
+        try:
+            data, repairs, problems = validate_resume(parse_json_loosely("".join(parts)))
+        except ValueError as exc:
+            problems = [f"Failed to parse AI JSON: {exc}"]
+    finally:
+        EXTRACTION_LATENCY.observe(time.perf_counter() - started, tier=0, model=model)
+        record_span("llm", started, model=model, tier=0)
+        record_llm_call("extract_stream", model, started, usage, outcome=outcome,
+                        messages=messages, completion_text="".join(parts))
+
+    if not problems:
+        EXTRACTION_ATTEMPTS.inc(tier=0, model=model, outcome="repaired" if repairs else "valid")
+        yield ("result", data, {"model": model, "tier": 0, "attempts": 1, "repairs": repairs})
+        return
+
+    if parts:
+        EXTRACTION_ATTEMPTS.inc(tier=0, model=model, outcome="invalid")
+    if len(RESUME_MODEL_TIERS) < 2:
+        raise ExtractionError("; ".join(problems), raw="".join(parts) or None)
+    EXTRACTION_ESCALATIONS.inc(tier=0, model=model)
+    print(f"⚠️ Streamed resume extraction escalating from {model}: {'; '.join(problems)}")
+    data, route = await extract_resume_json(prompt, tiers=RESUME_MODEL_TIERS[1:])
+    route = {**route, "tier": route["tier"] + 1, "attempts": route["attempts"] + 1}
+    yield ("result", data, route)
@@ -0,0 +1,65 @@
+# app/helpers/partial_json.py
+# Incremental parser for a streamed JSON object: reports each top-level field
+# as soon as its value is complete, long before the closing brace arrives.
+
+import json
+
+
+class TopLevelFieldParser:
+    """
+    Feed text chunks of a JSON object; `feed()` returns the (key, value) pairs
+    whose values completed in that chunk. Leading code fences / prose before the
+    first "{" are ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.segment_start = None  # start of the current `"key": value` segment
+        self.done = False
+
+    def feed(self, chunk: str):
+        self.buffer += chunk or ""
+        completed = []
+        buf = self.buffer
+        while self.pos < len(buf) and not self.done:
+            ch = buf[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.depth > 0:
+                    self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    if ch != "{":
+                        self.depth = 0  # only objects are supported at the root
+                    else:
+                        self.segment_start = self.pos + 1
+            elif ch in "}]":
+                if self.depth == 1:
+                    completed.extend(self._close_segment(self.pos))
+                    self.done = True
+                self.depth = max(self.depth - 1, 0)
+            elif ch == "," and self.depth == 1:
+                completed.extend(self._close_segment(self.pos))
+                self.segment_start = self.pos + 1
+            self.pos += 1
+        return completed
+
+    def _close_segment(self, end):
+        segment = self.buffer[self.segment_start:end].strip()
+        if not segment:
+            return []
+        try:
+            return list(json.loads("{" + segment + "}").items())
+        except ValueError:
+            return []
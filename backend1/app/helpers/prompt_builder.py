@@ -0,0 +1,214 @@
+# app/helpers/prompt_builder.py
+# Token-budgeted prompt compaction for resume extraction and AI chat.
+# - counts tokens locally (tiktoken when installed, otherwise a ~4 chars/token estimate)
+# - strips empty JSON fields and whitespace runs
+# - drops header/footer lines repeated across PDF pages
+# - truncates section by section so the highest-value sections survive the budget
+
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from app.helpers.tracing import traced
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:  # tiktoken is optional
+    _encoding = None
+
+RESUME_PROMPT_TOKEN_BUDGET = int(os.getenv("RESUME_PROMPT_TOKEN_BUDGET", "6000"))
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "1500"))
+
+
+# -------------------------
+# Token counting
+# -------------------------
+def count_tokens(text: str):
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int):
+    """Cut text to roughly max_tokens, preferring a line boundary."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        cut = _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[: max_tokens * 4]
+    newline = cut.rfind("\n")
+    if newline > len(cut) // 2:
+        cut = cut[:newline]
+    return cut.rstrip()
+
+
+# -------------------------
+# JSON compaction
+# -------------------------
+def strip_empty(value):
+    """Drop empty strings/lists/dicts and collapse whitespace inside strings."""
+    if isinstance(value, dict):
+        cleaned = {k: strip_empty(v) for k, v in value.items()}
+        return {k: v for k, v in cleaned.items() if v not in ("", None, [], {})}
+    if isinstance(value, list):
+        cleaned = [strip_empty(v) for v in value]
+        return [v for v in cleaned if v not in ("", None, [], {})]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def compact_json(data):
+    return json.dumps(strip_empty(data or {}), separators=(",", ":"), ensure_ascii=False)
+
+
+# Least useful for career advice first — dropped first when over budget
+CHAT_CONTEXT_DROP_ORDER = [
+    "linkedin", "github", "leetcode", "codechef", "phone", "email",
+    "languages", "certificates", "summary",
+]
+
+
+def compact_resume_context(resume_data: dict, budget: int = CHAT_CONTEXT_TOKEN_BUDGET):
+    """Compact resume JSON for chat prompts, dropping low-value keys to fit the budget."""
+    data = strip_empty(resume_data or {})
+    original = count_tokens(json.dumps(resume_data or {}, indent=2))
+    context = compact_json(data)
+    for key in CHAT_CONTEXT_DROP_ORDER:
+        if count_tokens(context) <= budget:
+            break
+        if isinstance(data, dict) and key in data:
+            data.pop(key)
+            context = compact_json(data)
+    if count_tokens(context) > budget:
+        context = _truncate_to_tokens(context, budget)
+    _log_saving("chat context", original, count_tokens(context))
+    return context
+
+
+# -------------------------
+# Resume text compaction
+# -------------------------
+def collapse_whitespace(text: str):
+    lines = [re.sub(r"[ \t ]+", " ", line).strip() for line in (text or "").splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def dedupe_page_boilerplate(pages, edge_lines: int = 3):
+    """
+    Remove header/footer lines that repeat on at least half of the pages
+    (page numbers are normalized away so "Page 2 of 3" counts as a repeat).
+    Only the first / last `edge_lines` non-empty lines of a page are candidates;
+    the first occurrence is kept.
+    """
+    if len(pages) < 2:
+        return list(pages)
+
+    def key(line):
+        return re.sub(r"\d+", "#", line.strip().lower())
+
+    counts = Counter()
+    for page in pages:
+        lines = [l for l in page.splitlines() if l.strip()]
+        edges = {key(l) for l in lines[:edge_lines] + lines[-edge_lines:]}
+        counts.update(edges)
+    threshold = max(2, math.ceil(len(pages) / 2))
+    repeated = {k for k, c in counts.items() if c >= threshold}
+
+    seen = set()
+    cleaned = []
+    for page in pages:
+        lines = page.splitlines()
+        content = [n for n, l in enumerate(lines) if l.strip()]
+        edge = set(content[:edge_lines] + content[-edge_lines:])
+        kept = []
+        for n, line in enumerate(lines):
+            k = key(line)
+            if n in edge and k in repeated:
+                if k in seen:
+                    continue
+                seen.add(k)
+            kept.append(line)
+        cleaned.append("\n".join(kept))
+    return cleaned
+
+
+# Section heading → priority (lower = kept first)
+SECTION_PRIORITY = {
+    "header": 0,
+    "education": 1,
+    "skills": 2,
+    "experience": 3,
+    "projects": 4,
+    "certifications": 5,
+    "languages": 6,
+    "summary": 7,
+    "achievements": 8,
+    "other": 9,
+}
+SECTION_HEADINGS = {
+    "education": r"education|academic.*|qualifications?",
+    "skills": r"(technical )?skills|technologies|tech stack|core competencies",
+    "experience": r"(work |professional )?experience|employment|internships?",
+    "projects": r"(academic |personal )?projects",
+    "certifications": r"certifications?|certificates?|courses",
+    "languages": r"languages( known)?",
+    "summary": r"(professional )?summary|objective|profile|about me",
+    "achievements": r"achievements|awards|honou?rs|accomplishments|activities|extra.?curricular.*",
+}
+_HEADING_RE = [(name, re.compile(rf"^\s*({pattern})\s*:?\s*$", re.I)) for name, pattern in SECTION_HEADINGS.items()]
+
+
+def split_sections(text: str):
+    """Split resume text into [(section, text)] using common heading lines."""
+    sections = [["header", []]]
+    for line in text.splitlines():
+        name = next((n for n, rx in _HEADING_RE if rx.match(line) and len(line) < 40), None)
+        if name:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+
+def fit_sections_to_budget(sections, budget: int):
+    """Keep sections in priority order until the budget runs out; output keeps document order."""
+    order = sorted(range(len(sections)), key=lambda i: SECTION_PRIORITY.get(sections[i][0], 9))
+    kept = {}
+    remaining = budget
+    for i in order:
+        name, body = sections[i]
+        tokens = count_tokens(body)
+        if tokens <= remaining:
+            kept[i] = body
+            remaining -= tokens
+        elif remaining > 50:
+            kept[i] = _truncate_to_tokens(body, remaining - 10) + "\n...[section truncated]..."
+            remaining = max(0, remaining - count_tokens(kept[i]))
+    return "\n\n".join(kept[i] for i in sorted(kept))
+
+
+@traced("prompt_build")
+def build_resume_prompt_text(pages, budget: int = RESUME_PROMPT_TOKEN_BUDGET):
+    """Compact raw per-page PDF text into the resume portion of the extraction prompt."""
+    raw = "\n".join(pages)
+    original = count_tokens(raw)
+    pages = dedupe_page_boilerplate([collapse_whitespace(p) for p in pages])
+    text = collapse_whitespace("\n".join(pages))
+    if count_tokens(text) > budget:
+        text = fit_sections_to_budget(split_sections(text), budget)
+    _log_saving("resume prompt", original, count_tokens(text))
+    return text
+
+
+def _log_saving(label, before, after):
+    if before > after:
+        print(f"✂️ {label}: {before} → {after} tokens (saved {before - after})")
@@ -0,0 +1,49 @@
+# app/helpers/report_text.py
+# Compressed copy of a resume's extracted text, stored on its `reports` document so
+# ATS scoring can be re-run later (see helpers/rescore.py) without the PDF or the LLM.
+# zstd (the `zstandard` package) when installed, zlib otherwise; the codec is stored
+# with the blob so either can be read back.
+
+import hashlib
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+REPORT_TEXT_ENABLED = os.getenv("REPORT_TEXT_ENABLED", "1") not in ("0", "false", "False")
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "9"))
+
+TEXT_CODEC = "zstd" if zstandard is not None else "zlib"
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the extracted text (tells whether a stored text matches a re-upload)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress_text(text: str):
+    """(blob, codec) for `text`."""
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), "zstd"
+    return zlib.compress(raw, 9), "zlib"
+
+
+def decompress_text(blob, codec: str) -> str:
+    blob = bytes(blob)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Report text is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(blob).decode("utf-8")
+    raise ValueError(f"Unknown report text codec: {codec}")
+
+
+def text_fields(text: str):
+    """Fields added to a `reports` document: text_z, text_codec, text_sha256, text_chars."""
+    blob, codec = compress_text(text)
+    return {"text_z": blob, "text_codec": codec, "text_sha256": text_hash(text), "text_chars": len(text)}
@@ -0,0 +1,90 @@
+# app/helpers/rescore.py
+# Re-run calculate_ats_score over stored reports after its weights or keyword lists change.
+# Reports are read in chunks (only the fields the scorer needs), their compressed text
+# (helpers/report_text.py) is inflated and scored, and the new scores go back in one
+# bulk_write per chunk. No PDF parsing and no LLM calls.
+#
+#   python -m app.helpers.rescore            # reports scored by an older ATS_SCORER_VERSION
+#   python -m app.helpers.rescore --all      # every report with stored text
+
+import time
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.helpers.report_text import decompress_text
+from app.helpers.resume_helper import ATS_SCORER_VERSION, calculate_ats_score
+
+RESCORE_CHUNK_SIZE = 500
+
+
+def rescore_query(force=False):
+    query = {"text_z": {"$exists": True}}
+    if not force:
+        query["ats_version"] = {"$ne": ATS_SCORER_VERSION}
+    return query
+
+
+def rescore_reports(reports, chunk_size=RESCORE_CHUNK_SIZE, force=False, dry_run=False):
+    """
+    Rescore `reports` (the Mongo collection) and return a summary:
+    {"scanned", "updated", "changed", "failed", "skipped_without_text", "seconds"}.
+    `changed` counts reports whose total score moved.
+    """
+    started = time.perf_counter()
+    summary = {"scanned": 0, "updated": 0, "changed": 0, "failed": 0, "version": ATS_SCORER_VERSION}
+    cursor = reports.find(rescore_query(force), {"data": 1, "text_z": 1, "text_codec": 1, "ats_score": 1},
+                          batch_size=chunk_size)
+    ops = []
+
+    def flush():
+        if ops and not dry_run:
+            reports.bulk_write(ops, ordered=False)
+        summary["updated"] += len(ops)
+        ops.clear()
+
+    for report in cursor:
+        summary["scanned"] += 1
+        try:
+            text = decompress_text(report["text_z"], report.get("text_codec", "zlib"))
+            data = report.get("data") or {}
+            ats = calculate_ats_score(data, text, normalized_languages=data.get("languages"))
+        except Exception as e:
+            summary["failed"] += 1
+            print(f"⚠️ Could not rescore report {report['_id']}: {e}")
+            continue
+        if ats["ats_score"] != report.get("ats_score"):
+            summary["changed"] += 1
+        ops.append(UpdateOne({"_id": report["_id"]}, {"$set": {
+            "ats_score": ats["ats_score"],
+            "ats_breakdown": ats["ats_breakdown"],
+            "word_count": ats["word_count"],
+            "ats_version": ATS_SCORER_VERSION,
+            "rescored_at": datetime.utcnow(),
+        }}))
+        if len(ops) >= chunk_size:
+            flush()
+    flush()
+
+    summary["skipped_without_text"] = reports.count_documents({"text_z": {"$exists": False}})
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+# -------------------------
+# CLI: python -m app.helpers.rescore
+# -------------------------
+if __name__ == "__main__":
+    import argparse
+
+    from app.config import get_db
+
+    parser = argparse.ArgumentParser(description="Re-run ATS scoring over stored reports.")
+    parser.add_argument("--all", action="store_true", help="rescore every report, not only stale ones")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="score but do not write")
+    args = parser.parse_args()
+
+    result = rescore_reports(get_db()["reports"], args.chunk_size, force=args.all, dry_run=args.dry_run)
+    print(f"✅ Rescored {result['updated']} of {result['scanned']} reports "
+          f"({result['changed']} changed, {result['failed']} failed) in {result['seconds']}s")
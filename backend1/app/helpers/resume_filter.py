@@ -0,0 +1,70 @@
+# app/helpers/resume_filter.py
+# Admin resume-filter criteria, shared by the streaming endpoint and batched processing.
+
+from app.helpers.resume_model import ParsedResume, parse_cgpa, parse_percentage  # noqa: F401 (re-exported)
+from app.helpers.skill_taxonomy import canonical_skills
+
+
+def build_criteria(cgpa=None, tenth=None, twelfth=None, ats=None, skills=None,
+                   language=None, department=None, degree=None):
+    """Normalize raw form values once per request."""
+    return {
+        "cgpa": cgpa,
+        "tenth": tenth,
+        "twelfth": twelfth,
+        "ats": ats,
+        "skills": sorted(canonical_skills(skills)) if skills else [],  # canonical ids (skill_taxonomy)
+        "language": language.lower().strip() if language else None,
+        "department": department.lower().strip() if department else None,
+        "degree": degree.lower().strip() if degree else None,
+    }
+
+
+# ---------------------------------------------------------
+# 🧠 Apply filters to one parsed resume
+# ---------------------------------------------------------
+def resume_of(parsed):
+    """The typed resume of a parse result (batch results carry it; stored / reused ones are built here)."""
+    resume = parsed.get("resume")
+    return resume if isinstance(resume, ParsedResume) else ParsedResume.from_dict(parsed.get("data"))
+
+
+def filter_parsed_resume(parsed, filename, criteria):
+    """Return the shortlist record for a parsed resume, or None if it does not match."""
+    resume = resume_of(parsed)
+    ats_score = parsed.get("ats_score", 0)
+    email = resume.email or parsed.get("email")
+    phone = resume.phone or parsed.get("phone")
+
+    # Apply filters (numbers and lowercase sets were computed once, at parse time)
+    if criteria["cgpa"] and resume.cgpa < criteria["cgpa"]:
+        return None
+    if criteria["tenth"] and resume.tenth < criteria["tenth"]:
+        return None
+    if criteria["twelfth"] and resume.twelfth < criteria["twelfth"]:
+        return None
+    if criteria["ats"] and ats_score < criteria["ats"]:
+        return None
+    if criteria["language"] and not any(criteria["language"] in l for l in resume.language_set):
+        return None
+    if criteria["department"] and criteria["department"] not in resume.degree_lower:
+        return None
+    if criteria["degree"] and criteria["degree"] not in resume.degree_lower:
+        return None
+    if criteria["skills"] and not resume.skill_ids.issuperset(criteria["skills"]):
+        return None
+
+    # Build final filtered record
+    record = {
+        "filename": filename,
+        "name": resume.name or None,
+        "email": email,
+        "phone": phone,
+        "ats_score": ats_score,
+        "education": resume.education,
+        "skills": resume.skills_dict(),
+        "languages": [lang.lower() for lang in resume.languages],
+    }
+    if parsed.get("duplicate_of"):
+        record["duplicate_of"] = parsed["duplicate_of"]
+    return record
@@ -2,14 +2,46 @@
 # Combines your resume AI logic + detailed ATS scoring
 # Updated: robust language normalization + consistent OpenRouter usage
 
+import asyncio
 import json
 import io
-import pdfplumber
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
 
-from app.config import db, openrouter_client  # config.py defines db and openrouter_client
+from app.config import ai_configured, get_db
+from app.helpers.lifecycle import mongo_available
+from app.helpers.report_text import REPORT_TEXT_ENABLED, text_fields
+from app.helpers.resume_model import ParsedResume
+from app.helpers.skill_taxonomy import canonical_skills, skills_in_text
+from app.helpers.prompt_builder import build_resume_prompt_text, count_tokens
+from app.helpers.tracing import span, traced
+from app.helpers.dedupe import (
+    DEDUPE_ENABLED,
+    DuplicateDetector,
+    content_hash,
+    lsh_bands,
+    minhash_signature,
+)
+from app.helpers.model_router import (
+    RESUME_BATCH_MAX_DOC_TOKENS,
+    RESUME_TEMPLATE,
+    ExtractionError,
+    extract_resume_batch_json,
+    extract_resume_json,
+    stream_resume_json,
+)
+
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "20"))
+
+# pdfplumber is CPU-bound: run it off the event loop. run.py sizes the pool per worker
+# (PDF_POOL_SIZE = cores / workers); "process" pools also sidestep the GIL.
+PDF_POOL_SIZE = int(os.getenv("PDF_POOL_SIZE", "0")) or min(4, os.cpu_count() or 1)
+PDF_POOL_KIND = os.getenv("PDF_POOL_KIND", "thread")  # thread | process
+
+_pdf_pool = None
 
 
 # -------------------------
@@ -74,6 +106,12 @@ def extract_username_from_input(input_str: str):
 # -------------------------
 import re
 
+# Bump when the weights or keyword lists below change; stale reports can then be
+# rescored from their stored text with `python -m app.helpers.rescore`.
+ATS_SCORER_VERSION = 2  # 2: tech / tool keywords matched through the skill taxonomy
+
+
+@traced("ats_score")
 def calculate_ats_score(data, text, job_description=None, normalized_languages=None):
     score_details = {}
 
@@ -158,13 +196,14 @@ def calculate_ats_score(data, text, job_description=None, normalized_languages=N
         ach_score = 0
     score_details["Achievements"] = ach_score
 
-    # 7. Technical skills (max 15)
-    tech_match = sum(1 for kw in tech_keywords if kw in text_lower)
+    # 7. Technical skills (max 15) — whole-skill matches via the taxonomy ("java" ≠ "javascript")
+    text_skills = skills_in_text(text_lower)
+    tech_match = len(text_skills & canonical_skills(tech_keywords))
     tech_score = min(tech_match * 1.0, 15)
     score_details["Technical Skills"] = tech_score
 
     # 8. Tools & platforms (max 10)
-    tool_match = sum(1 for kw in tools_keywords if kw in text_lower)
+    tool_match = len(text_skills & canonical_skills(tools_keywords))
     tool_score = min(tool_match * 0.8, 10)
     score_details["Tools & Platforms"] = tool_score
 
@@ -214,6 +253,184 @@ def calculate_ats_score(data, text, job_description=None, normalized_languages=N
         "languages": normalized_languages,
     }
 
+# -------------------------
+# Extraction prompt
+# -------------------------
+def build_extraction_prompt(prompt_text: str):
+    """Resume extraction prompt (shared by the PDF and text-only extractors)."""
+    return f"""
+Extract structured resume info and return valid JSON ONLY:
+{json.dumps(RESUME_TEMPLATE, indent=2)}
+Resume text:
+{prompt_text}
+"""
+
+
+def build_batch_extraction_prompt(documents: dict):
+    """One prompt for several resumes; the model answers with a results array keyed by doc_id."""
+    blocks = "\n\n".join(f"=== doc_id: {doc_id} ===\n{text}" for doc_id, text in documents.items())
+    return f"""
+Extract structured resume info for EACH resume below and return valid JSON ONLY:
+{{"results": [{{"doc_id": "<doc_id>", "resume": {json.dumps(RESUME_TEMPLATE, separators=(",", ":"))}}}]}}
+Return exactly one entry per doc_id. Never mix data between resumes.
+Resumes:
+{blocks}
+"""
+
+
+# -------------------------
+# Pipeline stages
+# -------------------------
+def _read_pdf_pages(contents: bytes, max_pages: int = RESUME_MAX_PAGES):
+    import pdfplumber  # deferred: processes that never parse PDFs skip the import
+
+    with pdfplumber.open(io.BytesIO(contents)) as pdf:
+        pages = pdf.pages
+        if len(pages) > max_pages:
+            print(f"✂️ PDF has {len(pages)} pages, reading the first {max_pages}")
+            pages = pages[:max_pages]
+        return [page.extract_text() or "" for page in pages]
+
+
+@traced("pdf_extract")
+def extract_pdf_pages(contents: bytes, max_pages: int = RESUME_MAX_PAGES):
+    """pdfplumber text per page (only the first `max_pages` pages are read)."""
+    return _read_pdf_pages(contents, max_pages)
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is None:
+        if PDF_POOL_KIND == "process":
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_POOL_SIZE)
+        else:
+            _pdf_pool = ThreadPoolExecutor(max_workers=PDF_POOL_SIZE, thread_name_prefix="pdf")
+    return _pdf_pool
+
+
+async def extract_pdf_pages_async(contents: bytes, max_pages: int = RESUME_MAX_PAGES):
+    """extract_pdf_pages on the PDF pool, so parsing never blocks the event loop."""
+    with span("pdf_extract", pool=PDF_POOL_KIND):
+        return await asyncio.get_running_loop().run_in_executor(_get_pdf_pool(), _read_pdf_pages, contents, max_pages)
+
+
+def _read_pdf_with_signature(contents: bytes, max_pages: int = RESUME_MAX_PAGES):
+    pages = _read_pdf_pages(contents, max_pages)
+    return pages, minhash_signature("\n".join(pages))
+
+
+async def extract_pdf_and_signature_async(contents: bytes, max_pages: int = RESUME_MAX_PAGES):
+    """(pages, MinHash signature) in one PDF pool job (bulk path: dedupe needs both)."""
+    with span("pdf_extract", pool=PDF_POOL_KIND, minhash=True):
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_pdf_pool(), _read_pdf_with_signature, contents, max_pages)
+
+
+async def minhash_signature_async(text: str):
+    """MinHash signature computed on the PDF pool (pure-Python, ~10-150 ms: keep it off the event loop)."""
+    if not DEDUPE_ENABLED:
+        return None
+    with span("minhash"):
+        return await asyncio.get_running_loop().run_in_executor(_get_pdf_pool(), minhash_signature, text)
+
+
+def shutdown_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+def resolve_languages(data, text):
+    """Normalize AI languages; fall back to detecting them in the resume text."""
+    raw_langs = data.get("languages", [])
+    if isinstance(raw_langs, str):
+        raw_langs = re.split(r"[,;/]| and ", raw_langs)
+    langs = normalize_languages([lang.strip() for lang in raw_langs if lang and str(lang).strip()])
+
+    # If AI missed languages or returned unexpected value, detect from text
+    if not langs:
+        detected = []
+        standard_langs = {
+            "english": "English", "tamil": "Tamil", "hindi": "Hindi",
+            "telugu": "Telugu", "malayalam": "Malayalam", "kannada": "Kannada",
+            "french": "French", "german": "German", "spanish": "Spanish",
+            "bengali": "Bengali", "marathi": "Marathi", "punjabi": "Punjabi",
+            "gujarati": "Gujarati", "urdu": "Urdu", "oriya": "Oriya", "nepali": "Nepali"
+        }
+        tlower = text.lower()
+        for key, val in standard_langs.items():
+            # match exact language token in resume text (word boundary)
+            if re.search(rf"\b{re.escape(key)}\b", tlower):
+                detected.append(val)
+        langs = detected if detected else ["English"]
+    return langs
+
+
+def finalize_resume(data, text, filename, signature=None, digest=None, typed=False):
+    """
+    Languages + ATS scoring + report save for already-extracted resume data.
+    `signature` (MinHash of `text`) is computed by the callers off the event loop.
+    The data is normalized once into a ParsedResume; with `typed` the model is also
+    returned under "resume" (internal callers such as the admin filter; not JSON-serializable).
+    """
+    data["languages"] = resolve_languages(data, text)
+    resume = ParsedResume.from_dict(data)
+    data = resume.to_dict()
+    langs = list(resume.languages)
+
+    # ---- Compute ATS ----
+    ats = calculate_ats_score(data, text, normalized_languages=langs)
+
+    # ---- Save to MongoDB ----
+    try:
+        db = get_db()
+        if db is not None and mongo_available():
+            report = {
+                "filename": filename,
+                "data": data,
+                "ats_breakdown": ats["ats_breakdown"],
+                "ats_score": ats["ats_score"],
+                "word_count": ats["word_count"],
+                "ats_version": ATS_SCORER_VERSION,
+                "uploaded_at": datetime.utcnow(),
+            }
+            if REPORT_TEXT_ENABLED:
+                report.update(text_fields(text))  # compressed text + hash, for rescoring
+            if DEDUPE_ENABLED:
+                # near-duplicate lookup keys for later bulk uploads (see dedupe.py)
+                if signature is not None:
+                    report["minhash"] = signature
+                    report["lsh_bands"] = lsh_bands(signature)
+                if digest:
+                    report["content_hash"] = digest
+            with span("db_write", collection="reports"):
+                db.reports.insert_one(report)
+    except Exception as e:
+        print("⚠️ MongoDB insert failed:", e)
+
+    # ---- Return Result ----
+    result = {
+        "data": data,
+        "ats_score": ats["ats_score"],
+        "ats_breakdown": ats["ats_breakdown"],
+        "word_count": ats["word_count"],
+    }
+    if typed:
+        result["resume"] = resume
+    return result
+
+
+async def _extract_single(prompt_text):
+    try:
+        data, route = await extract_resume_json(build_extraction_prompt(prompt_text))
+    except ExtractionError as exc:
+        return None, ({"error": str(exc), "raw": exc.raw} if exc.raw else {"error": str(exc)})
+    if route["tier"] > 0 or route["repairs"]:
+        print(f"ℹ️ Resume extracted by {route['model']} (tier {route['tier']}, repairs: {len(route['repairs'])})")
+    return data, None
+
+
 # -------------------------
 # Core Resume Processor
 # -------------------------
@@ -224,139 +441,200 @@ async def process_resume_file(upload_file):
         if not contents:
             return {"error": "Empty file received. Please upload a valid PDF."}
 
-        with pdfplumber.open(io.BytesIO(contents)) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
+        pages = await extract_pdf_pages_async(contents)
+        text = "\n".join(pages)
 
         if not text.strip():
             return {"error": "No readable text found in the uploaded PDF."}
 
-        if not openrouter_client:
+        if not ai_configured():
             return {"error": "AI client not configured (missing OPENROUTER_API_KEY)."}
 
-        # Truncate long documents for model context safety (you already used similar earlier)
-        max_chars = 80000  # conservative
-        prompt_text = text if len(text) <= max_chars else text[:max_chars] + "\n...[Truncated for AI]..."
+        # Compact + fit the resume text to the prompt token budget (see prompt_builder.py)
+        prompt_text = build_resume_prompt_text(pages)
 
-        # ---- AI extraction ----
-        prompt = f"""
-Extract structured resume info and return valid JSON ONLY:
-{{
-  "name": "", 
-  "email": "", 
-  "phone": "",
-  "linkedin": "", 
-  "github": "", 
-  "leetcode": "", 
-  "codechef": "",
-  "languages": [],  
-  "education": {{
-      "10th": {{
-          "school": "",
-          "location": "",
-          "year": "",
-          "percentage": ""
-      }},
-      "12th": {{
-          "school": "",
-          "location": "",
-          "year": "",
-          "percentage": ""
-      }},
-      "bachelor": {{
-          "institute": "",
-          "location": "",
-          "degree": "",
-          "expected_graduation": "",
-          "cgpa": ""
-      }}
-  }},
-  "skills": {{
-      "technical": [], 
-      "soft": []
-  }},
-  "certificates": [], 
-  "role_match": "", 
-  "summary": ""
-}}
-Resume text:
-{prompt_text}
-"""
+        # ---- AI extraction (tiered models, validated + repaired locally) ----
+        # the MinHash for the stored report is computed on the PDF pool meanwhile
+        signature_task = asyncio.ensure_future(minhash_signature_async(text))
+        data, error = await _extract_single(prompt_text)
+        if error:
+            signature_task.cancel()
+            return error
 
-        # ---- Call AI model via openrouter_client ----
-        try:
-            response = openrouter_client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "Return valid JSON only. Do not include commentary."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=2000,
-            )
-            ai_output = response.choices[0].message.content
-        except Exception as exc:
-            return {"error": f"AI request failed: {str(exc)}"}
+        return finalize_resume(data, text, getattr(upload_file, "filename", "uploaded_resume"),
+                               signature=await signature_task)
 
-        # ---- Parse JSON ----
-        ai_output = ai_output.strip().replace("```json", "").replace("```", "")
-        try:
-            data = json.loads(ai_output)
-        except Exception as e:
-            return {"error": f"Failed to parse AI JSON: {str(e)}", "raw": ai_output}
-
-        # ---- Normalize languages (robust) ----
-        raw_langs = data.get("languages", [])
-        if isinstance(raw_langs, str):
-            raw_langs = re.split(r"[,;/]| and ", raw_langs)
-        langs = normalize_languages([lang.strip() for lang in raw_langs if lang and str(lang).strip()])
-
-        # If AI missed languages or returned unexpected value, detect from text
-        if not langs:
-            detected = []
-            standard_langs = {
-                "english": "English", "tamil": "Tamil", "hindi": "Hindi",
-                "telugu": "Telugu", "malayalam": "Malayalam", "kannada": "Kannada",
-                "french": "French", "german": "German", "spanish": "Spanish",
-                "bengali": "Bengali", "marathi": "Marathi", "punjabi": "Punjabi",
-                "gujarati": "Gujarati", "urdu": "Urdu", "oriya": "Oriya", "nepali": "Nepali"
-            }
-            tlower = text.lower()
-            for key, val in standard_langs.items():
-                # match exact language token in resume text (word boundary)
-                if re.search(rf"\b{re.escape(key)}\b", tlower):
-                    detected.append(val)
-            langs = detected if detected else ["English"]
+    except Exception as e:
+        import traceback
+        print("❌ Error in process_resume_file:", traceback.format_exc())
+        return {"error": str(e)}
 
-        data["languages"] = langs
 
-        # ---- Compute ATS ----
-        ats = calculate_ats_score(data, text, normalized_languages=langs)
+# -------------------------
+# Streaming processor (fields as soon as the model emits them)
+# -------------------------
+# Fields of the extraction JSON that calculate_ats_score reads
+ATS_INPUT_FIELDS = {"email", "phone", "education", "skills"}
 
-        # ---- Save to MongoDB ----
+
+async def stream_resume_events(contents: bytes, filename: str):
+    """
+    Async generator of progress events for one resume:
+    {"type": "text"} → {"type": "field", "key", "value"}... → {"type": "ats"} → {"type": "done", "result"}
+    (or {"type": "error", "error"}).
+    """
+    if not contents:
+        yield {"type": "error", "error": "Empty file received. Please upload a valid PDF."}
+        return
+    try:
+        pages = await extract_pdf_pages_async(contents)
+    except Exception as e:
+        yield {"type": "error", "error": f"Could not read PDF: {e}"}
+        return
+    text = "\n".join(pages)
+    if not text.strip():
+        yield {"type": "error", "error": "No readable text found in the uploaded PDF."}
+        return
+    if not ai_configured():
+        yield {"type": "error", "error": "AI client not configured (missing OPENROUTER_API_KEY)."}
+        return
+
+    yield {"type": "text", "pages": len(pages), "word_count": len(text.split())}
+
+    partial = {}
+    ats_sent = False
+    data = None
+    signature_task = asyncio.ensure_future(minhash_signature_async(text))
+    try:
+        async for event in stream_resume_json(build_extraction_prompt(build_resume_prompt_text(pages))):
+            if event[0] == "result":
+                data = event[1]
+                continue
+            _, key, value = event
+            partial[key] = value
+            yield {"type": "field", "key": key, "value": value}
+            if not ats_sent and ATS_INPUT_FIELDS <= partial.keys():
+                ats = calculate_ats_score(partial, text)
+                ats_sent = True
+                yield {"type": "ats", "ats_score": ats["ats_score"], "ats_breakdown": ats["ats_breakdown"]}
+    except ExtractionError as exc:
+        signature_task.cancel()
+        yield {"type": "error", "error": str(exc)}
+        return
+
+    yield {"type": "done", "result": finalize_resume(data, text, filename, signature=await signature_task)}
+
+
+# -------------------------
+# Batched processor (bulk admin uploads)
+# -------------------------
+def new_duplicate_detector():
+    """One detector per bulk request / job, or None when DEDUPE_ENABLED is off."""
+    if not DEDUPE_ENABLED:
+        return None
+    db = get_db()
+    return DuplicateDetector(db.reports if db is not None and mongo_available() else None)
+
+
+async def process_resume_batch(documents, detector=None):
+    """
+    Process several resumes with as few LLM requests as possible.
+    `documents` is a list of {"id", "filename", "contents"}; returns {id: result}
+    where each result has the same shape as process_resume_file's.
+    Short resumes are packed into one request; long ones, and any resume the
+    batch answer did not cover, fall back to single requests.
+    Pass the same `detector` for every batch of a request: near-duplicates of a resume
+    seen earlier (or of a stored report) reuse that parse, flagged with "duplicate_of".
+    """
+    if detector is None:
+        detector = new_duplicate_detector()
+    results = {}
+    prepared = []
+    duplicates = {}  # doc id -> (match, similarity)
+    first_by_digest, copies = {}, {}  # exact copies within this batch: doc id -> first doc id
+    to_read = []
+    for doc in documents:
+        if not doc["contents"]:
+            results[doc["id"]] = {"error": "Empty file received. Please upload a valid PDF."}
+            continue
+        digest = content_hash(doc["contents"]) if detector else None
+        match = detector.find_exact(digest) if detector else None
+        if match:
+            duplicates[doc["id"]] = (match, 1.0)
+            continue
+        if digest in first_by_digest:  # byte-identical copy inside this batch: reuse the first parse
+            copies[doc["id"]] = first_by_digest[digest]
+            continue
+        if digest:
+            first_by_digest[digest] = doc["id"]
+        to_read.append((doc, digest))
+
+    # PDFs of the batch are parsed (and MinHashed, when deduping) in parallel on the PDF pool
+    read = extract_pdf_and_signature_async if detector else extract_pdf_pages_async
+    parsed_pages = await asyncio.gather(*(read(doc["contents"]) for doc, _ in to_read), return_exceptions=True)
+    for (doc, digest), parsed in zip(to_read, parsed_pages):
         try:
-            await db.reports.insert_one({
-                "filename": getattr(upload_file, "filename", "uploaded_resume"),
-                "data": data,
-                "ats_breakdown": ats["ats_breakdown"],
-                "ats_score": ats["ats_score"],
-                "word_count": ats["word_count"],
-                "uploaded_at": datetime.utcnow(),
-            })
+            if isinstance(parsed, Exception):
+                raise parsed
+            pages, signature = parsed if detector else (parsed, None)
+            text = "\n".join(pages)
+            if not text.strip():
+                results[doc["id"]] = {"error": "No readable text found in the uploaded PDF."}
+                continue
+            if detector:
+                match, sim = detector.find(signature)
+                if match:
+                    duplicates[doc["id"]] = (match, sim)
+                    continue
+                detector.add(doc["id"], signature, digest)
+            prepared.append({**doc, "text": text, "prompt_text": build_resume_prompt_text(pages),
+                             "signature": signature, "digest": digest})
         except Exception as e:
-            print("⚠️ MongoDB insert failed:", e)
-
-        # ---- Return Result ----
-        return {
-            "data": data,
-            "ats_score": ats["ats_score"],
-            "ats_breakdown": ats["ats_breakdown"],
-            "word_count": ats["word_count"],
-        }
+            results[doc["id"]] = {"error": str(e)}
 
-    except Exception as e:
-        import traceback
-        print("❌ Error in process_resume_file:", traceback.format_exc())
-        return {"error": str(e)}
+    if prepared and not ai_configured():
+        for d in prepared:
+            results[d["id"]] = {"error": "AI client not configured (missing OPENROUTER_API_KEY)."}
+        prepared = []
+
+    short = [d for d in prepared if count_tokens(d["prompt_text"]) <= RESUME_BATCH_MAX_DOC_TOKENS]
+    extracted = {}
+    if len(short) > 1:
+        try:
+            extracted = await extract_resume_batch_json(
+                build_batch_extraction_prompt({d["id"]: d["prompt_text"] for d in short}),
+                [d["id"] for d in short],
+            )
+        except ExtractionError as exc:
+            print(f"⚠️ Batch extraction failed, falling back to single requests: {exc}")
+
+    fallback = [d for d in prepared if d["id"] not in extracted]
+    singles = await asyncio.gather(*(_extract_single(d["prompt_text"]) for d in fallback))
+    for doc, (data, error) in zip(fallback, singles):
+        if error:
+            results[doc["id"]] = error
+        else:
+            extracted[doc["id"]] = data
+
+    for doc in prepared:
+        if doc["id"] in extracted:
+            try:
+                results[doc["id"]] = finalize_resume(extracted[doc["id"]], doc["text"], doc["filename"],
+                                                     signature=doc["signature"], digest=doc["digest"], typed=True)
+            except Exception as e:
+                results[doc["id"]] = {"error": str(e)}
+        if detector:
+            detector.remember(doc["id"], doc["filename"], results.get(doc["id"]))
+
+    # ---- Duplicates: copy the earlier parse instead of calling the model ----
+    for doc_id, (match, sim) in duplicates.items():
+        results[doc_id] = detector.reuse(match, sim)
+    filenames = {doc["id"]: doc["filename"] for doc in documents}
+    for doc_id, first_id in copies.items():
+        first = results.get(first_id) or {"error": "Parsing failed"}
+        results[doc_id] = first if first.get("error") else {
+            **first, "duplicate_of": {"source": "batch", "filename": filenames.get(first_id), "similarity": 1.0}}
+    return results
 
 
 # -------------------------
@@ -367,67 +645,17 @@ async def extract_resume_data(text: str):
     Extract structured resume data using OpenRouter AI.
     Returns parsed JSON with keys like name, email, education, etc.
     """
-    if not openrouter_client:
-        return {}
-
-
-    prompt = f"""
-Extract structured resume info and return valid JSON ONLY:
-{{
-  "name": "", "email": "", "phone": "",
-  "linkedin": "", "github": "", "leetcode": "", "codechef": "",
-  "languages": [],
-  "education": {{
-      "10th": {{"school": "", "location": "", "year": "", "percentage": ""}},
-      "12th": {{"school": "", "location": "", "year": "", "percentage": ""}},
-      "bachelor": {{"institute": "", "location": "", "degree": "", "expected_graduation": "", "cgpa": ""}}
-  }},
-  "skills": {{"technical": [], "soft": []}},
-  "certificates": [],
-  "role_match": "",
-  "summary": ""
-}}
-Resume text:
-{prompt_text}
-"""
-    try:
-        completion = openrouter_client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[{"role": "system", "content": "Return valid JSON only."}, {"role": "user", "content": prompt}],
-            temperature=0.2,
-        )
-        raw = completion.choices[0].message.content.strip()
-    except Exception as exc:
-        print("⚠️ OpenRouter request failed in extract_resume_data:", exc)
+    if not ai_configured():
         return {}
 
-    raw_clean = raw.replace("```json", "").replace("```", "").strip()
+    prompt_text = build_resume_prompt_text([text])
     try:
-        data = json.loads(raw_clean)
-    except Exception:
-        print("⚠️ Invalid JSON returned by AI (extract_resume_data):", raw_clean)
+        data, _ = await extract_resume_json(build_extraction_prompt(prompt_text))
+    except ExtractionError as exc:
+        print("⚠️ OpenRouter extraction failed in extract_resume_data:", exc)
         return {}
 
     # Normalize languages same as process function
-    raw_langs = data.get("languages", [])
-    if isinstance(raw_langs, str):
-        raw_langs = re.split(r"[,;/]| and ", raw_langs)
-    langs = normalize_languages([lang.strip() for lang in raw_langs if lang and str(lang).strip()])
-
-    if not langs:
-        detected = []
-        standard_langs = {
-            "english": "English", "tamil": "Tamil", "hindi": "Hindi",
-            "telugu": "Telugu", "malayalam": "Malayalam", "kannada": "Kannada",
-            "french": "French", "german": "German", "spanish": "Spanish",
-            "bengali": "Bengali", "marathi": "Marathi", "punjabi": "Punjabi",
-            "gujarati": "Gujarati", "urdu": "Urdu", "oriya": "Oriya", "nepali": "Nepali"
-        }
-        tlower = text.lower()
-        for key, val in standard_langs.items():
-            if re.search(rf"\b{re.escape(key)}\b", tlower):
-                detected.append(val)
-        langs = detected if detected else ["English"]
-
+    langs = resolve_languages(data, text)
     data["languages"] = langs
     return data
@@ -0,0 +1,139 @@
+# app/helpers/resume_model.py
+# Typed, compact form of a parsed resume.
+# ParsedResume.from_dict() validates and normalizes the extraction JSON once (strings
+# stripped, lists deduplicated, education filled to the template) and precomputes what
+# the filters compare against: numeric 10th / 12th percentages and CGPA, the lowercased
+# degree, the lowercased language / technical skill sets and the canonical skill ids
+# (helpers/skill_taxonomy.py) the admin filter matches against. to_dict() serializes it
+# back to the RESUME_TEMPLATE shape the API returns and Mongo stores.
+
+import re
+from dataclasses import dataclass, field
+
+from app.helpers.skill_taxonomy import canonical_skills
+
+EDUCATION_FIELDS = {
+    "10th": ("school", "location", "year", "percentage"),
+    "12th": ("school", "location", "year", "percentage"),
+    "bachelor": ("institute", "location", "degree", "expected_graduation", "cgpa"),
+}
+TEXT_FIELDS = ("name", "email", "phone", "linkedin", "github", "leetcode", "codechef", "role_match", "summary")
+KNOWN_FIELDS = set(TEXT_FIELDS) | {"languages", "education", "skills", "certificates"}
+
+_NUMBER_RE = re.compile(r"\d+(\.\d+)?")
+
+
+# -------------------------
+# Field parsers
+# -------------------------
+def parse_percentage(value):
+    """Convert string percentage (like '92.6%') to float."""
+    if not value:
+        return 0.0
+    try:
+        return float(str(value).replace("%", "").strip())
+    except Exception:
+        return 0.0
+
+
+def parse_cgpa(value):
+    """Convert CGPA string (like '8.32 (upto 5th semester)') to float."""
+    if not value:
+        return 0.0
+    match = _NUMBER_RE.search(str(value))
+    return float(match.group()) if match else 0.0
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _strings(values):
+    """Non-empty stripped strings, first occurrence kept (case-insensitive)."""
+    if isinstance(values, str):
+        values = [values]
+    out, seen = [], set()
+    for value in values or []:
+        text = _text(value)
+        if text and text.lower() not in seen:
+            seen.add(text.lower())
+            out.append(text)
+    return tuple(out)
+
+
+def _education(raw):
+    raw = raw if isinstance(raw, dict) else {}
+    edu = {}
+    for level, keys in EDUCATION_FIELDS.items():
+        entry = raw.get(level) if isinstance(raw.get(level), dict) else {}
+        edu[level] = {k: _text(entry.get(k)) for k in keys}
+    return edu
+
+
+# -------------------------
+# Model
+# -------------------------
+@dataclass(slots=True)
+class ParsedResume:
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+    github: str = ""
+    leetcode: str = ""
+    codechef: str = ""
+    languages: tuple = ()
+    education: dict = field(default_factory=lambda: _education({}))
+    technical_skills: tuple = ()
+    soft_skills: tuple = ()
+    certificates: tuple = ()
+    role_match: str = ""
+    summary: str = ""
+    extra: dict = field(default_factory=dict)  # keys outside the template (kept, not interpreted)
+
+    # precomputed once for filtering
+    tenth: float = 0.0
+    twelfth: float = 0.0
+    cgpa: float = 0.0
+    degree_lower: str = ""
+    language_set: frozenset = frozenset()
+    skill_set: frozenset = frozenset()
+    skill_ids: frozenset = frozenset()  # canonical ids ("reactjs" → "react")
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data if isinstance(data, dict) else {}
+        skills = data.get("skills") if isinstance(data.get("skills"), dict) else {}
+        edu = _education(data.get("education"))
+        languages = _strings(data.get("languages"))
+        technical = _strings(skills.get("technical"))
+        return cls(
+            **{k: _text(data.get(k)) for k in TEXT_FIELDS},
+            languages=languages,
+            education=edu,
+            technical_skills=technical,
+            soft_skills=_strings(skills.get("soft")),
+            certificates=_strings(data.get("certificates")),
+            extra={k: v for k, v in data.items() if k not in KNOWN_FIELDS},
+            tenth=parse_percentage(edu["10th"]["percentage"]),
+            twelfth=parse_percentage(edu["12th"]["percentage"]),
+            cgpa=parse_cgpa(edu["bachelor"]["cgpa"]),
+            degree_lower=edu["bachelor"]["degree"].lower(),
+            language_set=frozenset(lang.lower() for lang in languages),
+            skill_set=frozenset(skill.lower() for skill in technical),
+            skill_ids=canonical_skills(technical),
+        )
+
+    def skills_dict(self):
+        return {"technical": list(self.technical_skills), "soft": list(self.soft_skills)}
+
+    def to_dict(self):
+        """RESUME_TEMPLATE-shaped dict (plus any extra keys), ready for JSON / Mongo."""
+        return {
+            **self.extra,
+            **{k: getattr(self, k) for k in TEXT_FIELDS},
+            "languages": list(self.languages),
+            "education": {level: dict(entry) for level, entry in self.education.items()},
+            "skills": self.skills_dict(),
+            "certificates": list(self.certificates),
+        }
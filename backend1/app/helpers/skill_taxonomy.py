@@ -0,0 +1,171 @@
+# app/helpers/skill_taxonomy.py
+# Skill taxonomy: alias → canonical skill id.
+# Resume skills are mapped to canonical ids once, at parse time (ParsedResume.skill_ids),
+# and admin filter criteria go through the same mapping, so "does this resume have these
+# skills" is a set containment check: "reactjs" and "React.js" are both "react", and
+# "java" no longer matches "javascript".
+# The aliases are compiled into a token trie; skills_in_text() scans free text with it
+# (longest alias wins), which is what ATS scoring uses for keyword hits.
+
+import re
+
+# canonical id -> aliases (the id itself is always an alias)
+SKILL_ALIASES = {
+    # languages
+    "python": ["python3", "py"],
+    "java": ["core java", "java se"],
+    "javascript": ["js", "ecmascript", "es6", "vanilla js"],
+    "typescript": ["ts"],
+    "c": ["c language", "c programming"],
+    "c++": ["cpp", "c plus plus"],
+    "c#": ["csharp", "c sharp"],
+    "go": ["golang"],
+    "kotlin": [],
+    "swift": [],
+    "rust": [],
+    "php": [],
+    "ruby": [],
+    "r": ["r programming"],
+    "sql": ["structured query language"],
+    "html": ["html5"],
+    "css": ["css3"],
+    "bash": ["shell scripting", "shell script", "sh"],
+    # frameworks / libraries
+    "react": ["reactjs", "react.js", "react js"],
+    "react native": [],
+    "angular": ["angularjs", "angular.js"],
+    "vue": ["vuejs", "vue.js"],
+    "next.js": ["nextjs", "next js"],
+    "node": ["nodejs", "node.js", "node js"],
+    "express": ["expressjs", "express.js"],
+    "django": [],
+    "flask": [],
+    "fastapi": ["fast api"],
+    "spring": ["spring boot", "springboot"],
+    "tensorflow": ["tf"],
+    "pytorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "pandas": [],
+    "numpy": [],
+    "opencv": [],
+    "tailwind": ["tailwindcss", "tailwind css"],
+    "bootstrap": [],
+    # data stores
+    "mongodb": ["mongo"],
+    "mysql": [],
+    "postgres": ["postgresql", "psql"],
+    "redis": [],
+    "firebase": [],
+    "kafka": ["apache kafka"],
+    # cloud / ops
+    "aws": ["amazon web services"],
+    "azure": ["microsoft azure"],
+    "gcp": ["google cloud", "google cloud platform"],
+    "docker": [],
+    "kubernetes": ["k8s"],
+    "devops": [],
+    "ci/cd": ["cicd", "ci cd"],
+    "linux": [],
+    "rest": ["rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "graphql": [],
+    # tools
+    "git": [],
+    "github": [],
+    "jira": [],
+    "jenkins": [],
+    "figma": [],
+    "tableau": [],
+    "power bi": ["powerbi"],
+    "excel": ["ms excel", "microsoft excel"],
+    "visual studio": [],
+    "vs code": ["vscode", "visual studio code"],
+    "colab": ["google colab"],
+    "postman": [],
+    # fields
+    "machine learning": ["ml"],
+    "deep learning": ["dl"],
+    "data structures": ["dsa", "data structures and algorithms"],
+    "nlp": ["natural language processing"],
+    "computer vision": [],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[./][a-z0-9+#]+)*")
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def normalize_skill(name):
+    """Lowercase, punctuation-insensitive key: 'React.JS ' → 'react.js'."""
+    return " ".join(_tokens(name))
+
+
+# -------------------------
+# Compiled lookup tables
+# -------------------------
+_ALIAS_TO_ID = {}
+_TRIE = {}
+_END = object()  # trie node key holding the canonical id
+
+
+def _add_alias(alias, canonical):
+    key = normalize_skill(alias)
+    if not key:
+        return
+    _ALIAS_TO_ID[key] = canonical
+    node = _TRIE
+    for token in key.split(" "):
+        node = node.setdefault(token, {})
+    node[_END] = canonical
+
+
+for _canonical, _aliases in SKILL_ALIASES.items():
+    for _alias in [_canonical, *_aliases]:
+        _add_alias(_alias, _canonical)
+
+
+def canonical_skill(name):
+    """Canonical id for one skill name; unknown skills keep their normalized form as id."""
+    key = normalize_skill(name)
+    if not key:
+        return None
+    if key in _ALIAS_TO_ID:
+        return _ALIAS_TO_ID[key]
+    found = skills_in_text(key)
+    # "Python 3.10" / "ReactJS (Hooks)": exactly one known skill inside → that skill
+    return next(iter(found)) if len(found) == 1 else key
+
+
+def canonical_skills(names):
+    """frozenset of canonical ids for a list of skill names (or one comma-separated string)."""
+    if isinstance(names, str):
+        names = names.split(",")
+    return frozenset(filter(None, (canonical_skill(n) for n in names or [])))
+
+
+def skills_in_text(text):
+    """Canonical ids of every known skill alias in `text` (token-aligned, longest match)."""
+    tokens = _tokens(text)
+    found = set()
+    resume_at = 0
+    # most tokens start no alias: only walk the trie from those that do
+    for i in [i for i, token in enumerate(tokens) if token in _TRIE]:
+        if i < resume_at:
+            continue  # inside the previous (longer) match
+        node = _TRIE[tokens[i]]
+        if len(node) == 1 and _END in node:  # one-token alias, nothing longer starts here
+            found.add(node[_END])
+            continue
+        match = node.get(_END)
+        if match is not None:
+            resume_at = i + 1
+        for j in range(i + 1, len(tokens)):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+            if _END in node:
+                match, resume_at = node[_END], j + 1
+        if match is not None:
+            found.add(match)
+    return found
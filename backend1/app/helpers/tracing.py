@@ -0,0 +1,165 @@
+# app/helpers/tracing.py
+# Lightweight per-request tracing.
+# span("stage") / @traced("stage") time a pipeline stage: every span feeds the
+# stage_duration_seconds histogram (/metrics) and, inside a request, is added to the
+# request's trace. TimingMiddleware returns the trace as a Server-Timing header and
+# writes a sampled share of traces (TRACE_SAMPLE_RATE) as JSON lines to TRACE_FILE.
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from starlette.datastructures import MutableHeaders
+
+from app.helpers.metrics import histogram
+
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "traces.jsonl"))
+
+STAGE_DURATION = histogram("stage_duration_seconds", "Duration of pipeline stages", ["stage"])
+REQUEST_DURATION = histogram("http_request_duration_seconds", "HTTP request duration", ["method", "route", "status"])
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_file_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.spans = []
+
+    def add(self, name, started, duration, attrs):
+        self.spans.append({
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 2),
+            "dur_ms": round(duration * 1000, 2),
+            **({"attrs": attrs} if attrs else {}),
+        })
+
+    def server_timing(self):
+        """Server-Timing value: one entry per stage (durations of repeated stages are summed)."""
+        totals = {}
+        for s in list(self.spans):
+            totals[s["name"]] = totals.get(s["name"], 0) + s["dur_ms"]
+        entries = [f"{name};dur={dur:.1f}" for name, dur in totals.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+# -------------------------
+# Spans
+# -------------------------
+def record_span(name: str, started: float, **attrs):
+    """Record a stage that began at `started` (time.perf_counter()) and ends now."""
+    duration = time.perf_counter() - started
+    STAGE_DURATION.observe(duration, stage=name)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, started, duration, attrs)
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a stage: `with span("llm", model=model): ...`"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, started, **attrs)
+
+
+def traced(name: str):
+    """Decorator form of span() for sync and async functions."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def route_template(scope):
+    """
+    Matched route template with its router prefix, e.g. "/resume/upload_resume".
+    Newer FastAPI versions keep included routes unprefixed in scope["route"], so the
+    prefix is taken from the leading segments of the request path.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return "unmatched"
+    depth = len(template.strip("/").split("/")) if template.strip("/") else 0
+    segments = scope["path"].strip("/").split("/")
+    prefix = "/".join(segments[:len(segments) - depth]) if len(segments) > depth else ""
+    return f"/{prefix}{template}" if prefix else (template or "/")
+
+
+def _write_trace(record):
+    try:
+        with _file_lock, open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print("⚠️ Could not write trace:", e)
+
+
+# -------------------------
+# ASGI middleware
+# -------------------------
+class TimingMiddleware:
+    """
+    Pure ASGI (does not buffer streaming responses). The Server-Timing header holds the
+    stages finished before the response started, so SSE endpoints only report setup stages.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        token = _current_trace.set(trace)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            total = time.perf_counter() - trace.started
+            route = route_template(scope)
+            REQUEST_DURATION.observe(total, method=scope["method"], route=route, status=status["code"])
+            if TRACE_SAMPLE_RATE and random.random() < TRACE_SAMPLE_RATE:
+                record = {
+                    "trace_id": trace.id,
+                    "ts": time.time(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status["code"],
+                    "total_ms": round(total * 1000, 2),
+                    "spans": trace.spans,
+                }
+                await asyncio.to_thread(_write_trace, record)
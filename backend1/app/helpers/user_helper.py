@@ -0,0 +1,157 @@
+# app/helpers/user_helper.py
+# Shared helpers for the `users` collection — email normalization, indexes and migrations.
+
+import base64
+import json
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+
+
+# -------------------------
+# Email normalization
+# -------------------------
+def normalize_email(email: str):
+    """Canonical form used for every user lookup (trimmed + lowercased)."""
+    if not email:
+        return ""
+    return str(email).strip().lower()
+
+
+def email_filter(email: str):
+    """Exact-match filter on the indexed `email_normalized` field."""
+    return {"email_normalized": normalize_email(email)}
+
+
+# -------------------------
+# Indexes
+# -------------------------
+def ensure_user_indexes(users):
+    """Create the unique index backing case-insensitive email lookups."""
+    try:
+        users.create_index(
+            [("email_normalized", ASCENDING)],
+            name="email_normalized_unique",
+            unique=True,
+            # users created before the migration have no normalized email yet
+            partialFilterExpression={"email_normalized": {"$type": "string"}},
+        )
+    except PyMongoError as e:
+        print("⚠️ Could not create users.email_normalized index (run the migration first):", e)
+
+
+# -------------------------
+# Keyset pagination for user listings
+# -------------------------
+# Public sort name → (indexed field, base filter that lets Mongo use its index)
+USER_SORT_FIELDS = {
+    "created": ("_id", {}),
+    "email": ("email_normalized", {"email_normalized": {"$type": "string"}}),
+}
+
+
+def encode_cursor(value):
+    raw = json.dumps(value if not isinstance(value, ObjectId) else {"$oid": str(value)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor — raises ValueError on malformed input."""
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        if isinstance(value, dict) and "$oid" in value:
+            return ObjectId(value["$oid"])
+        return value
+    except (ValueError, InvalidId, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def build_user_page_query(sort: str = "created", order: str = "asc", cursor: str = None):
+    """
+    Build (filter, sort spec, sort field) for one keyset page.
+    Both sort fields are unique, so the last value seen is a complete cursor.
+    """
+    if sort not in USER_SORT_FIELDS:
+        raise ValueError(f"Unsupported sort '{sort}' (use one of: {', '.join(USER_SORT_FIELDS)})")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+
+    field, base_filter = USER_SORT_FIELDS[sort]
+    query = {k: dict(v) for k, v in base_filter.items()}
+    if cursor:
+        last_value = decode_cursor(cursor)
+        query.setdefault(field, {})["$gt" if order == "asc" else "$lt"] = last_value
+
+    direction = ASCENDING if order == "asc" else DESCENDING
+    return query, [(field, direction)], field
+
+
+# -------------------------
+# Migration: backfill email_normalized
+# -------------------------
+def migrate_normalized_emails(users):
+    """
+    Backfill `email_normalized` on existing user documents.
+    Returns counts of updated documents and of duplicate emails that were skipped
+    (these must be merged by hand before the unique index can be built).
+    """
+    seen = {}
+    duplicates = []
+    updated = 0
+
+    cursor = users.find({"email": {"$type": "string"}}, {"_id": 1, "email": 1, "email_normalized": 1})
+    for doc in cursor:
+        normalized = normalize_email(doc.get("email"))
+        if not normalized:
+            continue
+        if normalized in seen:
+            duplicates.append({"email": normalized, "ids": [str(seen[normalized]), str(doc["_id"])]})
+            continue
+        seen[normalized] = doc["_id"]
+        if doc.get("email_normalized") != normalized:
+            users.update_one({"_id": doc["_id"]}, {"$set": {"email_normalized": normalized}})
+            updated += 1
+
+    for dup in duplicates:
+        print(f"⚠️ Duplicate user email needs manual merge: {dup['email']} -> {dup['ids']}")
+
+    return {"updated": updated, "duplicates": duplicates}
+
+
+def backfill_missing_normalized_emails(users):
+    """
+    Startup backfill (lifecycle._init_mongo): only users still without `email_normalized`
+    are read, so it is a no-op once the migration has run. Emails already taken by another
+    user are left alone and reported, as in migrate_normalized_emails.
+    """
+    updated = 0
+    for doc in users.find({"email": {"$type": "string"}, "email_normalized": {"$exists": False}}, {"_id": 1, "email": 1}):
+        normalized = normalize_email(doc["email"])
+        if not normalized:
+            continue
+        other = users.find_one({"email_normalized": normalized}, {"_id": 1})
+        if other is not None:
+            print(f"⚠️ Duplicate user email needs manual merge: {normalized} -> {[str(other['_id']), str(doc['_id'])]}")
+            continue
+        users.update_one({"_id": doc["_id"]}, {"$set": {"email_normalized": normalized}})
+        updated += 1
+    if updated:
+        print(f"✅ Backfilled email_normalized on {updated} users")
+    return updated
+
+
+# -------------------------
+# CLI: python -m app.helpers.user_helper
+# -------------------------
+if __name__ == "__main__":
+    from app.config import get_db
+
+    users_collection = get_db()["users"]
+
+    summary = migrate_normalized_emails(users_collection)
+    print(f"✅ Backfilled email_normalized on {summary['updated']} users")
+    if not summary["duplicates"]:
+        ensure_user_indexes(users_collection)
+        print("✅ users.email_normalized unique index ready")
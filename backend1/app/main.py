@@ -1,8 +1,11 @@
 # app/main.py
 # Main entry point for the AI Resume + Platform Analyzer backend
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 import os
 import uvicorn
@@ -17,11 +20,34 @@ from app.routes.admin_resume_filter import router as admin_filter_router
 from app.routes.auth_routes import router as auth_router   # ✅ contains logout()
 from app.routes.user import router as user_router
 from app.routes.ai_routes import router as ai_router
+from app.routes.usage_routes import router as usage_router
+from app.routes.report_routes import router as report_router
+from app.helpers.compression import CompressionMiddleware
+from app.helpers.fast_json import FastJSONResponse
+from app.helpers.metrics import render_prometheus
+from app.helpers.filter_jobs import job_manager
+from app.helpers import lifecycle
+from app.helpers.llm_usage import UsageAttributionMiddleware
+from app.helpers.tracing import TimingMiddleware
+
+# -------------------------
+# Lifespan: shared resources + background filter jobs
+# -------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mongo down → degraded mode (see helpers/lifecycle.py), never a failed boot
+    await lifecycle.startup()
+    job_manager.start()  # resumes unfinished jobs
+    yield
+    await job_manager.stop()
+    await lifecycle.shutdown()
+
 
 # -------------------------
 # FastAPI App Initialization
 # -------------------------
-app = FastAPI(title="AI Resume + Platform Analyzer")
+app = FastAPI(title="AI Resume + Platform Analyzer", lifespan=lifespan,
+              default_response_class=FastJSONResponse)  # orjson when installed (helpers/fast_json.py)
 
 # -------------------------
 # ✅ CORS Setup (allow cookies from frontend)
@@ -38,6 +64,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ gzip / brotli for large JSON bodies; SSE is never compressed (see helpers/compression.py)
+app.add_middleware(CompressionMiddleware)
+
+# ✅ Per-stage timings → Server-Timing header + /metrics histograms (see helpers/tracing.py)
+app.add_middleware(TimingMiddleware)
+
+# ✅ LLM token / cost accounting per route + logged-in user (see helpers/llm_usage.py)
+app.add_middleware(UsageAttributionMiddleware)
+
 # -------------------------
 # Root Route
 # -------------------------
@@ -45,6 +80,29 @@ app.add_middleware(
 def root():
     return {"message": "AI Resume + Platform Analyzer running ✅"}
 
+# -------------------------
+# Health checks (liveness / readiness with dependency state)
+# -------------------------
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    return lifecycle.liveness()
+
+
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    workers = job_manager.worker_count()
+    ready, report = lifecycle.readiness({
+        "filter_job_workers": {"status": "up" if workers else "down", "running": workers},
+    })
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+# -------------------------
+# Metrics (Prometheus text format)
+# -------------------------
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # -------------------------
 # Routers
 # -------------------------
@@ -57,6 +115,8 @@ app.include_router(admin_filter_router, prefix="/admin", tags=["Admin Filter"])
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])  # ✅ includes /logout
 app.include_router(user_router, tags=["User"])
 app.include_router(ai_router, tags=["AI"])
+app.include_router(usage_router)
+app.include_router(report_router)
 
 # -------------------------
 # Run Server
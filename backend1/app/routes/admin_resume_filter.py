@@ -1,36 +1,55 @@
-from fastapi import APIRouter, UploadFile, File, Form
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import List, Optional
-from app.helpers.resume_helper import process_resume_file
-from io import BytesIO
-import json
-import re
+from app.helpers.admission import admission, admit
+from app.helpers.archive_ingest import ArchiveError, aiter_archive_members, is_archive
+from app.helpers.resume_helper import new_duplicate_detector, process_resume_batch
+from app.helpers.resume_filter import build_criteria, filter_parsed_resume
+from app.helpers.filter_jobs import JobNotFound, job_manager, job_summary
+from app.helpers.fast_json import dumps
+from app.helpers.lifecycle import drain_event, draining
 import asyncio
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 10
+
+
 # ---------------------------------------------------------
-# 🔧 Helper functions
+# 📦 Uploaded files → documents (archives are expanded member by member)
 # ---------------------------------------------------------
-def parse_percentage(value):
-    """Convert string percentage (like '92.6%') to float."""
-    if not value:
-        return 0.0
-    try:
-        return float(str(value).replace("%", "").strip())
-    except Exception:
-        return 0.0
-
+async def iter_upload_documents(files, seen):
+    """
+    Yield {"id", "index", "filename", "contents"} for every non-empty resume, reading
+    plain uploads one at a time and ZIP/tar uploads member by member. `seen["total"]`
+    grows as archive members are discovered.
+    """
+    index = 0
+    for file in files:
+        if not is_archive(file.filename):
+            index += 1
+            try:
+                contents = await file.read()
+            except Exception as e:
+                print(f"⚠️ Error reading {file.filename}: {e}")
+                continue
+            if not contents:
+                print(f"⚠️ Empty file skipped: {file.filename}")
+                continue
+            yield {"id": f"doc{index}", "index": index, "filename": file.filename, "contents": contents}
+            continue
 
-def parse_cgpa(value):
-    """Convert CGPA string (like '8.32 (upto 5th semester)') to float."""
-    if not value:
-        return 0.0
-    try:
-        match = re.search(r"\d+(\.\d+)?", str(value))
-        return float(match.group()) if match else 0.0
-    except Exception:
-        return 0.0
+        async for member in aiter_archive_members(file.file, file.filename):
+            if member.get("skipped"):
+                print(f"⚠️ Archive member skipped ({member['skipped']}): {member['filename']}")
+                continue
+            index += 1
+            seen["total"] += 1
+            with member["file"] as f:
+                contents = f.read()
+            if contents:
+                yield {"id": f"doc{index}", "index": index, "filename": member["filename"], "contents": contents}
 
 
 # ---------------------------------------------------------
@@ -47,98 +66,191 @@ async def filter_uploaded_resumes_stream(
     language: Optional[str] = Form(None),
     department: Optional[str] = Form(None),
     degree: Optional[str] = Form(None),
+    batch_size: int = Form(1),
 ):
     """
     Stream resume filtering progress file by file, returning live updates to the frontend.
+    ZIP / tar uploads are expanded member by member (see archive_ingest.py).
     Each SSE (Server-Sent Event) message includes partial progress and cumulative results.
+    With batch_size > 1, short resumes are extracted several per LLM request
+    (falling back to single requests when a batch answer cannot be used).
+    Each batch runs in a low-priority "bulk" admission slot, so interactive uploads
+    and chat go first; the request is rejected with 429 up front when the bulk queue is full.
     """
-    skill_list = [s.strip().lower() for s in skills.split(",")] if skills else []
-    language = language.lower().strip() if language else None
-    department = department.lower().strip() if department else None
-    degree = degree.lower().strip() if degree else None
-    total_files = len(files)
+    criteria = build_criteria(cgpa, tenth, twelfth, ats, skills, language, department, degree)
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    first_ticket = await admit("bulk")
+    seen = {"total": sum(not is_archive(f.filename) for f in files)}
 
     async def event_stream():
         results = []
         processed_count = 0
+        ticket = first_ticket
+        documents_iter = iter_upload_documents(files, seen)
+        detector = new_duplicate_detector()  # copies within this upload reuse the first parse
 
-        for i, file in enumerate(files, start=1):
+        while True:
+            chunk = []
             try:
-                original_bytes = await file.read()
-                if not original_bytes:
-                    print(f"⚠️ Empty file skipped: {file.filename}")
-                    continue
+                async for doc in documents_iter:
+                    chunk.append(doc)
+                    if len(chunk) >= batch_size:
+                        break
+            except ArchiveError as e:
+                yield f"data: {dumps({'error': str(e)})}\n\n"
+                break
+            if not chunk:
+                break
 
-                # Process resume in-memory
-                processing_copy = UploadFile(filename=file.filename, file=BytesIO(original_bytes))
-                parsed = await process_resume_file(processing_copy)
-                if not parsed or parsed.get("error"):
-                    print(f"⚠️ Parsing failed for: {file.filename}")
-                    continue
+            # Process resumes in-memory (one LLM request per batch when possible)
+            if ticket is None:
+                # already admitted: wait behind interactive work instead of failing mid-stream
+                ticket = await admission.acquire("bulk", enforce_limit=False)
+            try:
+                parsed_by_id = await process_resume_batch(chunk, detector)
+            finally:
+                ticket.release()
+                ticket = None
 
-                data = parsed.get("data", {})
-                ats_score = parsed.get("ats_score", 0)
-                edu = data.get("education", {}) or {}
-                langs = [lang.lower().strip() for lang in data.get("languages", []) if lang]
-                tech_skills = [s.lower().strip() for s in data.get("skills", {}).get("technical", []) if s]
-                email = data.get("email") or parsed.get("email")
-                phone = data.get("phone") or parsed.get("phone")
-
-                # Convert numeric fields
-                tenth_value = parse_percentage(edu.get("10th", {}).get("percentage"))
-                twelfth_value = parse_percentage(edu.get("12th", {}).get("percentage"))
-                cgpa_value = parse_cgpa(edu.get("bachelor", {}).get("cgpa"))
-
-                # Apply filters
-                if cgpa and cgpa_value < cgpa:
-                    continue
-                if tenth and tenth_value < tenth:
-                    continue
-                if twelfth and twelfth_value < twelfth:
-                    continue
-                if ats and ats_score < ats:
-                    continue
-                if language and not any(language in l for l in langs):
-                    continue
-                if department and department not in str(edu.get("bachelor", {}).get("degree", "")).lower():
-                    continue
-                if degree and degree not in str(edu.get("bachelor", {}).get("degree", "")).lower():
-                    continue
-                if skill_list and not all(any(skill in s for s in tech_skills) for skill in skill_list):
-                    continue
+            for doc in chunk:
+                filename = doc["filename"]
+                try:
+                    parsed = parsed_by_id.get(doc["id"])
+                    if not parsed or parsed.get("error"):
+                        print(f"⚠️ Parsing failed for: {filename}")
+                        continue
 
-                # Build final filtered record
-                result = {
-                    "filename": file.filename,
-                    "name": data.get("name"),
-                    "email": email,
-                    "phone": phone,
-                    "ats_score": ats_score,
-                    "education": edu,
-                    "skills": data.get("skills", {}),
-                    "languages": langs,
-                }
-                results.append(result)
-                processed_count += 1
-
-                # Send partial progress
-                progress_payload = {
-                    "progress": i,
-                    "processed": processed_count,
-                    "total": total_files,
-                    "latest_filename": file.filename,
-                    "latest_name": data.get("name"),
-                    "results_so_far": results,
-                }
-                yield f"data: {json.dumps(progress_payload)}\n\n"
-                await asyncio.sleep(0.05)
+                    result = filter_parsed_resume(parsed, filename, criteria)
+                    if result is None:
+                        continue
+                    results.append(result)
+                    processed_count += 1
 
-            except Exception as e:
-                print(f"⚠️ Error processing {file.filename}: {e}")
-                continue
+                    # Send partial progress
+                    progress_payload = {
+                        "progress": doc["index"],
+                        "processed": processed_count,
+                        "total": seen["total"],
+                        "latest_filename": filename,
+                        "latest_name": result["name"],
+                        "results_so_far": results,
+                    }
+                    yield f"data: {dumps(progress_payload)}\n\n"
+                    await asyncio.sleep(0.05)
+
+                except Exception as e:
+                    print(f"⚠️ Error processing {filename}: {e}")
+                    continue
 
         # Final event — marks completion
         final_payload = {"done": True, "results": results, "count": len(results)}
-        yield f"data: {json.dumps(final_payload)}\n\n"
+        yield f"data: {dumps(final_payload)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        background=BackgroundTask(first_ticket.release),
+    )
+
+
+# ---------------------------------------------------------
+# 🗂️ Background filter jobs (survive disconnects and restarts)
+# ---------------------------------------------------------
+@router.post("/filter_jobs", status_code=202)
+async def create_filter_job(
+    files: List[UploadFile] = File(...),
+    cgpa: Optional[float] = Form(None),
+    tenth: Optional[float] = Form(None),
+    twelfth: Optional[float] = Form(None),
+    ats: Optional[float] = Form(None),
+    skills: Optional[str] = Form(None),
+    language: Optional[str] = Form(None),
+    department: Optional[str] = Form(None),
+    degree: Optional[str] = Form(None),
+    batch_size: int = Form(1),
+):
+    """
+    Submit a bulk filter as a background job (same form fields as the stream endpoint,
+    ZIP / tar archives of PDFs included).
+    Files are spooled to disk and processed by the job worker; follow progress with
+    GET /admin/filter_jobs/{job_id} (poll) or /admin/filter_jobs/{job_id}/stream (SSE).
+    """
+    criteria = build_criteria(cgpa, tenth, twelfth, ats, skills, language, department, degree)
+    try:
+        job = await job_manager.create_job(files, criteria, max(1, min(batch_size, MAX_BATCH_SIZE)))
+    except ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job_summary(job, include_results=False)
+
+
+def _get_job(job_id):
+    try:
+        return job_manager.get(job_id)
+    except JobNotFound:
+        raise HTTPException(status_code=404, detail="Filter job not found")
+
+
+@router.get("/filter_jobs/{job_id}")
+def get_filter_job(job_id: str):
+    return job_summary(_get_job(job_id))
+
+
+@router.delete("/filter_jobs/{job_id}")
+def cancel_filter_job(job_id: str):
+    _get_job(job_id)
+    return job_summary(job_manager.cancel(job_id), include_results=False)
+
+
+def _job_progress_payload(job):
+    latest = job.get("latest", {})
+    return {
+        "progress": latest.get("progress", 0),
+        "processed": len(job["results"]),
+        "total": len(job["files"]),
+        "completed_files": sum(f["state"] != "pending" for f in job["files"]),
+        "latest_filename": latest.get("filename"),
+        "latest_name": latest.get("name"),
+        "results_so_far": job["results"],
+    }
+
+
+@router.get("/filter_jobs/{job_id}/stream")
+async def stream_filter_job(job_id: str, request: Request):
+    """
+    Progress of a job as SSE, in the same payload format as /filter_uploaded_resumes_stream.
+    Safe to reconnect at any time: the current state is sent first, then every update.
+    """
+    _get_job(job_id)
+
+    async def event_stream():
+        last_sent = None
+        while True:
+            changed = job_manager.change_event(job_id)
+            job = job_manager.get(job_id)
+            if job["status"] not in ("queued", "running"):
+                final_payload = {"done": True, "status": job["status"], "results": job["results"], "count": len(job["results"])}
+                yield f"data: {dumps(final_payload)}\n\n"
+                return
+            if job["updated_at"] == last_sent:
+                yield ": keep-alive\n\n"
+            else:
+                last_sent = job["updated_at"]
+                yield f"data: {dumps(_job_progress_payload(job))}\n\n"
+            waiters = [asyncio.ensure_future(changed.wait()), asyncio.ensure_future(drain_event().wait())]
+            # jobs run by another worker process are polled from their manifest
+            timeout = 15 if job_manager.owns(job_id) else 2
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in waiters:
+                waiter.cancel()
+            if draining():
+                # server is shutting down: the job is checkpointed and resumes on restart
+                yield f"retry: 2000\ndata: {dumps({'draining': True, 'job_id': job_id, 'reconnect': True})}\n\n"
+                return
+            if await request.is_disconnected():
+                return  # the job keeps running; reconnect with the same job_id
 
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,40 @@
 # app/routes/ai_routes.py
 from fastapi import APIRouter, HTTPException, Request
-from openai import OpenAI
-import os
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import json
 
+from app.config import ai_configured
+from app.helpers.admission import admit, admitted
+from app.helpers.ai_helper import chat_completion, stream_chat_completion
+from app.helpers.prompt_builder import compact_resume_context
+from app.helpers.chat_sessions import add_turn, session_store
+
 router = APIRouter(prefix="/ai", tags=["AI Chat"])
 
-# ✅ Use the new OpenAI v1.0 client syntax with OpenRouter
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-)
+
+async def resolve_session(body: dict):
+    """
+    Return the chat session for this request (or None for a stateless call).
+    - {session_id, query}: continue a stored session
+    - {resume_data, query}: start a new session with the compacted resume
+    - {session_id, resume_data, query}: continue, replacing the stored resume
+    """
+    session_id = body.get("session_id")
+    resume_data = body.get("resume_data")
+
+    if session_id:
+        session = await session_store.aget(session_id)
+        if session is not None:
+            if resume_data:
+                session["context"] = compact_resume_context(resume_data)
+            return session
+        if not resume_data:
+            raise HTTPException(status_code=404, detail="Chat session expired or not found — resend resume_data")
+
+    if resume_data:
+        return await session_store.acreate(compact_resume_context(resume_data))
+    return None
 
 
 @router.post("/chat")
@@ -18,41 +42,90 @@ async def chat_ai(request: Request):
     """
     AI chat assistant for resume-based Q&A.
     Uses OpenRouter GPT model and supports structured resume data context.
+    Send resume_data once; follow-ups only need the returned session_id + query.
+    Identical prompts are served from the response cache unless "no_cache": true.
     """
     try:
         body = await request.json()
         query = body.get("query")
-        resume_data = body.get("resume_data", {})
 
         if not query:
             raise HTTPException(status_code=400, detail="Missing query")
+        if not ai_configured():
+            raise HTTPException(status_code=503, detail="AI client not configured (missing OPENROUTER_API_KEY).")
+
+        session = await resolve_session(body)
+
+        # ✅ Shared in-process service (also used by /user/upload_resume)
+        async with admitted("interactive"):
+            answer = await chat_completion(query, session=session, use_cache=not body.get("no_cache", False))
 
-        # 🧠 Create context prompt
-        prompt = f"""
-        You are a career AI assistant. 
-        Use the following resume data to provide helpful, accurate, and personalized career advice.
+        if session is None:
+            return {"response": answer}
+        add_turn(session, query, answer)
+        await session_store.asave(session)
+        return {"response": answer, "session_id": session["id"]}
 
-        Resume Data:
-        {json.dumps(resume_data, indent=2)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/chat/stream")
+async def chat_ai_stream(request: Request):
+    """
+    Streaming variant of /ai/chat (Server-Sent Events).
+    Emits {"token": ...} events as the model produces them and a final
+    {"done": true, "ttft_ms": ..., "total_ms": ...} event. Closing the
+    connection aborts the upstream model request.
+    """
+    body = await request.json()
+    query = body.get("query")
+    if not query:
+        raise HTTPException(status_code=400, detail="Missing query")
+    if not ai_configured():
+        raise HTTPException(status_code=503, detail="AI client not configured (missing OPENROUTER_API_KEY).")
+    session = await resolve_session(body)
+    ticket = await admit("interactive")
 
-        User Question:
-        {query}
-        """
+    async def event_stream():
+        stats = {}
+        parts = []
+        tokens = stream_chat_completion(query, stats=stats, session=session, use_cache=not body.get("no_cache", False))
+        try:
+            async for token in tokens:
+                if await request.is_disconnected():
+                    return  # finally → aclose() aborts the upstream request
+                parts.append(token)
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            return
+        finally:
+            await tokens.aclose()
+            ticket.release()
 
-        # ✅ New syntax for chat completions
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # or "gpt-4.1-mini"
-            messages=[
-                {"role": "system", "content": "Be clear, concise, and helpful."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-        )
+        if session is not None:
+            add_turn(session, query, "".join(parts))
+            await session_store.asave(session)
+        yield "data: " + json.dumps({
+            "done": True,
+            "session_id": session["id"] if session else None,
+            "ttft_ms": round(stats["ttft"] * 1000, 1) if "ttft" in stats else None,
+            "total_ms": round(stats.get("total", 0) * 1000, 1),
+        }) + "\n\n"
 
-        # ✅ Extract response safely
-        answer = response.choices[0].message.content.strip()
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ticket.release),
+    )
 
-        return {"response": answer}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.delete("/chat/session/{session_id}")
+def end_chat_session(session_id: str):
+    """Forget a chat session (its resume context and conversation summary)."""
+    session_store.delete(session_id)
+    return {"message": "Chat session ended"}
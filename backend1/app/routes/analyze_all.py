@@ -4,6 +4,7 @@
 from fastapi import APIRouter, File, UploadFile, Query
 from fastapi.responses import JSONResponse
 
+from app.helpers.admission import admitted
 from app.helpers.resume_helper import process_resume_file
 from app.routes.github_routes import analyze_github
 from app.routes.leetcode_routes import analyze_leetcode
@@ -26,7 +27,8 @@ async def analyze_all(
     results = {}
 
     # ---------------- Resume ----------------
-    resume_result = await process_resume_file(file)
+    async with admitted("interactive"):
+        resume_result = await process_resume_file(file)
     if isinstance(resume_result, dict) and resume_result.get("error"):
         return JSONResponse(resume_result, status_code=400)
     results["resume"] = resume_result
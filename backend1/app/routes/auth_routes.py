@@ -1,34 +1,25 @@
 from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from pymongo import MongoClient
 import bcrypt
 import jwt
 import os
 import datetime
-import certifi
 from dotenv import load_dotenv
+from app.helpers.lifecycle import require_db
+from app.helpers.user_helper import email_filter, normalize_email
+from app.helpers.analysis_helper import LOGIN_PROJECTION
 
 load_dotenv()
 
 router = APIRouter(tags=["Authentication"])
 
 # -------------------------------
-# MongoDB Connection
+# MongoDB (shared client from app.config, created on first use;
+# connection + indexes are handled on startup, see helpers/lifecycle.py)
 # -------------------------------
-try:
-    client = MongoClient(
-        os.getenv("MONGO_URI"),
-        tls=True,
-        tlsCAFile=certifi.where(),
-        tlsAllowInvalidCertificates=True
-    )
-    db = client[os.getenv("MONGO_DB_NAME")]
-    users = db["users"]
-    print("✅ MongoDB connection established successfully!")
-except Exception as e:
-    print("❌ MongoDB connection failed:", e)
-    raise e
+def users_collection():
+    return require_db()["users"]
 
 
 # -------------------------------
@@ -51,7 +42,7 @@ ALGORITHM = "HS256"
 # -------------------------------
 @router.post("/login")
 def login_user(user: LoginModel):
-    found = users.find_one({"email": {"$regex": f"^{user.email}$", "$options": "i"}})
+    found = users_collection().find_one(email_filter(user.email), LOGIN_PROJECTION)
     if not found:
         raise HTTPException(status_code=404, detail="User not found ❌")
 
@@ -69,7 +60,7 @@ def login_user(user: LoginModel):
 
     # Create JWT token
     payload = {
-        "email": user.email.lower(),
+        "email": normalize_email(user.email),
         "role": found.get("role", "user"),
         "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=2)
     }
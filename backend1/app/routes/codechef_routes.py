@@ -1,13 +1,14 @@
 # app/routes/codechef_routes.py
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
+from app.config import CODECHEF_BASE_URL
 from app.helpers.codechef_helper import extract_codechef_paths_and_badges
 
 router = APIRouter()
 
 @router.get("/analyze_codechef/{username}")
 def analyze_codechef(username: str):
-    profile_url = f"https://www.codechef.com/users/{username}"
+    profile_url = f"{CODECHEF_BASE_URL}/users/{username}"
     data = extract_codechef_paths_and_badges(profile_url)
     if "error" in data:
         return JSONResponse(data, status_code=400)
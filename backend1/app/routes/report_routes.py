@@ -0,0 +1,25 @@
+# app/routes/report_routes.py
+# Admin maintenance of stored `reports` (see helpers/rescore.py).
+
+import asyncio
+
+from fastapi import APIRouter, Query
+
+from app.helpers.lifecycle import require_db
+from app.helpers.rescore import RESCORE_CHUNK_SIZE, rescore_reports
+
+router = APIRouter(prefix="/admin/reports", tags=["Reports"])
+
+
+@router.post("/rescore")
+async def rescore(
+    all_reports: bool = Query(False, alias="all", description="rescore every report, not only stale ones"),
+    chunk_size: int = Query(RESCORE_CHUNK_SIZE, ge=10, le=5000),
+    dry_run: bool = Query(False, description="score but do not write"),
+):
+    """
+    Re-run ATS scoring over stored reports from their compressed text (no PDF, no LLM).
+    By default only reports scored by an older ATS_SCORER_VERSION are touched.
+    """
+    reports = require_db()["reports"]
+    return await asyncio.to_thread(rescore_reports, reports, chunk_size, all_reports, dry_run)
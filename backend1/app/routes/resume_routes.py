@@ -1,19 +1,49 @@
 # app/routes/resume_routes.py
 from fastapi import APIRouter, File, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+import json
 
-from app.helpers.resume_helper import process_resume_file
+from app.helpers.admission import admit, admitted
+from app.helpers.resume_helper import process_resume_file, stream_resume_events
 
 router = APIRouter()
 
 @router.post("/upload_resume")
 async def upload_resume_endpoint(file: UploadFile = File(...)):
-    result = await process_resume_file(file)
+    async with admitted("interactive"):
+        result = await process_resume_file(file)
     print("🔍 DEBUG resume result:", result)  # <---- Add this line
     if isinstance(result, dict) and result.get("error"):
         return JSONResponse(result, status_code=400)
     return result
 
+
+@router.post("/upload_resume_stream")
+async def upload_resume_stream_endpoint(file: UploadFile = File(...)):
+    """
+    Same pipeline as /upload_resume, streamed as Server-Sent Events:
+    each top-level field (name, contacts, education, skills, ...) is sent as soon as
+    the model finishes it, the ATS score as soon as its inputs are known, then a
+    final {"type": "done", "result": ...} with the /upload_resume response body.
+    """
+    contents = await file.read()
+    ticket = await admit("interactive")
+
+    async def event_stream():
+        try:
+            async for event in stream_resume_events(contents, file.filename):
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            ticket.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ticket.release),  # also runs if the client left before the first event
+    )
+
 # ==========================
 # ✅ Exported for user.py
 # ==========================
@@ -0,0 +1,37 @@
+# app/routes/usage_routes.py
+# LLM token / cost report built from the daily `llm_usage` rollups (see helpers/llm_usage.py).
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.helpers.llm_usage import DIMENSIONS, LLM_USER_DAILY_TOKEN_QUOTA, usage_report, user_tokens_today
+
+router = APIRouter(prefix="/admin/llm_usage", tags=["LLM Usage"])
+
+
+@router.get("")
+def get_llm_usage(
+    dimension: str = Query("route", description="route | user | job"),
+    days: int = Query(7, ge=1, le=366),
+    key: str = Query(None, description="only this route / user email / job id"),
+):
+    """
+    Calls, prompt/completion tokens, estimated cost and average latency per
+    route, user or admin job (and model) over the last `days` days (UTC).
+    """
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of {', '.join(DIMENSIONS)}")
+    rows = usage_report(dimension, days, key)
+    totals = {
+        "calls": sum(r["calls"] for r in rows),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in rows),
+        "completion_tokens": sum(r["completion_tokens"] for r in rows),
+        "cost_usd": round(sum(r["cost_usd"] for r in rows), 6),
+    }
+    return {"dimension": dimension, "days": days, "totals": totals, "rows": rows}
+
+
+@router.get("/user/{email}")
+def get_user_quota(email: str):
+    """Tokens the user spent today against LLM_USER_DAILY_TOKEN_QUOTA (0 = unlimited)."""
+    email = email.strip().lower()
+    return {"user": email, "tokens_today": user_tokens_today(email), "daily_quota": LLM_USER_DAILY_TOKEN_QUOTA}
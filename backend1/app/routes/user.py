@@ -1,16 +1,30 @@
 # app/routes/user.py
 
-from fastapi import APIRouter, UploadFile, Form, HTTPException
-from datetime import datetime
-import httpx  # ✅ For calling your AI API endpoint
-from app.routes.auth_routes import db
+from fastapi import APIRouter, UploadFile, Form, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import re
+from app.helpers.admission import admit
+from app.helpers.ai_helper import detect_role_and_skills
+from app.helpers.fast_json import dumps
+from app.helpers.lifecycle import require_db
+from app.helpers.llm_usage import set_user
+from app.helpers.user_helper import build_user_page_query, email_filter, encode_cursor
+from app.helpers.analysis_helper import (
+    PUBLIC_USER_PROJECTION,
+    get_latest_analysis,
+    list_analyses,
+    save_resume_analysis,
+    serialize_user,
+)
 from app.routes.resume_routes import process_resume_file
 
 router = APIRouter(prefix="/user", tags=["User Dashboard"])
-users = db["users"]
 
-# Your AI Chat endpoint (local FastAPI route)
-AI_CHAT_URL = "http://127.0.0.1:8000/ai/chat"
+
+def _collections():
+    """(users, resume_analyses) — 503 while Mongo is unavailable (indexes are built on startup)."""
+    db = require_db()
+    return db["users"], db["resume_analyses"]
 
 
 # ---------------------------------------------------------------------
@@ -18,23 +32,25 @@ AI_CHAT_URL = "http://127.0.0.1:8000/ai/chat"
 # ---------------------------------------------------------------------
 @router.get("/info/{email}")
 def get_user_info(email: str):
-    user = users.find_one(
-        {"email": {"$regex": f"^{email}$", "$options": "i"}},
-        {"_id": 0, "password": 0}
-    )
+    users, _ = _collections()
+    user = users.find_one(email_filter(email), {"_id": 0, **PUBLIC_USER_PROJECTION})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"status": "success", "user": user}
+    return {"status": "success", "user": serialize_user(user)}
 
 
 # ---------------------------------------------------------------------
 # 2️⃣ Upload Resume → Process + AI Skill Suggestion (Dynamic Role)
 # ---------------------------------------------------------------------
 @router.post("/upload_resume")
-async def upload_resume(email: str = Form(...), file: UploadFile = None):
+async def upload_resume(email: str = Form(...), file: UploadFile = None, no_cache: bool = Form(False)):
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded")
+    users, resume_analyses = _collections()  # fail fast, before any LLM spend
 
+    # One slot covers both LLM calls (extraction + role detection); 429 when the queue is full
+    set_user(email)
+    ticket = await admit("interactive")
     try:
         # ✅ Step 1: Process the resume and extract data
         result = await process_resume_file(file)
@@ -46,66 +62,28 @@ async def upload_resume(email: str = Form(...), file: UploadFile = None):
         ats_breakdown = result.get("ats_breakdown", {})
         word_count = result.get("word_count", 0)
 
-        # ✅ Step 2: Extract technical skills from resume
-        technical_skills = structured_info.get("skills", {}).get("technical", [])
-        skills_text = ", ".join(technical_skills) if technical_skills else "None"
-
-        # ✅ Step 3: Dynamically detect role and suggest missing skills
-        ai_prompt = (
-            f"Analyze this candidate's resume data and determine their most suitable job role "
-            f"based on their skills, education, and experience.\n\n"
-            f"Resume technical skills: {skills_text}\n\n"
-            f"Return the result in the following format strictly:\n"
-            f"Role: <predicted role>\n"
-            f"Missing Skills: <comma-separated list of 5-8 new or complementary skills>\n\n"
-            f"Example:\n"
-            f"Role: Data Analyst\n"
-            f"Missing Skills: Power BI, SQL, Pandas, Data Visualization, Excel, Tableau"
-        )
-
+        # ✅ Step 2: Dynamically detect role and suggest missing skills (in-process AI service)
         detected_role = "Unknown"
         suggested_skills = []
+        try:
+            role_info = await detect_role_and_skills(structured_info, use_cache=not no_cache)
+            detected_role = role_info["role"]
+            suggested_skills = role_info["missing_skills"]
+        except Exception as e:
+            print("⚠️ AI role detection failed:", e)
+
+        # ✅ Step 3: Store a new analysis version + move the user's pointer to it
+        analysis = save_resume_analysis(users, resume_analyses, email, {
+            "resume_filename": file.filename,
+            "structured_info": structured_info,
+            "ats_score": ats_score,
+            "ats_breakdown": ats_breakdown,
+            "word_count": word_count,
+            "suggested_skills": suggested_skills,
+            "detected_role": detected_role,
+        })
 
-        async with httpx.AsyncClient() as client:
-            try:
-                ai_response = await client.post(
-                    AI_CHAT_URL,
-                    json={"query": ai_prompt, "resume_data": structured_info},
-                    timeout=30
-                )
-                if ai_response.status_code == 200:
-                    data = ai_response.json()
-                    ai_text = data.get("response", "")
-                    # ✅ Parse role and skills from AI response
-                    if "Role:" in ai_text:
-                        parts = ai_text.split("Role:")[1].split("Missing Skills:")
-                        detected_role = parts[0].strip() if len(parts) > 0 else "Unknown"
-                        if len(parts) > 1:
-                            suggested_skills = [s.strip() for s in parts[1].split(",") if s.strip()]
-            except Exception as e:
-                print("⚠️ AI request failed:", e)
-                detected_role = "Unknown"
-                suggested_skills = []
-
-        # ✅ Step 4: Save user resume data + AI suggestions + role to MongoDB
-        users.update_one(
-            {"email": email},
-            {
-                "$set": {
-                    "resume_filename": file.filename,
-                    "structured_info": structured_info,
-                    "ats_score": ats_score,
-                    "ats_breakdown": ats_breakdown,
-                    "word_count": word_count,
-                    "suggested_skills": suggested_skills,
-                    "detected_role": detected_role,
-                    "last_uploaded": datetime.utcnow().isoformat(),
-                }
-            },
-            upsert=True,
-        )
-
-        # ✅ Step 5: Send response to frontend
+        # ✅ Step 4: Send response to frontend
         return {
             "status": "success",
             "message": "Resume processed successfully ✅",
@@ -115,11 +93,14 @@ async def upload_resume(email: str = Form(...), file: UploadFile = None):
             "word_count": word_count,
             "detected_role": detected_role,
             "suggested_skills": suggested_skills,
+            "analysis_version": analysis["version"],
         }
 
     except Exception as e:
         print("❌ Error in upload_resume:", e)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ticket.release()
 
 
 # ---------------------------------------------------------------------
@@ -127,26 +108,115 @@ async def upload_resume(email: str = Form(...), file: UploadFile = None):
 # ---------------------------------------------------------------------
 @router.get("/history/{email}")
 def get_history(email: str):
-    user = users.find_one({"email": email})
+    users, resume_analyses = _collections()
+    user, analysis = get_latest_analysis(users, resume_analyses, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    analysis = analysis or {}
+    created_at = analysis.get("created_at")
     return {
         "status": "success",
-        "structured_info": user.get("structured_info", {}),
-        "ats_score": user.get("ats_score", {}),
-        "ats_breakdown": user.get("ats_breakdown", {}),
-        "word_count": user.get("word_count", 0),
-        "detected_role": user.get("detected_role", "Unknown"),
-        "suggested_skills": user.get("suggested_skills", []),
-        "last_uploaded": user.get("last_uploaded", None)
+        "structured_info": analysis.get("structured_info", {}),
+        "ats_score": analysis.get("ats_score", {}),
+        "ats_breakdown": analysis.get("ats_breakdown", {}),
+        "word_count": analysis.get("word_count", 0),
+        "detected_role": analysis.get("detected_role", "Unknown"),
+        "suggested_skills": analysis.get("suggested_skills", []),
+        "last_uploaded": created_at.isoformat() if created_at else None,
+        "version": analysis.get("version"),
     }
 
 
+@router.get("/history/{email}/ats")
+def get_ats_history(email: str, limit: int = Query(20, ge=1, le=100)):
+    """Per-upload ATS history (newest first) without the bulky structured data."""
+    users, resume_analyses = _collections()
+    user = users.find_one(email_filter(email), {"_id": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"status": "success", "history": list_analyses(resume_analyses, user["_id"], limit)}
+
+
 # ---------------------------------------------------------------------
 # 4️⃣ Admin – List all users
 # ---------------------------------------------------------------------
+MAX_PAGE_SIZE = 1000
+FIELD_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+
+
+def _listing_projection(fields: str, sort_field: str):
+    """
+    Projection for the requested fields, never exposing hidden ones.
+    `_id` is only returned when listed in `fields`; pages link through `next_cursor`.
+    Returns (projection, helper fields to strip after building the cursor).
+    """
+    hidden = set(PUBLIC_USER_PROJECTION)
+    if not fields:
+        projection = {k: v for k, v in PUBLIC_USER_PROJECTION.items() if k != sort_field}
+        if sort_field != "_id":
+            projection["_id"] = 0
+        return projection, [sort_field] if sort_field in hidden or sort_field == "_id" else []
+
+    projection = {}
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        if not FIELD_NAME_RE.match(name) or name.split(".")[0] in hidden:
+            raise HTTPException(status_code=400, detail=f"Field not allowed: {name}")
+        projection[name] = 1
+    strip = [] if sort_field in projection else [sort_field]
+    projection[sort_field] = 1  # needed to build the next cursor
+    projection.setdefault("_id", 0)
+    return projection, strip
+
+
+def _public_row(doc, strip):
+    for key in strip:
+        doc.pop(key, None)
+    return serialize_user(doc)
+
+
 @router.get("/all")
-def get_all_users():
-    all_users = list(users.find({}, {"_id": 0, "password": 0}))
-    return {"status": "success", "users": all_users}
+def get_all_users(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query(None, description="Comma-separated fields to return (default: all public fields)"),
+    sort: str = Query("created", description="created | email"),
+    order: str = Query("asc", description="asc | desc"),
+    format: str = Query("json", description="json (one page) | ndjson (stream every remaining user)"),
+):
+    """
+    Keyset-paginated user listing.
+    `json` returns one page plus `next_cursor`; `ndjson` streams documents
+    straight from the Mongo cursor so server memory stays flat.
+    """
+    users, _ = _collections()
+    try:
+        query, sort_spec, sort_field = build_user_page_query(sort, order, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    projection, strip = _listing_projection(fields, sort_field)
+
+    if format == "ndjson":
+        mongo_cursor = users.find(query, projection).sort(sort_spec).batch_size(limit)
+
+        def stream_users():
+            for doc in mongo_cursor:
+                yield dumps(_public_row(doc, strip)) + "\n"
+
+        return StreamingResponse(stream_users(), media_type="application/x-ndjson")
+    if format != "json":
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+
+    page = list(users.find(query, projection).sort(sort_spec).limit(limit + 1))
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].get(sort_field))
+
+    return {
+        "status": "success",
+        "users": [_public_row(u, strip) for u in page],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,216 @@
+# benchmarks/make_fixtures.py
+# Regenerates the synthetic benchmark fixtures (deterministic, no extra dependencies).
+#   cd backend1 && python -m benchmarks.make_fixtures
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SKILLS = ["Python", "Java", "C++", "JavaScript", "React", "Node.js", "MongoDB", "SQL", "Docker",
+          "Kubernetes", "AWS", "Git", "Linux", "TensorFlow", "Pandas", "FastAPI", "Django", "HTML", "CSS"]
+VERBS = ["Built", "Designed", "Implemented", "Optimized", "Led", "Deployed", "Automated", "Refactored"]
+NOUNS = ["REST API", "data pipeline", "dashboard", "recommendation engine", "CI workflow",
+         "chat application", "inventory system", "ML model", "web scraper", "payment module"]
+FIRST_NAMES = ["Aarav", "Diya", "Kabir", "Meera", "Rohan", "Ananya", "Vikram", "Isha", "Arjun", "Priya"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Menon", "Rao", "Patel"]
+RESUME_SECTIONS = {"1p": 1, "3p": 8, "10p": 36}
+
+
+# -------------------------
+# Minimal text PDF writer
+# -------------------------
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_bytes(pages):
+    """`pages` (lists of text lines) as a Helvetica text PDF pdfplumber can read."""
+    objects = []  # object bodies, 1-based ids
+    page_ids = []
+    font_id = 3
+    objects.append(None)  # 1: catalog (filled below)
+    objects.append(None)  # 2: pages
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for lines in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td\n" + "".join(f"({_escape(l)}) Tj T*\n" for l in lines) + "ET"
+        data = stream.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (content_id, font_id)
+        )
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % i for i in page_ids) + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def write_pdf(path, pages):
+    with open(path, "wb") as f:
+        f.write(pdf_bytes(pages))
+
+
+# -------------------------
+# Synthetic content
+# -------------------------
+def resume_lines(rng, sections, name="Aarav Sharma"):
+    handle = name.lower().replace(" ", "-")
+    lines = [
+        name,
+        f"{handle.replace('-', '.')}@example.com | +91 98765 43210 | linkedin.com/in/{handle} | "
+        f"github.com/{handle.split('-')[0]}-dev",
+        "",
+        "EDUCATION",
+        "B.Tech in Computer Science and Engineering, CGPA 8.42 (upto 6th semester)",
+        "12th - State Board, 91.6%",
+        "10th - CBSE, 94.2%",
+        "",
+        "SKILLS",
+        "Technical: " + ", ".join(rng.sample(SKILLS, 10)),
+        "Soft skills: Communication, Teamwork, Leadership, Problem solving",
+        "Languages: English, Tamil, Hindi",
+        "",
+    ]
+    for s in range(sections):
+        lines.append("PROJECTS" if s % 2 == 0 else "EXPERIENCE")
+        for _ in range(12):
+            lines.append(f"- {rng.choice(VERBS)} a {rng.choice(NOUNS)} using {rng.choice(SKILLS)} and "
+                         f"{rng.choice(SKILLS)}, improving throughput by {rng.randint(10, 80)}%")
+        lines.append("")
+    lines += ["CERTIFICATIONS", "AWS Certified Cloud Practitioner", "ACHIEVEMENTS",
+              "Winner, Smart India Hackathon", "Internship at Example Corp (3 months)"]
+    return lines
+
+
+def paginate(lines, per_page=55):
+    return [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+
+
+def distinct_resume_pdfs(count, sections, seed=7):
+    """`count` different resume PDFs (own name, skills and projects each), e.g. for a batch upload."""
+    rng = random.Random(seed)
+    pdfs = []
+    for i in range(count):
+        name = f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+        if i >= len(FIRST_NAMES) * len(LAST_NAMES):
+            name += f" {i}"
+        pdfs.append(pdf_bytes(paginate(resume_lines(rng, sections, name=name))))
+    return pdfs
+
+
+def codechef_html(rng):
+    learning = "".join(f"<div><span>{t}</span><span>{rng.randint(1, 100)} %</span></div>"
+                       for t in ["Learn Python", "Data Structures", "Dynamic Programming", "Graph Algorithms", "Learn SQL"])
+    practice = "".join(f"<div><span>Practice {t}</span><span>{rng.randint(1, 100)}%</span></div>"
+                       for t in ["Arrays", "Strings", "Greedy", "Math", "Sorting"])
+    filler = "".join(f"<div class='problem-row'><a href='/problems/P{i}'>Problem {i}</a><span>{rng.randint(1, 5)} stars</span></div>"
+                     for i in range(1500))
+    scripts = "<script>" + "var x = 1;" * 2000 + "</script>"
+    return f"""<!DOCTYPE html><html><head><title>aarav_dev | CodeChef User Profile</title>{scripts}</head>
+<body><header><nav>About us | Contact | Privacy Policy</nav></header>
+<main>
+<div class="rating-number">1847</div><span class="rating">3&#9733;</span>
+<ul class="inline-list"><li><strong>8,412</strong> Global Rank</li><li><strong>5,031</strong> Country Rank</li></ul>
+<section><div><h3>Learning Paths</h3>{learning}</div></section>
+<section><div><h3>Practice Paths</h3>{practice}</div></section>
+<section><h3>Badges</h3><img alt="Contest Hero Badge" src="a.png"/><img alt="Problem Solver Badge" src="b.png"/>
+<span>Bronze Streak badge</span></section>
+<section><h3>Total Problems Solved: 512</h3>{filler}</section>
+</main></body></html>"""
+
+
+def leetcode_fixtures(rng):
+    user = {
+        "username": "aarav_dev",
+        "submitStats": {"acSubmissionNum": [
+            {"difficulty": "All", "count": 612}, {"difficulty": "Easy", "count": 240},
+            {"difficulty": "Medium", "count": 300}, {"difficulty": "Hard", "count": 72},
+        ]},
+        "profile": {"ranking": 120345, "reputation": 12, "starRating": 3.5},
+        "languageProblemCount": [{"languageName": l, "problemsSolved": rng.randint(0, 300)}
+                                 for l in ["Python3", "Java", "C++", "JavaScript", "Go"]],
+    }
+    start = datetime(2024, 1, 1)
+    calendar = {str(int((start + timedelta(days=d)).timestamp())): rng.randint(1, 12)
+                for d in range(366) if rng.random() < 0.7}
+    return {"data": {"matchedUser": user}}, {"data": {"matchedUser": {"userCalendar": {"submissionCalendar": json.dumps(calendar)}}}}
+
+
+def github_graphql(rng):
+    start = datetime(2024, 1, 7)
+    weeks = [{"contributionDays": [{"date": (start + timedelta(days=w * 7 + d)).date().isoformat(),
+                                    "contributionCount": rng.choice([0, 0, 1, 2, 3, 5, 8])} for d in range(7)]}
+             for w in range(53)]
+    return {"data": {"user": {
+        "originalRepos": {"totalCount": 34}, "forkedRepos": {"totalCount": 11},
+        "contributionsCollection": {"contributionCalendar": {
+            "totalContributions": sum(d["contributionCount"] for w in weeks for d in w["contributionDays"]),
+            "weeks": weeks,
+        }},
+    }}}
+
+
+def structured_resume():
+    return {
+        "name": "Aarav Sharma",
+        "email": "aarav.sharma@example.com",
+        "phone": "+91 98765 43210",
+        "linkedin": "linkedin.com/in/aarav-sharma",
+        "github": "github.com/aarav-dev",
+        "education": {
+            "10th": {"school": "CBSE School", "percentage": "94.2%", "year": "2018"},
+            "12th": {"school": "State Board School", "percentage": "91.6%", "year": "2020"},
+            "bachelor": {"college": "Example Institute of Technology", "degree": "B.Tech CSE",
+                         "cgpa": "8.42 (upto 6th semester)", "year": "2024"},
+        },
+        "skills": {"technical": SKILLS[:12], "soft": ["Communication", "Teamwork", "Leadership"]},
+        "projects": [{"title": n, "description": f"Built a {n} with Python and MongoDB"} for n in NOUNS[:5]],
+        "internships": [{"company": "Example Corp", "role": "Backend Intern", "duration": "3 months"}],
+        "certifications": ["AWS Certified Cloud Practitioner"],
+        "achievements": ["Winner, Smart India Hackathon"],
+        "languages": ["English", "Tamil (native)", "Hindi"],
+    }
+
+
+def main():
+    rng = random.Random(42)
+    os.makedirs(FIXTURES, exist_ok=True)
+    for size, sections in RESUME_SECTIONS.items():
+        name = f"resume_{size}"
+        pages = paginate(resume_lines(rng, sections))
+        write_pdf(os.path.join(FIXTURES, f"{name}.pdf"), pages)
+        with open(os.path.join(FIXTURES, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(line for page in pages for line in page))
+        print(f"✅ {name}.pdf ({len(pages)} pages)")
+
+    with open(os.path.join(FIXTURES, "codechef_profile.html"), "w", encoding="utf-8") as f:
+        f.write(codechef_html(rng))
+    profile, calendar = leetcode_fixtures(rng)
+    fixtures = {
+        "leetcode_profile.json": profile,
+        "leetcode_calendar.json": calendar,
+        "github_graphql.json": github_graphql(rng),
+        "resume_data.json": structured_resume(),
+    }
+    for name, data in fixtures.items():
+        with open(os.path.join(FIXTURES, name), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+    print("✅ HTML / JSON fixtures written to", FIXTURES)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# benchmarks/run.py
+# Micro-benchmarks for the CPU-bound hot paths (no network, no Mongo, no LLM).
+#
+#   cd backend1
+#   python -m benchmarks.run                     # run + compare with benchmarks/baseline.json
+#   python -m benchmarks.run --save-baseline     # record a new baseline on this machine
+#   python -m benchmarks.run -k ats --threshold 0.15
+#
+# Reports throughput, latency percentiles and peak traced memory per case.
+# Exits with status 1 when a case's p50 latency (or peak memory) regresses past the
+# threshold relative to the baseline. Baselines are machine-specific: record them on
+# the machine (or CI runner class) that runs the comparison.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+sys.path.insert(0, os.path.dirname(HERE))  # allow `python benchmarks/run.py` from backend1
+
+from app.helpers.codechef_helper import parse_codechef_profile  # noqa: E402
+from app.helpers.compression import brotli, compress  # noqa: E402
+from app.helpers.fast_json import JSON_BACKEND, dumps_bytes  # noqa: E402
+from app.helpers.dedupe import minhash_signature  # noqa: E402
+from app.helpers.github_helper import summarize_repo_counts  # noqa: E402
+from app.helpers.leetcode_helper import analyze_performance, parse_leetcode_profile, parse_submission_calendar  # noqa: E402
+from app.helpers.prompt_builder import build_resume_prompt_text  # noqa: E402
+from app.helpers.resume_filter import build_criteria, filter_parsed_resume  # noqa: E402
+from app.helpers.resume_model import ParsedResume  # noqa: E402
+from app.helpers.skill_taxonomy import skills_in_text  # noqa: E402
+from app.helpers.resume_helper import (  # noqa: E402
+    calculate_ats_score,
+    extract_pdf_pages,
+    extract_username_from_input,
+    normalize_languages,
+)
+
+RESUME_SIZES = ("1p", "3p", "10p")
+
+
+def _read(name, mode="r"):
+    with open(os.path.join(FIXTURES, name), mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        return f.read()
+
+
+# -------------------------
+# Cases
+# -------------------------
+def build_cases():
+    """name -> zero-argument callable (inputs are loaded once, outside the timed loop)."""
+    cases = {}
+    resume_data = json.loads(_read("resume_data.json"))
+
+    for size in RESUME_SIZES:
+        pdf = _read(f"resume_{size}.pdf", "rb")
+        text = _read(f"resume_{size}.txt")
+        pages = extract_pdf_pages(pdf)
+        cases[f"pdf_extract[{size}]"] = lambda pdf=pdf: extract_pdf_pages(pdf)
+        cases[f"ats_score[{size}]"] = lambda text=text: calculate_ats_score(dict(resume_data), text)
+        cases[f"prompt_build[{size}]"] = lambda pages=pages: build_resume_prompt_text(pages)
+        cases[f"minhash[{size}]"] = lambda text=text: minhash_signature(text)
+        cases[f"skills_in_text[{size}]"] = lambda text=text: skills_in_text(text)
+
+    # admin filter: typed resume built once at parse time vs rebuilt from the stored dict
+    criteria = build_criteria(cgpa=7, tenth=60, skills="python, docker", language="english")
+    typed = {"data": resume_data, "ats_score": 70, "resume": ParsedResume.from_dict(resume_data)}
+    untyped = {"data": resume_data, "ats_score": 70}
+    cases["resume_filter[typed]"] = lambda: filter_parsed_resume(typed, "a.pdf", criteria)
+    cases["resume_filter[from_dict]"] = lambda: filter_parsed_resume(untyped, "a.pdf", criteria)
+
+    languages = ["English (fluent)", "Tamil, Hindi", "telugu/Malayalam", "French 80%", "Klingon", "KANNADA"] * 5
+    cases["normalize_languages"] = lambda: normalize_languages(languages)
+
+    usernames = ["https://github.com/aarav-dev", "github.com/aarav-dev/repo", "aarav-dev", "some/path/aarav",
+                 "http://github.com/", "not a valid username!"] * 10
+    cases["extract_username_from_input"] = lambda: [extract_username_from_input(u) for u in usernames]
+
+    html = _read("codechef_profile.html")
+    cases["codechef_parse"] = lambda: parse_codechef_profile(html, "https://www.codechef.com/users/aarav_dev")
+
+    leetcode = json.loads(_read("leetcode_profile.json"))["data"]["matchedUser"]
+    calendar = json.loads(_read("leetcode_calendar.json"))["data"]["matchedUser"]["userCalendar"]["submissionCalendar"]
+    stats = parse_leetcode_profile(leetcode)
+    cases["leetcode_parse"] = lambda: (parse_leetcode_profile(leetcode), parse_submission_calendar(calendar))
+    cases["leetcode_analyze_performance"] = lambda: analyze_performance(stats)
+
+    github = json.loads(_read("github_graphql.json"))
+    cases["github_summarize"] = lambda: summarize_repo_counts(github, "aarav-dev")
+
+    # response encoding: stdlib (FastAPI's default) vs fast_json, then compression
+    payload = response_payload()
+    cases["json_encode_stdlib[analyze_all]"] = lambda: json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    cases[f"json_encode_{JSON_BACKEND}[analyze_all]"] = lambda: dumps_bytes(payload)
+    body = dumps_bytes(payload)
+    cases["gzip[analyze_all]"] = lambda: compress(body, "gzip")
+    if brotli is not None:
+        cases["brotli[analyze_all]"] = lambda: compress(body, "br")
+    return cases
+
+
+def response_payload():
+    """An /analyze_all-sized response: parsed resume + GitHub, LeetCode (with calendar) and CodeChef data."""
+    leetcode = json.loads(_read("leetcode_profile.json"))["data"]["matchedUser"]
+    calendar = json.loads(_read("leetcode_calendar.json"))["data"]["matchedUser"]["userCalendar"]["submissionCalendar"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            "resume": json.loads(_read("resume_data.json")),
+            "github": summarize_repo_counts(json.loads(_read("github_graphql.json")), "aarav-dev"),
+            "leetcode": {**parse_leetcode_profile(leetcode), "calendar": parse_submission_calendar(calendar)},
+            "codechef": parse_codechef_profile(_read("codechef_profile.html"), "https://www.codechef.com/users/aarav_dev"),
+        }
+
+
+def print_payload_sizes():
+    """Bytes on the wire for the response_payload() body per encoder / compression."""
+    payload = response_payload()
+    stdlib = json.dumps(payload).encode("utf-8")
+    body = dumps_bytes(payload)
+    sizes = {"json (stdlib)": len(stdlib), f"json ({JSON_BACKEND})": len(body),
+             "gzip": len(compress(body, "gzip"))}
+    if brotli is not None:
+        sizes["brotli"] = len(compress(body, "br"))
+    print("\nresponse bytes [analyze_all]: " + " | ".join(f"{k} {v:,}" for k, v in sizes.items()))
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func, min_time=0.5, min_iters=5, max_iters=2000):
+    with contextlib.redirect_stdout(io.StringIO()):  # helpers log with print()
+        return _measure(func, min_time, min_iters, max_iters)
+
+
+def _measure(func, min_time, min_iters, max_iters):
+    for _ in range(2):  # warm-up (imports, regex caches)
+        func()
+
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_iters and (len(samples) < min_iters or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ordered = sorted(samples)
+    mean_ms = statistics.fmean(samples)
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round(1000 / mean_ms, 1) if mean_ms else None,
+        "mean_ms": round(mean_ms, 4),
+        "p50_ms": round(_percentile(ordered, 50), 4),
+        "p95_ms": round(_percentile(ordered, 95), 4),
+        "p99_ms": round(_percentile(ordered, 99), 4),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, threshold, mem_threshold):
+    """Return a list of regression messages (empty when everything is within threshold)."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if current["p50_ms"] > base["p50_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {base['p50_ms']:.3f} → {current['p50_ms']:.3f} ms "
+                               f"(+{(current['p50_ms'] / base['p50_ms'] - 1) * 100:.0f}%)")
+        if base.get("peak_kib") and current["peak_kib"] > base["peak_kib"] * (1 + mem_threshold):
+            regressions.append(f"{name}: peak memory {base['peak_kib']} → {current['peak_kib']} KiB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CPU-bound hot paths.")
+    parser.add_argument("-k", "--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument("--mem-threshold", type=float, default=0.5, help="allowed peak memory growth")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per case")
+    parser.add_argument("--output", help="also write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    cases = {n: f for n, f in build_cases().items() if not args.filter or args.filter in n}
+    results = {}
+    print(f"{'case':34} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'peak KiB':>10}")
+    for name, func in cases.items():
+        r = measure(func, min_time=args.min_time)
+        results[name] = r
+        print(f"{name:34} {r['ops_per_sec']:>10} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['peak_kib']:>10}")
+    if not args.filter or "analyze_all" in args.filter:
+        print_payload_sizes()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ No baseline found — run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.threshold, args.mem_threshold)
+    if regressions:
+        print("❌ Regressions past threshold:")
+        for line in regressions:
+            print("   " + line)
+        return 1
+    print("✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# loadtest/run.py
+# Scripted load scenarios against a running backend (pair it with loadtest/stubs.py so no
+# real third-party API or LLM token is used).
+#
+#   cd backend1
+#   python -m loadtest.run upload_resume --concurrency 16 --requests 200
+#   python -m loadtest.run analyze_all --concurrency 8 --duration 60
+#   python -m loadtest.run admin_filter_stream --concurrency 2 --files 20 --batch-size 4
+#   python -m loadtest.run login --concurrency 32 --duration 30 --seed-user
+#
+# Reports throughput, latency percentiles (time to full response; for the SSE scenario
+# also time to first event) and a breakdown of status codes / errors.
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.make_fixtures import RESUME_SECTIONS, distinct_resume_pdfs
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(os.path.dirname(HERE), "benchmarks", "fixtures")
+
+LOGIN_EMAIL = os.getenv("LOADTEST_EMAIL", "loadtest@example.com")
+LOGIN_PASSWORD = os.getenv("LOADTEST_PASSWORD", "loadtest-password")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+# -------------------------
+# Scenarios: each returns (status_code, first_byte_seconds or None)
+# -------------------------
+async def upload_resume(client, args, pdf):
+    r = await client.post("/resume/upload_resume", files={"file": ("resume.pdf", pdf, "application/pdf")})
+    return r.status_code, None
+
+
+async def analyze_all(client, args, pdf):
+    params = {"github": "aarav-dev", "leetcode": "aarav_dev", "codechef": "aarav_dev"}
+    r = await client.post("/analyze_all", params=params, files={"file": ("resume.pdf", pdf, "application/pdf")})
+    return r.status_code, None
+
+
+async def admin_filter_stream(client, args, pdf):
+    files = [("files", (f"resume_{i}.pdf", data, "application/pdf")) for i, data in enumerate(args.batch_pdfs)]
+    data = {"cgpa": "7", "skills": "Python", "batch_size": str(args.batch_size)}
+    started = time.perf_counter()
+    first_event = None
+    async with client.stream("POST", "/admin/filter_uploaded_resumes_stream", files=files, data=data) as r:
+        async for line in r.aiter_lines():
+            if line.startswith("data:") and first_event is None:
+                first_event = time.perf_counter() - started
+    return r.status_code, first_event
+
+
+async def login(client, args, pdf):
+    r = await client.post("/auth/login", json={"email": LOGIN_EMAIL, "password": LOGIN_PASSWORD})
+    return r.status_code, None
+
+
+SCENARIOS = {
+    "upload_resume": upload_resume,
+    "analyze_all": analyze_all,
+    "admin_filter_stream": admin_filter_stream,
+    "login": login,
+}
+
+
+def seed_login_user():
+    """Insert (or refresh) the bcrypt-hashed load-test user in the configured Mongo."""
+    import bcrypt
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    sys.path.insert(0, os.path.dirname(HERE))
+    from app.helpers.user_helper import email_filter, normalize_email
+
+    load_dotenv()
+    users = MongoClient(os.getenv("MONGO_URI"))[os.getenv("MONGO_DB_NAME", "resume_analyzer")]["users"]
+    hashed = bcrypt.hashpw(LOGIN_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    users.update_one(email_filter(LOGIN_EMAIL),
+                     {"$set": {"email": LOGIN_EMAIL, "email_normalized": normalize_email(LOGIN_EMAIL),
+                               "password": hashed, "role": "user", "name": "Load Test"}},
+                     upsert=True)
+    print(f"✅ Seeded login user {LOGIN_EMAIL}")
+
+
+# -------------------------
+# Driver
+# -------------------------
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_scenario(args):
+    scenario = SCENARIOS[args.scenario]
+    pdf = _fixture(f"resume_{args.resume}.pdf")
+    latencies, first_events = [], []
+    statuses = collections.Counter()
+    issued = 0
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def next_request():
+        nonlocal issued
+        if deadline is not None:
+            return time.perf_counter() < deadline
+        if issued >= args.requests:
+            return False
+        issued += 1
+        return True
+
+    async def worker(client):
+        while next_request():
+            t0 = time.perf_counter()
+            try:
+                status, first_event = await scenario(client, args, pdf)
+                statuses[status] += 1
+                if first_event is not None:
+                    first_events.append(first_event)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - t0)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    report = {
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=lambda kv: str(kv[0]))},
+    }
+    if first_events:
+        first_sorted = sorted(first_events)
+        report["first_event_p50_ms"] = round(_percentile(first_sorted, 50) * 1000, 1)
+        report["first_event_p95_ms"] = round(_percentile(first_sorted, 95) * 1000, 1)
+    return report
+
+
+def print_report(report):
+    print(f"\n📊 {report['scenario']} — {report['requests']} requests in {report['elapsed_s']}s "
+          f"at concurrency {report['concurrency']}")
+    print(f"   throughput : {report['throughput_rps']} req/s")
+    print(f"   latency    : p50 {report['p50_ms']} ms | p95 {report['p95_ms']} ms | "
+          f"p99 {report['p99_ms']} ms | max {report['max_ms']} ms")
+    if "first_event_p50_ms" in report:
+        print(f"   first event: p50 {report['first_event_p50_ms']} ms | p95 {report['first_event_p95_ms']} ms")
+    print(f"   statuses   : {report['statuses']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive load scenarios against the backend.")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--base-url", default=os.getenv("LOADTEST_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=100, help="total requests (ignored with --duration)")
+    parser.add_argument("-d", "--duration", type=float, default=0, help="run for this many seconds instead")
+    parser.add_argument("--resume", choices=sorted(RESUME_SECTIONS), default="1p", help="benchmark fixture to upload")
+    parser.add_argument("--files", type=int, default=10, help="resumes per admin_filter_stream request")
+    parser.add_argument("--batch-size", type=int, default=1, help="batch_size form field for admin_filter_stream")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed-user", action="store_true", help="create the login user in Mongo first")
+    parser.add_argument("--output", help="also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+    # distinct resumes per batch: identical uploads are parsed once and then hit the AI cache
+    args.batch_pdfs = (distinct_resume_pdfs(args.files, RESUME_SECTIONS[args.resume])
+                       if args.scenario == "admin_filter_stream" else [])
+
+    if args.seed_user:
+        seed_login_user()
+    report = asyncio.run(run_scenario(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# loadtest/stubs.py
+# Local stand-ins for every third-party service the backend calls, for offline load tests.
+#
+#   cd backend1 && python -m loadtest.stubs --port 9100 --llm-latency-ms 800 --llm-error-rate 0.02
+#
+# Then start the backend against them:
+#   OPENROUTER_BASE_URL=http://127.0.0.1:9100/openrouter/v1 OPENROUTER_API_KEY=stub \
+#   GITHUB_API_URL=http://127.0.0.1:9100/github GITHUB_TOKEN=stub \
+#   LEETCODE_BASE_URL=http://127.0.0.1:9100/leetcode CODECHEF_BASE_URL=http://127.0.0.1:9100/codechef \
+#   uvicorn app.main:app --port 8000
+#
+# The OpenRouter stub speaks the OpenAI chat-completions protocol (JSON and SSE streaming)
+# and answers resume extraction, batch extraction, role detection and chat prompts with
+# well-formed payloads. Latency, token pacing, error and 429 rates are configurable.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+SETTINGS = {
+    "llm_latency_ms": float(os.getenv("STUB_LLM_LATENCY_MS", "800")),      # before the first token / full answer
+    "llm_jitter_ms": float(os.getenv("STUB_LLM_JITTER_MS", "200")),
+    "llm_token_delay_ms": float(os.getenv("STUB_LLM_TOKEN_DELAY_MS", "15")),  # between streamed chunks
+    "llm_error_rate": float(os.getenv("STUB_LLM_ERROR_RATE", "0")),        # share of 500 responses
+    "llm_rate_limit_rate": float(os.getenv("STUB_LLM_RATE_LIMIT_RATE", "0")),  # share of 429 responses
+    "site_latency_ms": float(os.getenv("STUB_SITE_LATENCY_MS", "150")),     # GitHub / LeetCode / CodeChef
+}
+
+app = FastAPI(title="Third-party stubs")
+
+SKILLS = ["Python", "Java", "React", "Node.js", "MongoDB", "SQL", "Docker", "AWS", "Git", "FastAPI"]
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+async def _sleep_ms(base, jitter=0.0):
+    await asyncio.sleep(max(0.0, base + random.uniform(-jitter, jitter)) / 1000)
+
+
+# -------------------------
+# OpenRouter (OpenAI-compatible chat completions)
+# -------------------------
+def _fake_resume():
+    return {
+        "name": f"Candidate {random.randint(1000, 9999)}",
+        "email": "candidate@example.com",
+        "phone": "+91 98765 43210",
+        "linkedin": "linkedin.com/in/candidate",
+        "github": "github.com/candidate",
+        "leetcode": "",
+        "codechef": "",
+        "languages": ["English", "Tamil"],
+        "education": {
+            "10th": {"school": "CBSE School", "location": "Chennai", "year": "2018", "percentage": f"{random.randint(70, 99)}%"},
+            "12th": {"school": "State Board School", "location": "Chennai", "year": "2020", "percentage": f"{random.randint(70, 99)}%"},
+            "bachelor": {"institute": "Example Institute of Technology", "location": "Chennai", "degree": "B.Tech CSE",
+                         "expected_graduation": "2024", "cgpa": f"{random.uniform(6.5, 9.8):.2f}"},
+        },
+        "skills": {"technical": random.sample(SKILLS, 6), "soft": ["Communication", "Teamwork"]},
+        "certificates": ["AWS Certified Cloud Practitioner"],
+        "role_match": "Backend Developer",
+        "summary": "Backend-focused engineer with project experience in APIs and data pipelines.",
+    }
+
+
+def _answer_for(messages):
+    prompt = messages[-1]["content"] if messages else ""
+    if "doc_id:" in prompt:
+        doc_ids = re.findall(r"=== doc_id: (\S+) ===", prompt)
+        return json.dumps({"results": [{"doc_id": d, "resume": _fake_resume()} for d in doc_ids]})
+    if "Extract structured resume info" in prompt:
+        return json.dumps(_fake_resume())
+    if '"missing_skills"' in prompt:
+        return json.dumps({"role": "Backend Developer", "missing_skills": ["Kubernetes", "Redis", "GraphQL", "CI/CD", "Go"]})
+    return ("Focus on measurable impact in your project descriptions, add a short skills summary at the top, "
+            "and tailor keywords to each job description you apply for.")
+
+
+def _chunks(text, size=24):
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+@app.post("/openrouter/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    roll = random.random()
+    if roll < SETTINGS["llm_rate_limit_rate"]:
+        return JSONResponse({"error": {"message": "Rate limit exceeded (stub)", "code": 429}}, status_code=429,
+                            headers={"Retry-After": "1"})
+    if roll < SETTINGS["llm_rate_limit_rate"] + SETTINGS["llm_error_rate"]:
+        await _sleep_ms(SETTINGS["llm_latency_ms"] / 2)
+        return JSONResponse({"error": {"message": "Upstream error (stub)", "code": 500}}, status_code=500)
+
+    model = body.get("model", "stub-model")
+    answer = _answer_for(body.get("messages", []))
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    completion_tokens = len(answer) // 4
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+
+    if not body.get("stream"):
+        await _sleep_ms(SETTINGS["llm_latency_ms"] + completion_tokens * SETTINGS["llm_token_delay_ms"] / 4,
+                        SETTINGS["llm_jitter_ms"])
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    async def events():
+        await _sleep_ms(SETTINGS["llm_latency_ms"], SETTINGS["llm_jitter_ms"])
+        for piece in _chunks(answer):
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await _sleep_ms(SETTINGS["llm_token_delay_ms"])
+        done = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(done)}\n\n"
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [], "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                              "total_tokens": prompt_tokens + completion_tokens}}
+            yield f"data: {json.dumps(usage)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# -------------------------
+# GitHub (GraphQL + REST)
+# -------------------------
+@app.post("/github/graphql")
+async def github_graphql():
+    await _sleep_ms(SETTINGS["site_latency_ms"], SETTINGS["site_latency_ms"] / 3)
+    return JSONResponse(json.loads(_read_fixture("github_graphql.json")))
+
+
+@app.get("/github/search/issues")
+async def github_search_issues(request: Request):
+    await _sleep_ms(SETTINGS["site_latency_ms"], SETTINGS["site_latency_ms"] / 3)
+    base = str(request.base_url).rstrip("/")
+    items = [{"number": n, "pull_request": {"url": f"{base}/github/repos/stub/repo/pulls/{n}"}} for n in range(1, 6)]
+    return {"total_count": len(items), "items": items}
+
+
+@app.get("/github/repos/{owner}/{repo}/pulls/{number}")
+async def github_pull(owner: str, repo: str, number: int):
+    await _sleep_ms(SETTINGS["site_latency_ms"] / 2)
+    merged = number % 4 != 0
+    return JSONResponse(
+        {"number": number, "merged": merged, "additions": 40 * number, "deletions": 7 * number,
+         "created_at": "2024-03-01T10:00:00Z", "merged_at": "2024-03-03T12:30:00Z" if merged else None},
+        headers={"X-RateLimit-Remaining": "4999"},
+    )
+
+
+# -------------------------
+# LeetCode GraphQL / CodeChef profile page
+# -------------------------
+@app.post("/leetcode/graphql")
+async def leetcode_graphql(request: Request):
+    body = await request.json()
+    await _sleep_ms(SETTINGS["site_latency_ms"], SETTINGS["site_latency_ms"] / 3)
+    name = "leetcode_calendar.json" if "userCalendar" in body.get("query", "") else "leetcode_profile.json"
+    return JSONResponse(json.loads(_read_fixture(name)))
+
+
+@app.get("/codechef/users/{username}")
+async def codechef_profile(username: str):
+    await _sleep_ms(SETTINGS["site_latency_ms"], SETTINGS["site_latency_ms"] / 3)
+    return HTMLResponse(_read_fixture("codechef_profile.html"))
+
+
+@app.get("/stub/settings")
+def get_settings():
+    return SETTINGS
+
+
+@app.post("/stub/settings")
+async def update_settings(request: Request):
+    """Change latency / error rates while a load test is running."""
+    for key, value in (await request.json()).items():
+        if key in SETTINGS:
+            SETTINGS[key] = float(value)
+    return SETTINGS
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the third-party stub servers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for key, value in SETTINGS.items():
+        parser.add_argument("--" + key.replace("_", "-"), type=float, default=value)
+    args = parser.parse_args()
+    for key in SETTINGS:
+        SETTINGS[key] = getattr(args, key)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# run.py
+# Production entry point for the backend (app/main.py keeps the single-process dev server).
+#
+#   cd backend1
+#   python run.py                       # one worker per CPU, uvloop + httptools when installed
+#   python run.py --workers 4 --port 8080 --pdf-pool-size auto
+#   WEB_CONCURRENCY=8 python run.py --server gunicorn
+#
+# With gunicorn installed (pip install gunicorn uvicorn-worker) the app is preloaded in
+# the master and forked into UvicornWorkers; otherwise uvicorn's own multiprocess
+# supervisor is used. On SIGTERM each worker stops accepting connections, turns /readyz
+# to 503, ends long-lived SSE progress streams with a "reconnect" event and waits up to
+# --graceful-timeout seconds for in-flight requests (LLM streams included) to finish.
+
+import argparse
+import importlib.util
+import os
+import sys
+
+APP = "app.main:app"
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def default_workers():
+    return _env_int("WEB_CONCURRENCY", os.cpu_count() or 1)
+
+
+def pdf_pool_size(setting, workers):
+    """"auto" splits the CPUs between the workers' PDF extraction pools."""
+    if setting == "auto":
+        return max(1, (os.cpu_count() or 1) // max(1, workers))
+    return int(setting)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AI Resume + Platform Analyzer API.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_int("PORT", 8000))
+    parser.add_argument("-w", "--workers", type=int, default=default_workers(),
+                        help="worker processes (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument("--server", choices=("auto", "gunicorn", "uvicorn"), default=os.getenv("SERVER", "auto"),
+                        help="process manager; auto = gunicorn when installed")
+    parser.add_argument("--loop", default="uvloop" if _installed("uvloop") else "auto")
+    parser.add_argument("--http", default="httptools" if _installed("httptools") else "auto")
+    parser.add_argument("--backlog", type=int, default=_env_int("BACKLOG", 2048))
+    parser.add_argument("--keep-alive", type=int, default=_env_int("KEEP_ALIVE", 75),
+                        help="idle keep-alive seconds (keep above the load balancer's idle timeout)")
+    parser.add_argument("--graceful-timeout", type=int, default=_env_int("GRACEFUL_TIMEOUT", 30),
+                        help="seconds in-flight requests get to finish on shutdown")
+    parser.add_argument("--limit-concurrency", type=int, default=_env_int("LIMIT_CONCURRENCY", 0) or None,
+                        help="per-worker connection cap, 503 beyond it (default: none)")
+    parser.add_argument("--max-requests", type=int, default=_env_int("MAX_REQUESTS", 0),
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--no-preload", dest="preload", action="store_false",
+                        help="import the app in every worker instead of once in the gunicorn master")
+    parser.add_argument("--pdf-pool-size", default=os.getenv("PDF_POOL_SIZE") or "auto",
+                        help='PDF extraction threads/processes per worker, or "auto" = CPUs / workers')
+    parser.add_argument("--pdf-pool-kind", choices=("thread", "process"), default=os.getenv("PDF_POOL_KIND", "thread"))
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    return parser.parse_args(argv)
+
+
+# -------------------------
+# uvicorn multiprocess
+# -------------------------
+def run_uvicorn(args):
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=args.loop,
+        http=args.http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_concurrency=args.limit_concurrency,
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        log_level=args.log_level,
+    )
+
+
+# -------------------------
+# gunicorn + UvicornWorker (preloaded app)
+# -------------------------
+def _uvicorn_worker_class():
+    try:
+        from uvicorn_worker import UvicornWorker
+    except ImportError:
+        from uvicorn.workers import UvicornWorker  # deprecated home, older uvicorn releases
+    return UvicornWorker
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    base = _uvicorn_worker_class()
+
+    class Worker(base):
+        CONFIG_KWARGS = {**base.CONFIG_KWARGS, "loop": args.loop, "http": args.http,
+                         "limit_concurrency": args.limit_concurrency,
+                         "forwarded_allow_ips": args.forwarded_allow_ips}
+
+    options = {
+        "bind": f"{args.host}:{args.port}",
+        "workers": args.workers,
+        "worker_class": Worker,
+        "preload_app": args.preload,
+        "backlog": args.backlog,
+        "keepalive": args.keep_alive,
+        "graceful_timeout": args.graceful_timeout,
+        "timeout": max(120, args.graceful_timeout * 2),  # heartbeat; bulk filter requests run long
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10,
+        "loglevel": args.log_level,
+        "accesslog": "-",
+    }
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Application().run()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # set before the app is imported (preload) or the workers start, so every worker sees it
+    os.environ["PDF_POOL_SIZE"] = str(pdf_pool_size(args.pdf_pool_size, args.workers))
+    os.environ["PDF_POOL_KIND"] = args.pdf_pool_kind
+
+    server = args.server
+    if server == "auto":
+        server = "gunicorn" if _installed("gunicorn") and sys.platform != "win32" else "uvicorn"
+    print(f"ℹ️ Starting {server}: {args.workers} worker(s), loop={args.loop}, http={args.http}, "
+          f"PDF pool {os.environ['PDF_POOL_SIZE']} {args.pdf_pool_kind}(s) per worker")
+    if server == "gunicorn":
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())